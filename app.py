@@ -3,10 +3,23 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import base64
 from io import BytesIO
-import time  # ADD THIS LINE - WAS MISSING!
+import functools
+import os
+
+from cache import PackageCache, package_key
+from discovery import ContentDiscoverer
+from engagement import EngagementModel
+from generation import ContentGenerator
+from llm import LLMBackend
+from monitoring import MediaMonitor
+from pipeline import SnapshotStages
+from records import ContentPackage, LazyFormats
+from search import OpportunityIndex
+from snapshots import SnapshotService
+from timing import PostingTimeOptimizer
 
 # Create a base64 encoded logo to avoid file dependencies
 def get_base64_logo():
@@ -141,124 +154,202 @@ if 'generated_content' not in st.session_state:
     st.session_state.generated_content = None
 if 'selected_opportunity' not in st.session_state:
     st.session_state.selected_opportunity = None
-if 'trends' not in st.session_state:
-    st.session_state.trends = None
-if 'opportunities' not in st.session_state:
-    st.session_state.opportunities = None
-
-# Sample data generators
-def generate_trends():
-    topics = ['AI Regulation', 'Quantum Computing', 'Sustainable Tech', 'Web3', 
-              'Space Exploration', 'Biotech', 'Climate Tech', 'Cybersecurity']
-    trends = []
-    for topic in topics[:6]:
-        trends.append({
-            'topic': topic,
-            'mentions': np.random.randint(1000, 50000),
-            'growth': f"{np.random.uniform(5, 200):.1f}%",
-            'sentiment': np.random.uniform(0.3, 0.9),
-            'platforms': np.random.choice(['Twitter', 'Reddit', 'News', 'YouTube', 'TikTok'], 
-                                         np.random.randint(2, 4), replace=False),
-            'emerging': np.random.random() > 0.7
-        })
-    return trends
-
-def generate_opportunities(trends):
-    opportunities = []
-    for i, trend in enumerate(trends[:3]):
-        score = np.random.uniform(6.5, 9.5)
-        opportunities.append({
-            'id': i + 1,
-            'title': f"Explain {trend['topic']} to Business Leaders",
-            'trend': trend['topic'],
-            'score': round(score, 1),
-            'metrics': {
-                'virality': round(np.random.uniform(6, 9), 1),
-                'competition_gap': round(np.random.uniform(7, 10), 1),
-                'audience_fit': round(np.random.uniform(6, 9), 1),
-                'resource_efficiency': round(np.random.uniform(8, 10), 1)
-            },
-            'brief': f"Create accessible content explaining {trend['topic']} to non-experts, focusing on practical business implications.",
-            'timing': f"Within {np.random.randint(1, 6)} hours"
-        })
-    return sorted(opportunities, key=lambda x: x['score'], reverse=True)
+
+@st.cache_resource
+def get_monitor():
+    """Process-wide monitor; its trend history persists across reruns and restarts"""
+    return MediaMonitor(history_path=os.path.join('data', 'trend_history.bin'))
+
+@st.cache_resource
+def get_opportunity_index():
+    """Every opportunity discovered so far, searchable across reruns and restarts"""
+    return OpportunityIndex(os.path.join('data', 'opportunities.ndjson'))
+
+@st.cache_resource
+def get_discoverer():
+    """Shared opportunity scorer; its weights and templates are fixed per process"""
+    return ContentDiscoverer()
+
+@st.cache_resource
+def get_package_cache():
+    """Generated packages by content hash, so re-selecting an opportunity is instant"""
+    return PackageCache(path=os.path.join('data', 'packages'))
+
+@st.cache_resource
+def get_timing_optimizer():
+    """Posting windows learned from post outcomes; seeded with simulated outcomes until real ones are recorded"""
+    optimizer = PostingTimeOptimizer()
+    optimizer.simulate_outcomes(20_000, seed=7)
+    return optimizer
+
+@st.cache_resource
+def get_engagement_model():
+    """Per-platform engagement, reach and conversion predictor; trained on simulated outcomes until real ones are recorded"""
+    return EngagementModel().simulate_training(20_000, seed=7)
+
+@st.cache_resource
+def get_content_generator():
+    """Template generator wired to the shared cache, hashtag index, timing optimizer and engagement model"""
+    return ContentGenerator(cache=get_package_cache(), hashtags=get_monitor().hashtags, timing=get_timing_optimizer(),
+                            engagement=get_engagement_model())
+
+@st.cache_resource
+def get_llm_generator():
+    """Model-backed generator when CONTENTFORGE_LLM_URL points at a completion server, else None"""
+    url = os.environ.get('CONTENTFORGE_LLM_URL')
+    if not url:
+        return None
+    return ContentGenerator(cache=get_package_cache(), backend=LLMBackend(url), hashtags=get_monitor().hashtags,
+                            timing=get_timing_optimizer(), engagement=get_engagement_model())
+
+# Bump when the templates in build_content change
+CONTENT_VERSION = 2
+CONTENT_FORMATS = ('tweet', 'linkedin', 'image_prompt', 'video_script')
+CONTENT_LABELS = {'tweet': "Tweet Thread", 'linkedin': "LinkedIn Post", 'image_prompt': "Visual Content Prompt",
+                  'video_script': "Video Script"}
 
 def generate_content(opportunity):
-    return {
-        'opportunity_title': opportunity['title'],
-        'formats': {
-            'tweet': [
-                f"🚀 {opportunity['trend']} isn't just another tech trend—it's a fundamental shift in how we approach problem-solving.",
-                f"1/ The core concept: {opportunity['trend'].lower()} enables exponential solutions to previously impossible problems.",
-                f"2/ Business impact: Companies adopting early see 3-5x faster innovation cycles and competitive advantage.",
-                f"3/ What's next: The next 12 months will determine which enterprises lead vs follow. Start exploring use cases now."
-            ],
-            'linkedin': f"""The Strategic Imperative: Understanding {opportunity['trend']}
-
-As {opportunity['trend']} transitions from theoretical concept to practical tool, business leaders face a critical window of opportunity.
+    generator = get_llm_generator()
+    # The snapshot refresh writes to the cache and hashtag index; wait for it rather than read mid-update
+    with get_snapshot_service().lock:
+        if generator is not None:
+            # Formats stay pending until the Create tab streams them in; the sections read the hashtag
+            # index, so they are built now, under the lock
+            package = generator.create_content_package(opportunity, CONTENT_FORMATS)
+            for section in ('hashtags', 'timing', 'performance_predictions'):
+                getattr(package, section)
+            return package
+        key = package_key(opportunity, CONTENT_FORMATS, version=CONTENT_VERSION)
+        return get_package_cache().get_or_create(key, lambda: build_content(opportunity))
+
+def format_content(content, name):
+    """One format of the selected package, generated the first time its tab is open (streamed when a model backs it)"""
+    generator = get_llm_generator()
+    if generator is None or name not in getattr(content['formats'], 'pending', ()):
+        return content['formats'][name]
+    placeholder = st.empty()
+    with placeholder.container():
+        st.caption(f"✍️ Generating {CONTENT_LABELS[name]}...")
+        text = st.write_stream(generator.stream_format(st.session_state.selected_opportunity, name))
+    placeholder.empty()
+    # Completing the package writes it to the cache; the snapshot refresh may be writing there too
+    with get_snapshot_service().lock:
+        return generator.fill_format(content, name, text)
+
+def select_opportunity(opportunity, snapshot):
+    """Make an opportunity this session's selection, with the snapshot's package for it when there is one"""
+    st.session_state.selected_opportunity = opportunity
+    package = snapshot.packages.get(opportunity.title)
+    st.session_state.generated_content = package if package is not None else generate_content(opportunity)
+
+def build_content(opportunity):
+    """Template package for an opportunity; each format is filled in the first time it is read"""
+    return ContentPackage(
+        opportunity_title=opportunity.title,
+        topic_id=opportunity.topic_id,
+        generated_at=datetime.now().isoformat(),
+        formats=LazyFormats({name: functools.partial(template_format, opportunity, name) for name in CONTENT_FORMATS}),
+        timing=get_timing_optimizer().timing(opportunity.get('audience')),
+        performance_predictions=get_engagement_model().predict_one(opportunity),
+        # Ranked by what monitored posts on this topic actually use, topped up with the house tags
+        hashtags=get_monitor().hashtags.suggest(opportunity.topic_id, fallback=['#AI', '#Tech', '#Innovation',
+                                                                               '#Business', '#Future'])
+    )
+
+def template_format(opportunity, name):
+    topic, topic_lower, hashtag = opportunity.trend, opportunity.topic_lower, opportunity.hashtag
+    if name == 'tweet':
+        return [
+            f"🚀 {topic} isn't just another tech trend—it's a fundamental shift in how we approach problem-solving.",
+            f"1/ The core concept: {topic_lower} enables exponential solutions to previously impossible problems.",
+            f"2/ Business impact: Companies adopting early see 3-5x faster innovation cycles and competitive advantage.",
+            f"3/ What's next: The next 12 months will determine which enterprises lead vs follow. Start exploring use cases now."
+        ]
+    if name == 'linkedin':
+        return f"""The Strategic Imperative: Understanding {topic}
+
+As {topic} transitions from theoretical concept to practical tool, business leaders face a critical window of opportunity.
 
 📊 Why This Matters Now:
 • Market disruption expected within 18-24 months
 • Early adopters are already seeing ROI
-• Talent with {opportunity['trend'].lower()} expertise is scarce but crucial
+• Talent with {topic_lower} expertise is scarce but crucial
 
 🔍 Key Questions Every Leader Should Ask:
-1. How will {opportunity['trend'].lower()} impact our industry specifically?
+1. How will {topic_lower} impact our industry specifically?
 2. What are the first, lowest-risk applications we can pilot?
 3. How do we build internal capability while the field evolves?
 
 🚀 The Path Forward:
 Start with education, move to experimentation, then scale successful pilots. The cost of waiting exceeds the risk of starting.
 
-#BusinessStrategy #Innovation #DigitalTransformation #{opportunity['trend'].replace(' ', '')}""",
-            'image_prompt': f"""Professional infographic about {opportunity['trend']}:
+#BusinessStrategy #Innovation #DigitalTransformation {hashtag}"""
+    if name == 'image_prompt':
+        return f"""Professional infographic about {topic}:
 
 Style: Clean, corporate design with data visualization
 Colors: Blue gradient theme (#667eea to #764ba2)
 Elements:
-1. Central icon representing {opportunity['trend'].lower()}
+1. Central icon representing {topic_lower}
 2. 3 key statistics in bold typography
 3. Timeline showing adoption curve
-4. Comparison: Traditional vs {opportunity['trend']} approach
+4. Comparison: Traditional vs {topic} approach
 5. Call-to-action: "Start your strategy today"
 
-Layout: Optimized for social media (1080x1080)""",
-            'video_script': f"""HOOK (0-5s): [Dynamic animation] "What if your biggest business challenge could be solved exponentially faster?"
+Layout: Optimized for social media (1080x1080)"""
+    return f"""HOOK (0-5s): [Dynamic animation] "What if your biggest business challenge could be solved exponentially faster?"
 
-EXPLANATION (5-30s): [Whiteboard animation] "Here's how {opportunity['trend']} works in simple terms..."
+EXPLANATION (5-30s): [Whiteboard animation] "Here's how {topic} works in simple terms..."
 
 IMPACT (30-45s): [Real-world examples] "Companies using this are seeing..."
 
 CALL TO ACTION (45-60s): [Clear text overlay] "3 steps to get started today..." """
-        },
-        'timing': {
-            'twitter': "9:30 AM EST, Wednesday",
-            'linkedin': "11:00 AM EST, Tuesday",
-            'instagram': "2:00 PM EST, Thursday",
-            'tiktok': "7:00 PM EST, Friday"
-        },
-        'hashtags': ['#AI', '#Tech', '#Innovation', '#Business', '#Future', f"#{opportunity['trend'].replace(' ', '')}"]
+
+# Shared snapshot: one refresh loop does the monitoring, discovery and generation for every session
+PIPELINE_MENTIONS = 2_000  # new mentions pulled in per refresh
+PIPELINE_CHUNKS = 4  # ingested and rescored in this many steps, so discovery starts on the first
+PIPELINE_OPPORTUNITIES = 3
+SNAPSHOT_INTERVAL = float(os.environ.get('CONTENTFORGE_REFRESH_SECONDS', 30))
+SNAPSHOT_MAX_STALENESS = float(os.environ.get('CONTENTFORGE_MAX_STALENESS', 120))
+MIN_REFRESH_AGE = 5  # "Run" clicks within this many seconds of a refresh reuse it
+
+def build_snapshot(monitor, discoverer, index, generator):
+    """Run Monitor -> Discover -> Create as overlapping stages and return the snapshot fields.
+
+    See SnapshotStages: each stage runs on its own thread, so content
+    generation starts while later chunks are still being ingested.
+    Everything returned is a copy that later refreshes leave alone, since
+    sessions keep reading it.
+    """
+    stages = SnapshotStages(monitor, discoverer, index, generator, PIPELINE_MENTIONS, PIPELINE_OPPORTUNITIES,
+                            CONTENT_FORMATS, chunks=PIPELINE_CHUNKS)
+    pipeline = stages.pipeline()
+    packages = {opportunity.title: package for opportunity, package in pipeline.run()}
+    return {
+        'trends': stages.trends[-1],
+        'timeline': monitor.history.timeline(hours=24),
+        # Final scores, best first; anything that dropped out of the top along the way is kept
+        'opportunities': tuple(sorted(stages.latest.values(), key=lambda opportunity: -opportunity.score)),
+        'covered': stages.covered,
+        'packages': packages,
+        'stage_stats': tuple(stats.to_dict() for stats in pipeline.stats)
     }
 
-# Pipeline function
+@st.cache_resource
+def get_snapshot_service():
+    """The process-wide snapshot every session reads; refreshed in the background"""
+    # Resolve the shared resources here: the refresh thread must not call into Streamlit
+    build = functools.partial(build_snapshot, get_monitor(), get_discoverer(), get_opportunity_index(),
+                              get_llm_generator() or get_content_generator())
+    return SnapshotService(build, interval=SNAPSHOT_INTERVAL, max_staleness=SNAPSHOT_MAX_STALENESS).start()
+
 def run_pipeline():
-    """Run the complete Chronos pipeline"""
-    # Step 1: Monitoring
-    with st.spinner("🕵️ **Monitoring digital landscape...**"):
-        time.sleep(1.5)
-        st.session_state.trends = generate_trends()
-    
-    # Step 2: Discovery
-    with st.spinner("🧠 **Analyzing opportunities...**"):
-        time.sleep(1.5)
-        st.session_state.opportunities = generate_opportunities(st.session_state.trends)
-        st.session_state.selected_opportunity = st.session_state.opportunities[0]
-    
-    # Step 3: Generation
-    with st.spinner("🎨 **Generating content...**"):
-        time.sleep(2)
-        st.session_state.generated_content = generate_content(st.session_state.selected_opportunity)
-    
+    """Refresh the shared snapshot (unless one was just built) and select its top opportunity"""
+    with st.spinner("🕵️ **Monitoring, discovering and creating...**"):
+        snapshot = get_snapshot_service().refresh(max_age=MIN_REFRESH_AGE)
+    if not snapshot.opportunities:
+        return False
+    select_opportunity(snapshot.opportunities[0], snapshot)
     st.session_state.demo_step = 3
     return True
 
@@ -337,6 +428,18 @@ with demo_col2:
         if success:
             st.success("✅ **Pipeline complete!** Generated multi-format content package.")
             st.rerun()
+    
+    # Every session reads the same snapshot; only selections are kept per session
+    snapshot = get_snapshot_service().current()
+    # Stages overlap, so their busy times add up to more than the run took
+    st.dataframe(pd.DataFrame([
+        {'Stage': stats['name'], 'Items': stats['items'], 'Busy (ms)': round(stats['busy'] * 1000),
+         'First output (ms)': None if stats['first_output'] is None else round(stats['first_output'] * 1000),
+         'Done at (ms)': round(stats['finished'] * 1000)}
+        for stats in snapshot.stage_stats
+    ]), use_container_width=True, hide_index=True)
+    st.caption(f"Snapshot v{snapshot.version}, {snapshot.age():.0f}s old, built in {snapshot.build_seconds:.2f}s; "
+               f"refreshed every {SNAPSHOT_INTERVAL:.0f}s for all viewers")
 
 # Pipeline Steps
 tab1, tab2, tab3, tab4 = st.tabs(["📡 **Monitor**", "🔍 **Discover**", "🎨 **Create**", "🚀 **Optimize**"])
@@ -344,32 +447,24 @@ tab1, tab2, tab3, tab4 = st.tabs(["📡 **Monitor**", "🔍 **Discover**", "🎨
 with tab1:
     st.subheader("Real-time Media Monitoring")
     
-    # Generate or use existing trends
-    if st.session_state.trends:
-        trends = st.session_state.trends
-    else:
-        trends = generate_trends()
-        st.session_state.trends = trends
+    trends = snapshot.trends
     
     col1, col2 = st.columns(2)
     
     with col1:
-        # Timeline chart
-        hours = 24
-        timestamps = [datetime.now() - timedelta(hours=h) for h in range(hours, 0, -1)]
-        mentions = [np.random.randint(500, 3000) for _ in range(hours)]
-        sentiment = [np.random.uniform(0.3, 0.9) for _ in range(hours)]
+        # Timeline chart, read from the persisted trend history when the snapshot was built
+        timeline = snapshot.timeline
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
-            x=timestamps,
-            y=mentions,
+            x=timeline['timestamp'],
+            y=timeline['mentions'],
             name='Mentions',
             line=dict(color='#667eea', width=3)
         ))
         fig.add_trace(go.Scatter(
-            x=timestamps,
-            y=[s * 3000 for s in sentiment],
+            x=timeline['timestamp'],
+            y=timeline['sentiment'],
             name='Sentiment',
             fill='tozeroy',
             line=dict(color='rgba(102, 126, 234, 0.3)', width=1),
@@ -380,7 +475,7 @@ with tab1:
             title='📊 Real-time Trend Volume & Sentiment',
             xaxis_title='Time',
             yaxis=dict(title='Mentions', side='left'),
-            yaxis2=dict(title='Sentiment', side='right', overlaying='y', range=[0, 3000]),
+            yaxis2=dict(title='Sentiment', side='right', overlaying='y', range=[0, 1]),
             hovermode='x unified',
             height=400,
             template='plotly_white'
@@ -389,7 +484,8 @@ with tab1:
     
     with col2:
         # Sentiment gauge
-        overall_sentiment = np.mean([t['sentiment'] for t in trends])
+        # Stored sentiment is signed [-1, 1]; the gauge reads 0-100
+        overall_sentiment = (trends.overall_sentiment() + 1) / 2
         fig = go.Figure(go.Indicator(
             mode="gauge+number",
             value=overall_sentiment * 100,
@@ -415,35 +511,28 @@ with tab1:
     
     # Trending topics table
     st.subheader("🔥 Trending Now")
-    trends_df = pd.DataFrame(trends)
-    trends_df['platforms'] = trends_df['platforms'].apply(lambda x: ', '.join(x))
-    trends_df['sentiment_color'] = trends_df['sentiment'].apply(
-        lambda x: '🟢' if x > 0.7 else '🟡' if x > 0.4 else '🔴'
-    )
+    trends_df = trends.to_frame()
+    trends_df['growth'] = np.char.mod('%.1f%%', trends['growth'])
+    sentiment = (trends['sentiment'] + 1) / 2
+    trends_df['sentiment_color'] = np.select([sentiment > 0.7, sentiment > 0.4], ['🟢', '🟡'], '🔴')
     
     # Format the display
-    display_df = trends_df[['topic', 'mentions', 'growth', 'sentiment_color', 'platforms']].copy()
+    display_df = trends_df[['topic', 'volume', 'growth', 'sentiment_color', 'platforms']].copy()
     display_df.columns = ['Topic', 'Mentions', 'Growth (24h)', 'Sentiment', 'Platforms']
     st.dataframe(display_df, use_container_width=True, hide_index=True)
 
 with tab2:
     st.subheader("Content Opportunity Discovery")
     
-    # Button to generate opportunities
+    # Refresh the shared snapshot now instead of waiting for the next scheduled refresh
     if st.button("🔍 Analyze Current Trends", key="analyze_btn", use_container_width=True):
         with st.spinner("Analyzing trends..."):
-            time.sleep(1)
-            if st.session_state.trends:
-                opportunities = generate_opportunities(st.session_state.trends)
-                st.session_state.opportunities = opportunities
-            else:
-                trends = generate_trends()
-                opportunities = generate_opportunities(trends)
-                st.session_state.opportunities = opportunities
+            get_snapshot_service().refresh(max_age=MIN_REFRESH_AGE)
+        st.rerun()
     
     # Display opportunities
-    if st.session_state.opportunities:
-        for i, opp in enumerate(st.session_state.opportunities):
+    if snapshot.opportunities:
+        for i, opp in enumerate(snapshot.opportunities):
             with st.expander(f"🎯 Opportunity #{i+1}: {opp['title']} (Score: {opp['score']}/10)", expanded=i==0):
                 col1, col2, col3, col4 = st.columns(4)
                 col1.metric("Virality", f"{opp['metrics']['virality']}/10")
@@ -453,14 +542,36 @@ with tab2:
                 
                 st.markdown(f"**Strategic Brief:** {opp['brief']}")
                 st.markdown(f"**Optimal Timing:** {opp['timing']}")
+                previous = snapshot.covered.get(opp['title'])
+                if previous is not None:
+                    seen = get_opportunity_index().docs[previous]
+                    st.caption(f"♻️ Already covered: \"{seen['title']}\" on "
+                               f"{datetime.fromtimestamp(seen['indexed_at']).strftime('%Y-%m-%d %H:%M')}")
                 
                 if st.button(f"Select & Generate Content", key=f"select_{i}", type="secondary"):
-                    st.session_state.selected_opportunity = opp
-                    st.session_state.generated_content = generate_content(opp)
+                    select_opportunity(opp, snapshot)
                     st.success(f"✅ Selected: {opp['title']}")
                     st.rerun()
     else:
         st.info("Click 'Analyze Current Trends' to discover content opportunities")
+    
+    # Search across every opportunity discovered so far
+    index = get_opportunity_index()
+    query = st.text_input(f"🔎 Search {len(index):,} past opportunities",
+                          placeholder="e.g. quantum investors, trend:web3 -beginners")
+    if query:
+        # Plain words rank by BM25; field:term, -term, NOT and OR also filter
+        boolean = query if any(c in query for c in ':-') or ' OR ' in query or 'NOT ' in query else None
+        with get_snapshot_service().lock:
+            hits = index.search(query, k=20, boolean=boolean)
+        if hits:
+            st.dataframe(pd.DataFrame([
+                {**{key: index.docs[doc_id][key] for key in ('title', 'trend', 'audience', 'score')},
+                 'relevance': round(score, 2)}
+                for doc_id, score in hits
+            ]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No matching opportunities yet")
 
 with tab3:
     st.subheader("AI-Powered Content Generation")
@@ -475,71 +586,82 @@ with tab3:
         Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         </div>
         """, unsafe_allow_html=True)
+        cache_stats = get_package_cache().stats()
+        lookups = cache_stats['hits'] + cache_stats['disk_hits'] + cache_stats['misses']
+        st.caption(f"Package cache: {cache_stats['entries']} cached, {cache_stats['hit_rate']:.0%} hit rate "
+                   f"over {lookups} lookups")
         
         # Format tabs
-        gen_tabs = st.tabs(["🐦 **Twitter**", "💼 **LinkedIn**", "🎨 **Visual**", "🎥 **Video**"])
+        # Only the open tab runs, so formats of a lazy package are generated when first viewed
+        gen_tabs = st.tabs(["🐦 **Twitter**", "💼 **LinkedIn**", "🎨 **Visual**", "🎥 **Video**"], key="format_tab",
+                           on_change="rerun")
         
         with gen_tabs[0]:
-            st.markdown("#### Tweet Thread (4-part)")
-            for i, tweet in enumerate(content['formats']['tweet']):
+            if gen_tabs[0].open:
+                tweets = format_content(content, 'tweet')
+                st.markdown(f"#### Tweet Thread ({len(tweets)}-part)")
+                for i, tweet in enumerate(tweets):
+                    st.markdown(f"""
+                    <div class="content-box">
+                    <strong>Tweet {i+1}:</strong><br>
+                    {tweet}
+                    </div>
+                    """, unsafe_allow_html=True)
+                st.markdown(f"**⏱️ Optimal Timing:** {content['timing']['twitter']}")
+                st.markdown(f"**🏷️ Hashtags:** {', '.join(content['hashtags'][:5])}")
+        
+        with gen_tabs[1]:
+            if gen_tabs[1].open:
+                st.markdown("#### LinkedIn Article Format")
                 st.markdown(f"""
                 <div class="content-box">
-                <strong>Tweet {i+1}:</strong><br>
-                {tweet}
+                {format_content(content, 'linkedin')}
                 </div>
                 """, unsafe_allow_html=True)
-            st.markdown(f"**⏱️ Optimal Timing:** {content['timing']['twitter']}")
-            st.markdown(f"**🏷️ Hashtags:** {', '.join(content['hashtags'][:5])}")
-        
-        with gen_tabs[1]:
-            st.markdown("#### LinkedIn Article Format")
-            st.markdown(f"""
-            <div class="content-box">
-            {content['formats']['linkedin']}
-            </div>
-            """, unsafe_allow_html=True)
-            st.markdown(f"**⏱️ Optimal Timing:** {content['timing']['linkedin']}")
+                st.markdown(f"**⏱️ Optimal Timing:** {content['timing']['linkedin']}")
         
         with gen_tabs[2]:
-            st.markdown("#### Visual Content Prompt")
-            st.code(content['formats']['image_prompt'], language="text")
-            st.markdown("""
-            **🎯 AI Model:** Stable Diffusion XL<br>
-            **📐 Aspect Ratio:** 1:1 (Square)<br>
-            **🎨 Style:** Professional infographic
-            """)
-            
-            # Generate a simple visual representation
-            if st.button("🖼️ Generate Sample Layout", key="gen_layout"):
+            if gen_tabs[2].open:
+                st.markdown("#### Visual Content Prompt")
+                st.code(format_content(content, 'image_prompt'), language="text")
                 st.markdown("""
-                ```
-                ┌─────────────────────────────────────┐
-                │                                     │
-                │          [MAIN ICON]               │
-                │                                     │
-                │  📊 Stat 1: 245% Growth            │
-                │  🎯 Stat 2: 78% Adoption           │
-                │  ⚡ Stat 3: 3.2x ROI               │
-                │                                     │
-                │  ┌─────────┐    ┌─────────┐        │
-                │  │ Before  │ →  │ After   │        │
-                │  │  Slow   │    │  Fast   │        │
-                │  └─────────┘    └─────────┘        │
-                │                                     │
-                └─────────────────────────────────────┘
-                ```
+                **🎯 AI Model:** Stable Diffusion XL<br>
+                **📐 Aspect Ratio:** 1:1 (Square)<br>
+                **🎨 Style:** Professional infographic
                 """)
+                
+                # Generate a simple visual representation
+                if st.button("🖼️ Generate Sample Layout", key="gen_layout"):
+                    st.markdown("""
+                    ```
+                    ┌─────────────────────────────────────┐
+                    │                                     │
+                    │          [MAIN ICON]               │
+                    │                                     │
+                    │  📊 Stat 1: 245% Growth            │
+                    │  🎯 Stat 2: 78% Adoption           │
+                    │  ⚡ Stat 3: 3.2x ROI               │
+                    │                                     │
+                    │  ┌─────────┐    ┌─────────┐        │
+                    │  │ Before  │ →  │ After   │        │
+                    │  │  Slow   │    │  Fast   │        │
+                    │  └─────────┘    └─────────┘        │
+                    │                                     │
+                    └─────────────────────────────────────┘
+                    ```
+                    """)
         
         with gen_tabs[3]:
-            st.markdown("#### Video Script (60s Short-form)")
-            st.markdown(f"""
-            <div class="content-box">
-            {content['formats']['video_script']}
-            </div>
-            """, unsafe_allow_html=True)
-            st.markdown("**🎬 Format:** Vertical (9:16)")
-            st.markdown("**🎵 Music:** Upbeat corporate")
-            st.markdown("**🎙️ Voiceover:** Professional, energetic")
+            if gen_tabs[3].open:
+                st.markdown("#### Video Script (60s Short-form)")
+                st.markdown(f"""
+                <div class="content-box">
+                {format_content(content, 'video_script')}
+                </div>
+                """, unsafe_allow_html=True)
+                st.markdown("**🎬 Format:** Vertical (9:16)")
+                st.markdown("**🎵 Music:** Upbeat corporate")
+                st.markdown("**🎙️ Voiceover:** Professional, energetic")
     else:
         st.info("Run the pipeline or select an opportunity to generate content")
 
@@ -554,7 +676,9 @@ with tab4:
         with col1:
             # Performance prediction
             platforms = ['Twitter', 'LinkedIn', 'Instagram', 'TikTok']
-            scores = [85, 78, 92, 95]
+            predicted = content['performance_predictions'].get('platforms') or {}
+            scores = [round(predicted[p]['engagement']) if p in predicted else s
+                      for p, s in zip(platforms, [85, 78, 92, 95])]
             colors = ['#1DA1F2', '#0077B5', '#E4405F', '#000000']
             
             fig = go.Figure(data=[go.Bar(
@@ -573,12 +697,15 @@ with tab4:
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
-            # Timing optimization
+            # Timing optimization, for the selected opportunity's audience
+            audience = (st.session_state.selected_opportunity or {}).get('audience')
+            windows = get_timing_optimizer().best_windows(audience)
             timing_data = pd.DataFrame({
-                'Platform': platforms,
-                'Best Time': ['9:30 AM', '11:00 AM', '2:00 PM', '7:00 PM'],
-                'Best Day': ['Wednesday', 'Tuesday', 'Thursday', 'Friday'],
-                'Audience': ['Professionals', 'B2B', 'Youth', 'Gen Z']
+                'Platform': [platform for platform, _, _, _ in windows],
+                'Best Time': [window.rsplit(',', 1)[0] for _, window, _, _ in windows],
+                'Best Day': [day or window.rsplit(', ', 1)[-1] for _, window, day, _ in windows],
+                'Audience': [(audience or 'All audiences').title()] * len(windows),
+                'Lift': [f"{lift:.1f}x" if lift else '' for _, _, _, lift in windows]
             })
             st.dataframe(timing_data, use_container_width=True, hide_index=True)
         
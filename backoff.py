@@ -0,0 +1,20 @@
+import math
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+def retry_after_seconds(value, default):
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date), or default if it is missing or unreadable"""
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+        return max(seconds, 0.0) if math.isfinite(seconds) else default
+    except ValueError:
+        pass
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return max((until - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,849 @@
+"""Micro-benchmarks for the ContentForge processing stages.
+
+Run a single benchmark with `python benchmarks.py heavy_hitters`, or all of
+them with no arguments.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+import numpy as np
+
+from dedup import NearDuplicateFilter
+from detection import EmergingTrendDetector
+from cache import PackageCache
+from discovery import ContentDiscoverer
+from engagement import EngagementModel
+from export import export_packages, package_record, read_packages
+from generation import FORMAT_BUILDERS, ContentGenerator
+from hashtags import HashtagIndex
+from monitoring import MediaMonitor
+from pipeline import SnapshotStages
+from llm import LLMClient, StubModelServer
+from sentiment import NEGATIVE_WORDS, POSITIVE_WORDS, SentimentScorer, aggregate_sentiment
+from records import TOPICS
+from scoring import METRICS
+from search import OpportunityIndex
+from snapshots import SnapshotService
+from sources import ADAPTERS, SourceFetcher, StubPlatformServer
+from sketches import HeavyHitters
+from timing import PostingTimeOptimizer
+from trendstore import TrendStore
+
+def _zipf_keys(n_events, n_keys, exponent=1.2, seed=7):
+    """Skewed stream of topic keys, like hashtags in real traffic"""
+    rng = np.random.default_rng(seed)
+    ranks = (rng.zipf(exponent, n_events) - 1) % n_keys
+    return [f"topic-{rank}" for rank in ranks]
+
+def _topic_names(n, rng):
+    """Distinct two- and three-word topic names, some of them overlapping like real trend labels"""
+    syllables = ['qua', 'ntum', 'bio', 'tech', 'cli', 'mate', 'web', 'meta', 'verse', 'cy', 'ber', 'edge', 'ro',
+                 'bo', 'tics', 'fin', 'gen', 'nano', 'chip', 'grid', 'sol', 'ar', 'vo', 'lt', 'data', 'neo']
+    vocabulary = sorted({''.join(rng.choice(syllables, 3)) for _ in range(4 * n)})
+    names = set()
+    while len(names) < n:
+        names.add(' '.join(rng.choice(vocabulary, rng.integers(2, 4))).title())
+    return sorted(names)
+
+def _measure(build):
+    """Run build() untraced for timing, then traced for peak memory.
+
+    Returns (result, seconds, peak traced bytes).
+    """
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def bench_heavy_hitters(n_events=500_000, n_keys=200_000, k=100, epsilon=0.0005, delta=0.01):
+    """Exact Counter vs Count-Min + Space-Saving: memory, speed and top-k accuracy"""
+    keys = _zipf_keys(n_events, n_keys)
+    
+    def exact():
+        counts = Counter()
+        for key in keys:
+            counts[key] += 1
+        return counts
+    
+    def approximate():
+        hitters = HeavyHitters(k, epsilon=epsilon, delta=delta)
+        for key in keys:
+            hitters.add(key)
+        return hitters
+    
+    counts, exact_seconds, exact_bytes = _measure(exact)
+    hitters, approx_seconds, approx_bytes = _measure(approximate)
+    
+    true_top = [key for key, _ in counts.most_common(k)]
+    found = {key for key, _ in hitters.top(k)}
+    recall = len(found.intersection(true_top)) / k
+    errors = [abs(hitters.estimate(key) - counts[key]) / counts[key] for key in true_top]
+    
+    print(f"heavy_hitters: {n_events:,} events over {len(counts):,} distinct keys, k={k}, "
+          f"epsilon={epsilon}, delta={delta}")
+    print(f"  exact        {exact_bytes / 1e6:8.2f} MB  {n_events / exact_seconds:12,.0f} events/s")
+    print(f"  approximate  {approx_bytes / 1e6:8.2f} MB  {n_events / approx_seconds:12,.0f} events/s")
+    print(f"  top-{k} recall {recall:.1%}, mean relative error {np.mean(errors):.3%}, "
+          f"max {np.max(errors):.3%} (bound {epsilon * n_events / counts[true_top[-1]]:.3%} at rank {k})")
+
+def bench_sentiment(n_docs=200_000, batch_size=10_000, seed=7):
+    """Batch vs one-at-a-time sentiment scoring throughput, plus aggregation"""
+    rng = np.random.default_rng(seed)
+    vocabulary = list(POSITIVE_WORDS) + list(NEGATIVE_WORDS) + [
+        'the', 'new', 'update', 'on', 'this', 'is', 'not', 'really', 'for', 'everyone', 'today', 'launch'
+    ]
+    words = rng.choice(vocabulary, size=(n_docs, 12))
+    texts = [' '.join(row) for row in words]
+    topics = rng.integers(0, 500, n_docs)
+    platforms = rng.choice(['Twitter', 'Reddit', 'News', 'YouTube', 'TikTok'], n_docs)
+    scorer = SentimentScorer()
+    
+    started = time.perf_counter()
+    scores = np.concatenate([scorer.score(texts[i:i + batch_size]) for i in range(0, n_docs, batch_size)])
+    batch_seconds = time.perf_counter() - started
+    
+    single = texts[:20_000]
+    started = time.perf_counter()
+    for text in single:
+        scorer.score([text])
+    single_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    by_topic = aggregate_sentiment(scores, topics)
+    by_platform = aggregate_sentiment(scores, platforms)
+    aggregate_seconds = time.perf_counter() - started
+    
+    print(f"sentiment: {n_docs:,} documents of 12 tokens")
+    print(f"  batched ({batch_size:,}/batch)  {n_docs / batch_seconds:12,.0f} docs/s")
+    print(f"  one at a time        {len(single) / single_seconds:12,.0f} docs/s")
+    print(f"  aggregate to {len(by_topic)} topics and {len(by_platform)} platforms in {aggregate_seconds * 1000:.1f} ms")
+
+def bench_emerging(n_topics=10_000, minutes=240, breakout_minute=180, n_breakouts=50, seed=7):
+    """Per-bucket update cost and event-to-flag latency of the EWMA breakout detector"""
+    rng = np.random.default_rng(seed)
+    rates = rng.lognormal(0.5, 1.0, n_topics)
+    breakouts = rng.choice(n_topics, n_breakouts, replace=False)
+    detector = EmergingTrendDetector(capacity=n_topics)
+    
+    update_seconds = []
+    first_flag = {}
+    false_positives = set()
+    for minute in range(minutes):
+        current = rates.copy()
+        if minute >= breakout_minute:
+            current[breakouts] = rates[breakouts] * 4 + 10
+        newly = detector.update(rng.poisson(current), (minute + 1) * 60)
+        update_seconds.append(detector.last_update_seconds)
+        for topic_id in newly.tolist():
+            if topic_id in breakouts and minute >= breakout_minute:
+                first_flag.setdefault(topic_id, minute)
+            else:
+                false_positives.add(topic_id)
+    
+    delays = [minute - breakout_minute + 1 for minute in first_flag.values()]
+    print(f"emerging: {n_topics:,} topics, {minutes} one-minute buckets, {n_breakouts} breakouts at minute {breakout_minute}")
+    print(f"  update  {np.mean(update_seconds) * 1000:.3f} ms/bucket mean, "
+          f"{np.percentile(update_seconds, 99) * 1000:.3f} ms p99")
+    print(f"  detected {len(first_flag)}/{n_breakouts}, {len(false_positives)} false-positive topics")
+    if delays:
+        print(f"  event-to-flag latency: {np.mean(delays):.2f} buckets mean, {max(delays)} max "
+              f"(one bucket = 60 s, plus the update time)")
+
+def bench_dedup(n_posts=100_000, repost_rate=0.15, seed=7):
+    """Near-duplicate filter: per-post latency and how many planted reposts it catches"""
+    rng = np.random.default_rng(seed)
+    vocabulary = list(POSITIVE_WORDS) + list(NEGATIVE_WORDS) + [f"word{i}" for i in range(2000)]
+    posts = []
+    planted = np.zeros(n_posts, bool)
+    for i in range(n_posts):
+        if posts and rng.random() < repost_rate:
+            original = posts[int(rng.integers(max(0, i - 5000), i))]
+            # Reposts, quote-tweets with a link, and lightly punctuated copies
+            variant = int(rng.integers(3))
+            posts.append([f"RT @user{i}: {original}", f"{original} https://t.co/{i}", f"{original}!!"][variant])
+            planted[i] = True
+        else:
+            posts.append(' '.join(rng.choice(vocabulary, 12)))
+    timestamps = np.arange(n_posts, dtype=float)
+    dedup = NearDuplicateFilter(ttl=3 * 3600)
+    
+    started = time.perf_counter()
+    flagged = np.array([dedup.is_duplicate(text, ts) for text, ts in zip(posts, timestamps.tolist())])
+    seconds = time.perf_counter() - started
+    
+    print(f"dedup: {n_posts:,} posts of 12 tokens, {planted.mean():.1%} planted reposts")
+    print(f"  {seconds / n_posts * 1e6:.1f} us/post, {n_posts / seconds:,.0f} posts/s, "
+          f"{len(dedup):,} signatures indexed")
+    print(f"  caught {(flagged & planted).sum() / planted.sum():.1%} of reposts, "
+          f"{(flagged & ~planted).sum()} false positives; collapsed {flagged.mean():.1%} of volume")
+
+def bench_scoring(n_trends=10_000, k=20, repeats=20, seed=7):
+    """Vectorized (trend, template, audience) scoring and top-k selection over a large trend table"""
+    rng = np.random.default_rng(seed)
+    store = TrendStore(['Twitter', 'Reddit', 'News', 'YouTube', 'TikTok'])
+    store.load(
+        topic_id=store.intern_topics(_topic_names(n_trends, rng)),
+        volume=rng.integers(10, 100_000, n_trends),
+        growth=rng.normal(20, 60, n_trends),
+        velocity=rng.lognormal(0, 1, n_trends),
+        sentiment=rng.uniform(-1, 1, n_trends),
+        emerging=rng.random(n_trends) < 0.02
+    )
+    discoverer = ContentDiscoverer()
+    n_candidates = n_trends * len(discoverer.scorer.pair_audience)
+    
+    started = time.perf_counter()
+    for _ in range(repeats):
+        discoverer.scorer.top(store, k)
+    select_seconds = (time.perf_counter() - started) / repeats
+    
+    started = time.perf_counter()
+    for _ in range(repeats):
+        opportunities = discoverer.analyze_trends(store, limit=k)
+    analyze_seconds = (time.perf_counter() - started) / repeats
+    
+    discoverer.clusterer = None
+    started = time.perf_counter()
+    for _ in range(repeats):
+        discoverer.analyze_trends(store, limit=k)
+    unclustered_seconds = (time.perf_counter() - started) / repeats
+    
+    print(f"scoring: {n_trends:,} trends x {len(discoverer.scorer.pair_audience)} template/audience pairs "
+          f"= {n_candidates:,} candidates, top {k}")
+    print(f"  score + top-k      {select_seconds * 1000:8.2f} ms ({n_candidates / select_seconds:,.0f} candidates/s)")
+    print(f"  analyze_trends     {analyze_seconds * 1000:8.2f} ms with topic clustering, "
+          f"{unclustered_seconds * 1000:.2f} ms without, building {len(opportunities)} opportunities")
+
+def bench_leaderboard(n_trends=10_000, changed=50, k=20, cycles=200, seed=7):
+    """Incremental leaderboard updates vs rescoring and re-sorting every trend each cycle"""
+    rng = np.random.default_rng(seed)
+    store = TrendStore(['Twitter', 'Reddit', 'News', 'YouTube', 'TikTok'])
+    store.load(
+        topic_id=store.intern_topics(f"topic-{i}" for i in range(n_trends)),
+        volume=rng.integers(10, 100_000, n_trends),
+        growth=rng.normal(20, 60, n_trends),
+        velocity=rng.lognormal(0, 1, n_trends),
+        sentiment=rng.uniform(-1, 1, n_trends)
+    )
+    records = store.records()
+    discoverer = ContentDiscoverer()
+    discoverer.update_trends(records, now=0)
+    discoverer.top_opportunities(k, now=0)
+    
+    started = time.perf_counter()
+    for cycle in range(cycles):
+        batch = [records[i] for i in rng.choice(n_trends, changed, replace=False)]
+        for trend in batch:
+            trend.volume = int(trend.volume * rng.uniform(0.8, 1.5))
+        discoverer.update_trends(batch, now=cycle)
+        discoverer.top_opportunities(k, now=cycle)
+    incremental = (time.perf_counter() - started) / cycles
+    
+    started = time.perf_counter()
+    for _ in range(cycles // 10):
+        discoverer.analyze_trends(records, limit=k)
+    full = (time.perf_counter() - started) / (cycles // 10)
+    
+    started = time.perf_counter()
+    for _ in range(1000):
+        discoverer.top_opportunities(k, now=cycles)
+    read = (time.perf_counter() - started) / 1000
+    
+    print(f"leaderboard: {n_trends:,} trends, {changed} change per cycle, top {k}")
+    print(f"  incremental update + top-k  {incremental * 1000:8.3f} ms/cycle")
+    print(f"  full rescore of all trends  {full * 1000:8.3f} ms/cycle")
+    print(f"  unchanged top-k read        {read * 1e6:8.1f} us")
+
+def bench_brands(n_brands=200, n_trends=5_000, limit=5, seed=7):
+    """Multi-brand discovery: in-process loop vs the process pool"""
+    rng = np.random.default_rng(seed)
+    words = ['ai', 'quantum', 'climate', 'tech', 'health', 'finance', 'space', 'security', 'energy', 'retail']
+    store = TrendStore(['Twitter', 'Reddit', 'News', 'YouTube', 'TikTok'])
+    store.load(
+        topic_id=store.intern_topics(f"{' '.join(rng.choice(words, 2))} {i}" for i in range(n_trends)),
+        volume=rng.integers(10, 100_000, n_trends),
+        growth=rng.normal(20, 60, n_trends),
+        velocity=rng.lognormal(0, 1, n_trends),
+        sentiment=rng.uniform(-1, 1, n_trends)
+    )
+    discoverer = ContentDiscoverer()
+    audiences = discoverer.scorer.pair_audience
+    brands = [
+        {
+            'name': f"brand-{i}",
+            'topics': list(rng.choice(words, 2, replace=False)),
+            'audiences': list(rng.choice(audiences, 3, replace=False)),
+            'formats': ['thread', 'podcast', 'blog post']
+        }
+        for i in range(n_brands)
+    ]
+    
+    started = time.perf_counter()
+    serial = discoverer.analyze_brands(brands, store, limit, workers=0)
+    serial_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    pooled = discoverer.analyze_brands(brands, store, limit)
+    pool_seconds = time.perf_counter() - started
+    
+    print(f"brands: {n_brands} brands over {n_trends:,} shared trends, top {limit} each, {os.cpu_count()} CPUs")
+    print(f"  in-process    {serial_seconds:6.2f} s  {n_brands / serial_seconds:8.1f} brands/s")
+    print(f"  process pool  {pool_seconds:6.2f} s  {n_brands / pool_seconds:8.1f} brands/s")
+    print(f"  identical results: {serial == pooled}")
+
+def bench_search(n_docs=300_000, n_queries=200, seed=7):
+    """Opportunity index: add rate, boolean and BM25 query latency, covered() lookups"""
+    rng = np.random.default_rng(seed)
+    names = _topic_names(2_000, rng)
+    discoverer = ContentDiscoverer()
+    templates = discoverer.opportunity_templates
+    index = OpportunityIndex()
+    opportunities = []
+    for i in range(n_docs):
+        template = templates[i % len(templates)]
+        topic = names[int(rng.integers(len(names)))]
+        audience = template['audiences'][int(rng.integers(len(template['audiences'])))]
+        opportunities.append({
+            'title': template['title'].format(topic=topic, audience=audience),
+            'trend': topic,
+            'brief': discoverer._generate_brief(topic) + f" Angle {i}.",
+            'recommended_formats': template['formats'][:2],
+            'audience': audience,
+            'score': float(rng.uniform(4, 9))
+        })
+    
+    started = time.perf_counter()
+    index.add_many(opportunities)
+    add_seconds = time.perf_counter() - started
+    
+    words = [name.split()[0].lower() for name in names]
+    queries = [f"{words[int(rng.integers(len(words)))]} investors" for _ in range(n_queries)]
+    
+    def latency(run):
+        started = time.perf_counter()
+        for query in queries:
+            run(query)
+        return (time.perf_counter() - started) / n_queries * 1000
+    
+    ranked_ms = latency(lambda query: index.search(query, k=10))
+    boolean_ms = latency(lambda query: index.boolean(f"trend:{query.split()[0]} -beginners"))
+    probes = [opportunities[int(i)] for i in rng.integers(0, n_docs, n_queries)]
+    started = time.perf_counter()
+    found = sum(index.covered(probe) is not None for probe in probes)
+    covered_ms = (time.perf_counter() - started) / n_queries * 1000
+    
+    print(f"search: {n_docs:,} opportunities over {len(names):,} trends")
+    print(f"  add        {n_docs / add_seconds:10,.0f} docs/s")
+    print(f"  BM25 top10 {ranked_ms:8.2f} ms/query")
+    print(f"  boolean    {boolean_ms:8.2f} ms/query")
+    print(f"  covered()  {covered_ms:8.2f} ms/lookup ({found}/{n_queries} already-indexed probes found)")
+
+class _SlowGenerator(ContentGenerator):
+    """Generator whose format builders wait like a remote model call would"""
+    
+    def __init__(self, latency, cache=None):
+        super().__init__(cache)
+        self.latency = latency
+        for name, method in FORMAT_BUILDERS.items():
+            setattr(self, method, self._slow(getattr(self, method), latency[name]))
+    
+    @staticmethod
+    def _slow(build, seconds):
+        def slow(opportunity):
+            time.sleep(seconds)
+            return build(opportunity)
+        return slow
+
+def bench_generation(n_opportunities=40, max_workers=16):
+    """Sequential create_content_package vs streaming create_content_packages under model-like latency"""
+    latency = {'tweet': 0.05, 'linkedin': 0.08, 'image_prompt': 0.04, 'video_script': 0.12}
+    formats = list(latency)
+    generator = _SlowGenerator(latency)
+    opportunities = [
+        {'title': f"Explain topic {i} to developers", 'trend': f"Topic {i}", 'brief': ''}
+        for i in range(n_opportunities)
+    ]
+    
+    started = time.perf_counter()
+    for opportunity in opportunities:
+        generator.create_content_package(opportunity, formats).materialize()
+    sequential = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    first = None
+    for _ in generator.create_content_packages(opportunities, formats, max_workers=max_workers):
+        first = first or time.perf_counter() - started
+    concurrent = time.perf_counter() - started
+    
+    print(f"generation: {n_opportunities} packages x {len(formats)} formats, "
+          f"simulated per-format latency {sum(latency.values()) * 1000:.0f} ms per package")
+    print(f"  sequential   {sequential:6.2f} s total, {sequential / n_opportunities * 1000:6.0f} ms per package")
+    print(f"  concurrent   {concurrent:6.2f} s total, first package after {first * 1000:.0f} ms "
+          f"({max_workers} workers)")
+
+def bench_hashtags(n_posts=200_000, n_topics=200, n_tags=2_000, lookups=100_000, half_life=900):
+    """Hashtag co-occurrence ingest rate, per-package lookup cost, and top-N exactness under decay"""
+    import math
+    import random
+    rng = np.random.default_rng(11)
+    topics = _topic_names(n_topics, rng)
+    # Each topic draws from its own Zipf-skewed slice of the tag vocabulary, over a day of posts
+    offsets = rng.integers(0, n_tags, n_topics)
+    post_topics = rng.integers(0, n_topics, n_posts)
+    timestamps = np.sort(rng.uniform(0, 24 * 3600, n_posts))
+    ranks = (rng.zipf(1.3, (n_posts, 3)) - 1) % 50
+    texts = [f"post {' '.join(f'#tag{(offsets[t] + r) % n_tags}' for r in row)}"
+             for t, row in zip(post_topics.tolist(), ranks.tolist())]
+    
+    index = HashtagIndex(half_life=half_life)
+    started = time.perf_counter()
+    for t, text, ts in zip(post_topics.tolist(), texts, timestamps.tolist()):
+        index.add(topics[t], text, ts)
+    ingest = time.perf_counter() - started
+    
+    # Exactness: rebuild the decayed counts from scratch for a few topics and compare rankings
+    now = timestamps[-1]
+    mismatches = 0
+    for t in range(10):
+        counts = Counter()
+        for text, ts in zip((texts[i] for i in np.flatnonzero(post_topics == t)), timestamps[post_topics == t]):
+            for tag in dict.fromkeys(text.split()[1:]):
+                counts[tag] += math.exp(-math.log(2) / half_life * (now - ts))
+        expected = [tag for tag, _ in counts.most_common(index.top_n)]
+        mismatches += expected != index.top(TOPICS.intern(topics[t]))
+    
+    topic_ids = [TOPICS.intern(topic) for topic in topics]
+    banks = ContentGenerator().hashtag_banks
+    
+    def sampled(topic_id):
+        # What ContentGenerator did before: random picks from static banks, deduplicated through a set
+        hashtags = []
+        for category in banks.values():
+            hashtags.extend(random.sample(category, min(2, len(category))))
+        hashtags.append(TOPICS.hashtag(topic_id))
+        return list(set(hashtags))
+    
+    timings = {}
+    for name, pick in (('random banks', sampled), ('index suggest', index.suggest)):
+        started = time.perf_counter()
+        for i in range(lookups):
+            pick(topic_ids[i % n_topics])
+        timings[name] = time.perf_counter() - started
+    print(f"hashtags: {n_posts:,} posts, {n_topics} topics, {n_tags:,} distinct tags, half-life {half_life} s")
+    print(f"  ingest          {n_posts / ingest:10,.0f} posts/s")
+    print(f"  top-{index.top_n} exact      {10 - mismatches}/10 topics match a full decayed recount")
+    for name, seconds in timings.items():
+        print(f"  {name:14s}  {seconds / lookups * 1e6:8.2f} us/package")
+
+def bench_timing(n_outcomes=500_000, n_packages=5_000, slots_per_hour=4):
+    """Posting-window optimizer: outcome ingest, full refresh, and cached per-package lookups"""
+    optimizer = PostingTimeOptimizer(slots_per_hour=slots_per_hour)
+    started = time.perf_counter()
+    optimizer.simulate_outcomes(n_outcomes, seed=3)
+    ingest = time.perf_counter() - started
+    audiences = list(optimizer.audiences) + ['unknown audience']
+    
+    started = time.perf_counter()
+    optimizer.best_windows()
+    refresh = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for i in range(n_packages):
+        optimizer.timing(audiences[i % len(audiences)])
+    cached = time.perf_counter() - started
+    
+    # The same lookups if every package recomputed the windows from the histogram
+    started = time.perf_counter()
+    for i in range(50):
+        optimizer._refresh()
+        optimizer.timing(audiences[i % len(audiences)])
+    uncached = (time.perf_counter() - started) / 50
+    print(f"timing: {n_outcomes:,} outcomes, {len(optimizer.platforms)} platforms x {len(optimizer.audiences)} "
+          f"audiences x {optimizer.n_slots} week slots")
+    print(f"  ingest          {n_outcomes / ingest:12,.0f} outcomes/s (simulation included)")
+    print(f"  refresh         {refresh * 1000:9.2f} ms (smoothing + argmax for every platform and audience)")
+    print(f"  recompute       {uncached * 1e6:9.1f} us/package")
+    print(f"  cached lookup   {cached / n_packages * 1e6:9.2f} us/package, {n_packages:,} packages in "
+          f"{cached * 1000:.1f} ms")
+
+def bench_engagement(n_train=200_000, n_opportunities=5_000, n_distinct=500):
+    """Engagement model: training, batched vs per-package inference, and the feature cache"""
+    started = time.perf_counter()
+    model = EngagementModel().simulate_training(n_train, seed=3)
+    training = time.perf_counter() - started
+    
+    rng = np.random.default_rng(5)
+    audiences = ['students', 'developers', 'business leaders', 'investors', 'general public', 'policy makers']
+    formats = ['explainer video', 'thread', 'infographic', 'thought leadership', 'research brief', 'podcast']
+    distinct = []
+    for i in range(n_distinct):
+        metrics = {metric: round(float(rng.uniform(2, 10)), 1) for metric in METRICS}
+        distinct.append({'title': f"Explain topic {i}", 'trend': f"Topic {i}", 'brief': '', 'audience': audiences[i % len(audiences)],
+                         'recommended_formats': list(rng.choice(formats, 3, replace=False)),
+                         'metrics': metrics, 'score': round(sum(metrics.values()) / len(metrics), 1)})
+    # Leaderboard refreshes keep asking about the same opportunities
+    opportunities = [distinct[i] for i in rng.integers(n_distinct, size=n_opportunities)]
+    
+    started = time.perf_counter()
+    for opportunity in opportunities:
+        model.predict_one(opportunity)
+    single = time.perf_counter() - started
+    model._cache.clear()
+    model.cache_hits = model.cache_misses = 0
+    
+    started = time.perf_counter()
+    model.predict(opportunities)
+    batched = time.perf_counter() - started
+    hit_rate = model.cache_hits / (model.cache_hits + model.cache_misses)
+    
+    started = time.perf_counter()
+    model.predict_matrix(model.feature_matrix(opportunities))
+    cached = time.perf_counter() - started
+    started = time.perf_counter()
+    model.predict_matrix(model.feature_matrix(opportunities, cache=False))
+    uncached = time.perf_counter() - started
+    
+    generator = ContentGenerator(engagement=model)
+    started = time.perf_counter()
+    for opportunity in distinct[:200]:
+        generator.create_content_package(opportunity).materialize()
+    templates = (time.perf_counter() - started) / 200
+    
+    print(f"engagement: {model.n_features} features -> {len(model.platforms)} platforms x 3 targets")
+    print(f"  training      {training * 1000:9.1f} ms for {n_train:,} simulated outcomes")
+    print(f"  per package   {single / n_opportunities * 1e6:9.1f} us/package (predict_one in a loop)")
+    print(f"  batched       {batched / n_opportunities * 1e6:9.1f} us/package, {n_opportunities:,} in "
+          f"{batched * 1000:.1f} ms, feature cache hit rate {hit_rate:.1%}")
+    print(f"  inference     {cached / n_opportunities * 1e6:9.1f} us/package with cached features, "
+          f"{uncached / n_opportunities * 1e6:.1f} without (features + matmul, no result dicts)")
+    print(f"  templates     {templates * 1e6:9.1f} us/package for a whole template package, predictions included")
+
+def _disk_usage(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(directory, name))
+               for directory, _, files in os.walk(path) for name in files)
+
+def bench_export(n_packages=100_000, n_distinct=500, n_generated=20_000):
+    """Streaming NDJSON / Parquet export and read-back vs materializing the whole list first"""
+    generator = ContentGenerator()
+    opportunities = [{'title': f"Explain topic {i}", 'trend': f"Topic {i}", 'brief': '', 'audience': 'developers'}
+                     for i in range(n_distinct)]
+    pool = [generator.create_content_package(opportunity).materialize() for opportunity in opportunities]
+    
+    def packages():
+        return (pool[i % n_distinct] for i in range(n_packages))
+    
+    directory = tempfile.mkdtemp(prefix='contentforge-export-')
+    try:
+        def materialized():
+            records = [package_record(package) for package in packages()]
+            with open(os.path.join(directory, 'list.json'), 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False)
+        
+        print(f"export: {n_packages:,} packages ({n_distinct} distinct, already generated)")
+        _, seconds, peak = _measure(materialized)
+        print(f"  list + json.dump  {n_packages / seconds:9,.0f} packages/s  peak {peak / 2**20:7.1f} MB")
+        for label, name in [('ndjson', 'packages.ndjson'), ('ndjson.gz', 'packages.ndjson.gz'),
+                            ('parquet', 'parquet')]:
+            path = os.path.join(directory, name)
+            _, seconds, peak = _measure(lambda: export_packages(packages(), path))
+            size = _disk_usage(path)
+            _, read_seconds, read_peak = _measure(lambda: sum(1 for _ in read_packages(path)))
+            print(f"  {label:<16}  {n_packages / seconds:9,.0f} packages/s  peak {peak / 2**20:7.1f} MB  "
+                  f"{size / 2**20:6.1f} MB on disk  read back {n_packages / read_seconds:9,.0f} packages/s "
+                  f"(peak {read_peak / 2**20:.1f} MB)")
+        
+        # End to end: packages stream from the generator's pool straight into the file
+        fresh = [{'title': f"Explain topic {i}", 'trend': f"Topic {i % 2000}", 'brief': ''}
+                 for i in range(n_generated)]
+        started = time.perf_counter()
+        for _, package in generator.create_content_packages(fresh, max_workers=4):
+            package.materialize()
+        generate = time.perf_counter() - started
+        started = time.perf_counter()
+        export_packages((package for _, package in generator.create_content_packages(fresh, max_workers=4)),
+                        os.path.join(directory, 'generated.ndjson'))
+        both = time.perf_counter() - started
+        print(f"  generate only     {n_generated / generate:9,.0f} packages/s")
+        print(f"  generate + ndjson {n_generated / both:9,.0f} packages/s ({n_generated:,} new packages)")
+    finally:
+        shutil.rmtree(directory)
+
+def bench_pipeline(n_mentions=2_000, n_opportunities=8, n_chunks=4, runs=3):
+    """Monitor -> Discover -> Create one stage after another vs overlapped on the Pipeline engine"""
+    latency = {'tweet': 0.05, 'linkedin': 0.08, 'image_prompt': 0.04, 'video_script': 0.12}
+    formats = list(latency)
+    monitor, discoverer, index = MediaMonitor(), ContentDiscoverer(), OpportunityIndex()
+    monitor.get_current_trends()
+    stages = SnapshotStages(monitor, discoverer, index, _SlowGenerator(latency), n_mentions, n_opportunities, formats,
+                            chunks=n_chunks)
+    
+    def sequential():
+        started = time.perf_counter()
+        opportunities = list(stages.discover_stage(list(stages.monitor_stage(None))))
+        first = None
+        for _ in stages.create_stage(opportunities):
+            first = first or time.perf_counter() - started
+        return time.perf_counter() - started, first
+    
+    def pipelined():
+        pipeline = stages.pipeline()
+        started = time.perf_counter()
+        first = None
+        for _ in pipeline.run():
+            first = first or time.perf_counter() - started
+        return time.perf_counter() - started, first, pipeline.stats
+    
+    print(f"pipeline: {n_mentions:,} new mentions in {n_chunks} chunks -> top {n_opportunities} opportunities -> "
+          f"{len(formats)} formats each, simulated per-format latency {sum(latency.values()) * 1000:.0f} ms per package")
+    sequential_runs = [sequential() for _ in range(runs)]
+    pipelined_runs = [pipelined() for _ in range(runs)]
+    total, first = np.median([run[:2] for run in sequential_runs], axis=0)
+    print(f"  sequential   {total * 1000:7.0f} ms total, first package after {first * 1000:.0f} ms")
+    total, first = np.median([run[:2] for run in pipelined_runs], axis=0)
+    print(f"  pipelined    {total * 1000:7.0f} ms total, first package after {first * 1000:.0f} ms")
+    for stats in pipelined_runs[-1][2]:
+        print(f"    {stats.name:<9} {stats.items:3d} items  busy {stats.busy * 1000:6.0f} ms  "
+              f"first output {stats.first_output * 1000:6.0f} ms  done {stats.finished * 1000:6.0f} ms")
+
+def bench_snapshots(viewer_counts=(1, 4, 16), duration=6.0, interval=2.0, render_every=0.5, n_mentions=1_000):
+    """Server CPU as viewers grow: every session refreshing for itself vs one shared snapshot service"""
+    monitor, discoverer, index = MediaMonitor(), ContentDiscoverer(), OpportunityIndex()
+    generator = ContentGenerator(cache=PackageCache())
+    monitor.get_current_trends()
+    stages = SnapshotStages(monitor, discoverer, index, generator, n_mentions, 3,
+                            ['tweet', 'linkedin', 'image_prompt', 'video_script'])
+    shared = threading.Lock()
+    
+    def build():
+        packages = {opportunity.title: package for opportunity, package in stages.pipeline().run()}
+        return {'trends': monitor.store.copy(writeable=False), 'timeline': monitor.history.timeline(hours=24),
+                'packages': packages}
+    
+    def render(trends, timeline):
+        # What a rerun does with the data: the trends table and the timeline chart's series
+        trends.to_frame()
+        timeline['mentions'].to_numpy().sum()
+    
+    def per_session(stop, latencies):
+        # Before: each session pipelines into its own state and recomputes the timeline on every rerun
+        refreshed = 0.0
+        while not stop.is_set():
+            started = time.perf_counter()
+            with shared:
+                if started - refreshed >= interval:
+                    build()
+                    refreshed = started
+                render(monitor.store, monitor.history.timeline(hours=24))
+            latencies.append(time.perf_counter() - started)
+            stop.wait(render_every)
+    
+    def from_snapshot(service, stop, latencies):
+        while not stop.is_set():
+            started = time.perf_counter()
+            snapshot = service.current()
+            render(snapshot.trends, snapshot.timeline)
+            latencies.append(time.perf_counter() - started)
+            stop.wait(render_every)
+    
+    def measure(target, viewers, service=None):
+        stop, latencies = threading.Event(), []
+        args = (stop, latencies) if service is None else (service, stop, latencies)
+        threads = [threading.Thread(target=target, args=args, daemon=True) for _ in range(viewers)]
+        cpu, wall = time.process_time(), time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        return cpu / wall, np.percentile(latencies, 50), np.percentile(latencies, 95), len(latencies)
+    
+    print(f"snapshots: {duration:.0f} s per run, data refreshed every {interval:.0f} s, each viewer rerenders every "
+          f"{render_every * 1000:.0f} ms, {n_mentions:,} new mentions per refresh")
+    for viewers in viewer_counts:
+        results = [('per session', measure(per_session, viewers))]
+        service = SnapshotService(build, interval=interval, max_staleness=2 * interval)
+        service.refresh()
+        service.start()
+        builds = service.builds
+        results.append(('shared', measure(from_snapshot, viewers, service)))
+        service.stop()
+        for label, (cpu, p50, p95, renders) in results:
+            extra = f", {service.builds - builds} refreshes" if label == 'shared' else ''
+            print(f"  {viewers:3d} viewers  {label:<11}  CPU {cpu:6.1%}  render p50 {p50 * 1000:7.1f} ms  "
+                  f"p95 {p95 * 1000:7.1f} ms  ({renders} renders{extra})")
+
+def bench_lazy(n_packages=20):
+    """Time to the first viewable format: lazy package vs generating every section up front"""
+    latency = {'tweet': 0.05, 'linkedin': 0.08, 'image_prompt': 0.04, 'video_script': 0.12}
+    formats = list(latency)
+    generator = _SlowGenerator(latency)
+    opportunities = [{'title': f"Explain topic {i}", 'trend': f"Topic {i}", 'brief': ''} for i in range(n_packages)]
+    
+    def run(eager):
+        first = total = 0.0
+        for opportunity in opportunities:
+            started = time.perf_counter()
+            package = generator.create_content_package(opportunity, formats)
+            if eager:
+                package.materialize()
+            package['formats']['tweet']
+            first += time.perf_counter() - started
+            package.to_dict()
+            total += time.perf_counter() - started
+        return first / n_packages, total / n_packages
+    
+    eager_first, eager_total = run(eager=True)
+    lazy_first, lazy_total = run(eager=False)
+    print(f"lazy: {n_packages} packages x {len(formats)} formats, simulated per-format latency "
+          f"{sum(latency.values()) * 1000:.0f} ms per package")
+    print(f"  eager   first tab after {eager_first * 1000:6.1f} ms, full package {eager_total * 1000:6.1f} ms")
+    print(f"  lazy    first tab after {lazy_first * 1000:6.1f} ms, full package {lazy_total * 1000:6.1f} ms")
+
+def bench_cache(n_opportunities=50, repeats=4):
+    """Uncached vs memory-tier vs disk-tier package generation under model-like latency"""
+    import shutil
+    import tempfile
+    latency = {'tweet': 0.01, 'linkedin': 0.01, 'image_prompt': 0.01, 'video_script': 0.01}
+    formats = list(latency)
+    opportunities = [
+        {'title': f"Explain topic {i} to developers", 'trend': f"Topic {i}", 'brief': f"Brief {i}",
+         'audience': 'developers', 'recommended_formats': ['thread', 'blog post'], 'score': 7.0}
+        for i in range(n_opportunities)
+    ]
+    requests = opportunities * repeats
+    directory = tempfile.mkdtemp()
+    try:
+        def run(generator):
+            started = time.perf_counter()
+            for opportunity in requests:
+                generator.create_content_package(opportunity, formats).materialize()
+            return time.perf_counter() - started
+        
+        uncached = run(_SlowGenerator(latency))
+        cached = _SlowGenerator(latency, PackageCache(path=directory))
+        warming = run(cached)
+        # A fresh process: empty memory tier, every package already on disk
+        restarted = _SlowGenerator(latency, PackageCache(path=directory))
+        started = time.perf_counter()
+        for opportunity in opportunities:
+            restarted.create_content_package(opportunity, formats).materialize()
+        disk = time.perf_counter() - started
+        memory = run(restarted)
+    finally:
+        shutil.rmtree(directory)
+    per = lambda seconds, n: seconds / n * 1e6
+    print(f"cache: {n_opportunities} opportunities requested {repeats}x each, "
+          f"{sum(latency.values()) * 1000:.0f} ms simulated generation per package")
+    print(f"  uncached          {uncached:6.2f} s  {per(uncached, len(requests)):9.0f} us/request")
+    print(f"  first pass        {warming:6.2f} s  {per(warming, len(requests)):9.0f} us/request "
+          f"(hit rate {cached.cache.stats()['hit_rate']:.0%})")
+    print(f"  disk tier         {disk:6.3f} s  {per(disk, n_opportunities):9.0f} us/request")
+    print(f"  memory tier       {memory:6.3f} s  {per(memory, len(requests)):9.1f} us/request")
+
+def bench_llm(n_prompts=128, max_tokens=64, max_in_flight=4):
+    """Unbatched vs batched completions against the stub model server, plus streaming time to first token"""
+    import asyncio
+    
+    async def complete_all(server, max_batch_size):
+        async with LLMClient(server.url, max_batch_size=max_batch_size, max_in_flight=max_in_flight) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(client.complete(f"Write a tweet about topic {i}", max_tokens)
+                                   for i in range(n_prompts)))
+            return time.perf_counter() - started, client.stats
+    
+    async def stream_one(server):
+        async with LLMClient(server.url) as client:
+            started = time.perf_counter()
+            first = None
+            async for _ in client.stream("Write a LinkedIn post about Web3", 256):
+                first = first or time.perf_counter() - started
+            return first, time.perf_counter() - started, client.stats['completion_tokens']
+    
+    async def run():
+        async with StubModelServer(latency=0.05, token_latency=0.001) as server:
+            results = [(size, await complete_all(server, size)) for size in (1, 8, 32)]
+            return results, await stream_one(server)
+    
+    results, (first, total, tokens) = asyncio.run(run())
+    print(f"llm: {n_prompts} concurrent prompts, {max_tokens} max tokens, {max_in_flight} requests in flight, "
+          f"stub cost 50 ms + 1 ms/token per request")
+    for size, (seconds, stats) in results:
+        print(f"  batch <= {size:2d}   {seconds:6.2f} s  {stats['requests']:4d} requests  "
+              f"{stats['prompts'] / max(stats['batches'], 1):5.1f} prompts/batch  "
+              f"{stats['completion_tokens'] / seconds:8.0f} tokens/s")
+    print(f"  stream        first token after {first * 1000:.0f} ms, {tokens} tokens in {total:.2f} s")
+
+def bench_sources(n_topics=16, posts_per_request=20, requests_per_second=50.0):
+    """Fetching every platform from the stub server: events/s and retries under latency and throttling"""
+    import asyncio
+    
+    latency = {'Twitter': 0.02, 'Reddit': 0.2, 'News': 0.05, 'YouTube': 0.05, 'TikTok': 0.1}
+    scenarios = [
+        ('no latency', {}, {}),
+        ('latency', latency, {}),
+        ('latency + 429s', latency, {'Twitter': 0.2, 'Reddit': 0.3, 'News': 0.1})
+    ]
+    topics = [f"Topic {i}" for i in range(n_topics)]
+    
+    async def fetch(latency, throttle, max_concurrency):
+        server = StubPlatformServer(latency=latency, throttle=throttle, posts_per_request=posts_per_request)
+        async with server:
+            fetcher = SourceFetcher([adapter(server.url, max_concurrency, requests_per_second)
+                                     for adapter in ADAPTERS.values()])
+            started = time.perf_counter()
+            events = 0
+            async for _ in fetcher.stream(topics):
+                events += 1
+            return events, time.perf_counter() - started, fetcher.stats
+    
+    print(f"sources: {len(ADAPTERS)} platforms x {n_topics} topics, {posts_per_request} posts per response, "
+          f"{requests_per_second:.0f} requests/s per platform")
+    for label, latency, throttle in scenarios:
+        for max_concurrency in (1, 4):
+            events, seconds, stats = asyncio.run(fetch(latency, throttle, max_concurrency))
+            total = {key: sum(platform[key] for platform in stats.values())
+                     for key in ('requests', 'retries', 'errors')}
+            slowest = max(stats, key=lambda platform: stats[platform]['seconds'])
+            print(f"  {label:<15} {max_concurrency} per platform  {seconds * 1000:6.0f} ms  "
+                  f"{events / seconds:8,.0f} events/s  {total['requests']:4d} requests  {total['retries']:3d} retries  "
+                  f"{total['errors']} errors  (slowest: {slowest}, {stats[slowest]['retries']} retries)")
+
+BENCHMARKS = {
+    'heavy_hitters': bench_heavy_hitters,
+    'sentiment': bench_sentiment,
+    'emerging': bench_emerging,
+    'dedup': bench_dedup,
+    'scoring': bench_scoring,
+    'leaderboard': bench_leaderboard,
+    'brands': bench_brands,
+    'search': bench_search,
+    'generation': bench_generation,
+    'cache': bench_cache,
+    'llm': bench_llm,
+    'lazy': bench_lazy,
+    'hashtags': bench_hashtags,
+    'timing': bench_timing,
+    'engagement': bench_engagement,
+    'export': bench_export,
+    'pipeline': bench_pipeline,
+    'snapshots': bench_snapshots,
+    'sources': bench_sources
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
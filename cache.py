@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+
+# Opportunity fields that shape generated content (score and metrics change on every rescore, so they are left out)
+KEY_FIELDS = ('title', 'trend', 'brief', 'audience', 'recommended_formats')
+
+def package_key(opportunity, formats=(), tone=None, version=1):
+    """Stable content hash of everything a generated package depends on"""
+    payload = {field: opportunity.get(field) for field in KEY_FIELDS}
+    payload['recommended_formats'] = list(payload['recommended_formats'] or [])
+    payload['formats'] = sorted(formats)
+    payload['tone'] = tone
+    payload['version'] = version
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+class PackageCache:
+    """Content-addressed cache of generated content packages.
+
+    Entries are keyed by package_key(), so the same opportunity, formats,
+    tone and generator version map to the same package however they were
+    reached. An in-memory LRU holds up to `max_entries` packages; with a
+    path, packages are also pickled to one file per key and survive
+    restarts, and memory misses fall through to disk. Entries expire `ttl`
+    seconds after they were generated, matching how long a trend stays on
+    the leaderboard. Lazy packages are written to disk once fully
+    generated, so caching one never forces its unread formats.
+
+    Cached packages are shared, not copied: callers must not mutate them.
+    """
+    
+    def __init__(self, max_entries=256, ttl=6 * 3600, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()  # key -> (created_at, package), least recently used first
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.write_errors = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, key):
+        return key in self._entries
+    
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.pkl")
+    
+    def _remember(self, key, created_at, package):
+        self._entries[key] = (created_at, package)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def _load(self, key):
+        try:
+            with open(self._file(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+    
+    def get(self, key, now=None):
+        """Cached package for a key, or None if it is missing or expired"""
+        now = time.time() if now is None else now
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self.expirations += 1
+        if self.path is not None:
+            entry = self._load(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._remember(key, *entry)
+                    self.disk_hits += 1
+                    return entry[1]
+                self.expirations += 1
+                self._discard(key)
+        self.misses += 1
+        return None
+    
+    def put(self, key, package, now=None):
+        created_at = time.time() if now is None else now
+        self._remember(key, created_at, package)
+        if self.path is not None:
+            package.when_complete(lambda: self._write(key, created_at, package))
+        return package
+    
+    def _write(self, key, created_at, package):
+        # Runs on whichever thread completed the package, so a failed write is counted, not raised into
+        # that reader; the package stays cached in memory either way
+        temp = None
+        try:
+            # Write to a temp file and rename, so readers never see half a pickle
+            directory = os.path.dirname(self._file(key))
+            os.makedirs(directory, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((created_at, package), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, self._file(key))
+        except Exception:
+            self.write_errors += 1
+            if temp is not None:
+                self._remove(temp)
+    
+    def get_or_create(self, key, build, now=None):
+        """Cached package for a key, calling build() and caching the result on a miss"""
+        package = self.get(key, now)
+        if package is None:
+            package = self.put(key, build(), now)
+        return package
+    
+    def _discard(self, key):
+        self._remove(self._file(key))
+    
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    
+    def prune(self, now=None):
+        """Drop expired entries from memory and disk; returns how many were removed"""
+        now = time.time() if now is None else now
+        expired = [key for key, (created_at, _) in self._entries.items() if now - created_at >= self.ttl]
+        for key in expired:
+            del self._entries[key]
+        removed = set(expired)
+        if self.path is not None:
+            for directory, _, files in os.walk(self.path):
+                for name in files:
+                    key = name[:-len('.pkl')]
+                    if not name.endswith('.pkl') or key in self._entries:
+                        continue
+                    entry = self._load(key)
+                    if entry is None or now - entry[0] >= self.ttl:
+                        self._discard(key)
+                        removed.add(key)
+        self.expirations += len(removed)
+        return len(removed)
+    
+    def clear(self):
+        self._entries.clear()
+        if self.path is not None:
+            for directory, _, files in os.walk(self.path):
+                for name in files:
+                    if name.endswith('.pkl'):
+                        os.remove(os.path.join(directory, name))
+    
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'write_errors': self.write_errors,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
\ No newline at end of file
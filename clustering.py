@@ -0,0 +1,133 @@
+import re
+import zlib
+import numpy as np
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+class TopicClusterer:
+    """Groups near-identical topic names and merges their trend rows.
+
+    Names become hashed TF-IDF vectors over padded character n-grams, so
+    "Web3" and "Web3 Developments" share features while "Climate Tech" and
+    "Sustainable Tech" only share a low-IDF suffix. Cosine similarities are
+    computed sparsely: only name pairs that share a feature are ever scored,
+    and features present in more than `max_df` names are skipped. Clusters
+    are formed greedily by volume, so every member is similar to its
+    cluster's leader and chains do not form.
+
+    Pairs at or above `strong_threshold` always merge. Pairs between
+    `threshold` and `strong_threshold` merge only if every word of the
+    shorter name appears in the longer one: "Biotech" joins "Biotech
+    Breakthroughs", but "Quantum Computing" and "Edge Computing" stay apart
+    even though the shared word makes them fairly similar.
+    """
+    
+    def __init__(self, threshold=0.35, strong_threshold=0.7, ngram=3, n_features=2 ** 18, max_df=50):
+        self.threshold = threshold
+        self.strong_threshold = strong_threshold
+        self.ngram = ngram
+        self.n_features = n_features
+        self.max_df = max_df
+        self._features = {}  # name -> (feature ids, counts)
+        self._words = {}     # name -> set of lowercase words
+        self.aliases = {}    # merged name -> leader name from the latest merge
+    
+    def _featurize(self, name):
+        cached = self._features.get(name)
+        if cached is None:
+            if len(self._features) > 1_000_000:
+                self._features.clear()
+                self._words.clear()
+            grams = []
+            for word in _WORD.findall(name.lower()):
+                padded = f" {word} "
+                grams.extend(padded[i:i + self.ngram] for i in range(max(1, len(padded) - self.ngram + 1)))
+            ids = np.array([zlib.crc32(gram.encode()) % self.n_features for gram in grams], np.int64)
+            cached = self._features[name] = np.unique(ids, return_counts=True)
+            self._words[name] = frozenset(_WORD.findall(name.lower()))
+        return cached
+    
+    def similarities(self, names):
+        """(left, right, cosine) for every pair of names sharing a feature, left < right"""
+        n = len(names)
+        features = [self._featurize(name) for name in names]
+        docs = np.repeat(np.arange(n), [len(ids) for ids, _ in features])
+        if not len(docs):
+            return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0)
+        ids = np.concatenate([ids for ids, _ in features])
+        counts = np.concatenate([counts for _, counts in features])
+        
+        # Sublinear TF x smoothed IDF, L2-normalized per name
+        distinct, inverse, df = np.unique(ids, return_inverse=True, return_counts=True)
+        idf = np.log((1 + n) / (1 + df)) + 1
+        weights = (1 + np.log(counts)) * idf[inverse]
+        norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=n))
+        weights /= norms[docs]
+        
+        # Pair up the names inside each feature's posting list
+        keep = df[inverse] <= self.max_df
+        order = np.lexsort((docs[keep], inverse[keep]))
+        feature, doc, weight = inverse[keep][order], docs[keep][order], weights[keep][order]
+        group_end = np.searchsorted(feature, feature, side='right')
+        partners = group_end - np.arange(len(feature)) - 1
+        left = np.repeat(np.arange(len(feature)), partners)
+        starts = np.cumsum(partners) - partners
+        right = left + np.arange(len(left)) - np.repeat(starts, partners) + 1
+        codes = doc[left] * n + doc[right]
+        pairs, pair_index = np.unique(codes, return_inverse=True)
+        cosine = np.bincount(pair_index, weights=weight[left] * weight[right])
+        return pairs // n, pairs % n, cosine
+    
+    def cluster(self, names, volumes=None):
+        """Leader index for every name; leaders are visited by descending volume"""
+        n = len(names)
+        volumes = np.ones(n) if volumes is None else np.asarray(volumes, float)
+        left, right, cosine = self.similarities(names)
+        similar = cosine >= self.threshold
+        neighbours = [[] for _ in range(n)]
+        words = self._words
+        for a, b, score in zip(left[similar].tolist(), right[similar].tolist(), cosine[similar].tolist()):
+            if score < self.strong_threshold:
+                words_a, words_b = words[names[a]], words[names[b]]
+                if not (words_a <= words_b or words_b <= words_a):
+                    continue
+            neighbours[a].append(b)
+            neighbours[b].append(a)
+        leader = np.full(n, -1, np.int64)
+        for i in np.argsort(-volumes, kind='stable').tolist():
+            if leader[i] >= 0:
+                continue
+            leader[i] = i
+            for j in neighbours[i]:
+                if leader[j] < 0:
+                    leader[j] = i
+        return leader
+    
+    def merge(self, snapshot):
+        """Collapse a trend snapshot (see discovery.trend_snapshot) to one row per cluster.
+
+        Volumes and velocities add up; growth and sentiment are
+        volume-weighted means; a cluster is emerging if any member is.
+        """
+        names = snapshot['topics']
+        volume = np.asarray(snapshot['volume'], float)
+        leader = self.cluster(names, volume)
+        leaders, group = np.unique(leader, return_inverse=True)
+        self.aliases = {names[i]: names[j] for i, j in enumerate(leader.tolist()) if i != j}
+        if len(leaders) == len(names):
+            return snapshot
+        merged_volume = np.bincount(group, weights=volume, minlength=len(leaders))
+        weight = np.where(merged_volume[group] > 0, volume / np.maximum(merged_volume[group], 1), 0)
+        
+        def weighted(column):
+            return np.bincount(group, weights=np.asarray(snapshot[column], float) * weight, minlength=len(leaders))
+        
+        return {
+            'topics': [names[i] for i in leaders.tolist()],
+            'volume': merged_volume,
+            'growth': weighted('growth'),
+            'velocity': np.bincount(group, weights=np.asarray(snapshot['velocity'], float), minlength=len(leaders)),
+            'sentiment': weighted('sentiment'),
+            'emerging': np.bincount(group, weights=np.asarray(snapshot['emerging'], float),
+                                    minlength=len(leaders)) > 0
+        }
@@ -0,0 +1,91 @@
+import hashlib
+import re
+from collections import deque
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9#@']+")
+_URL = re.compile(r"https?://\S+")
+_BITS = np.arange(64, dtype=np.uint64)
+# Boilerplate that reposts and quote-tweets add around the original text;
+# @handles and links are dropped as well
+_STOPWORDS = {'rt', 'via', 'the', 'a', 'an', 'and', 'of', 'to', 'in', 'on', 'is', 'for', 'qt'}
+
+def simhash(text):
+    """64-bit SimHash over word unigrams and bigrams"""
+    tokens = [token for token in _TOKEN.findall(_URL.sub(' ', text.lower())) if token not in _STOPWORDS and token[0] != '@']
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    hashes = np.frombuffer(
+        b''.join(hashlib.blake2b(feature.encode(), digest_size=8).digest() for feature in features),
+        dtype='<u8'
+    )
+    votes = ((hashes[:, None] >> _BITS) & np.uint64(1)).sum(axis=0) * 2 > len(features)
+    return int(np.packbits(votes[::-1]).view('>u8')[0])
+
+class NearDuplicateFilter:
+    """Drops reposts and near-identical posts before they are counted.
+
+    Signatures are 64-bit SimHashes; two posts are duplicates when their
+    signatures differ in at most `max_distance` bits. The signature is split
+    into max_distance + 1 bands, so any such pair shares at least one band
+    exactly and lookups only compare against that band's bucket. Entries
+    expire `ttl` seconds after they were first seen (event time) and the
+    index never holds more than `max_entries` signatures.
+    """
+    
+    def __init__(self, max_distance=3, ttl=6 * 3600, max_entries=100_000):
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bands = max_distance + 1
+        self._band_width = 64 // self.bands
+        self._index = [{} for _ in range(self.bands)]  # band value -> {signature: first seen}
+        self._order = deque()  # (first seen, signature), oldest first
+        self.seen = 0
+        self.duplicates = 0
+        self.duplicates_by_platform = {}
+    
+    def __len__(self):
+        return len(self._order)
+    
+    def _band_values(self, signature):
+        mask = (1 << self._band_width) - 1
+        return [(signature >> (band * self._band_width)) & mask for band in range(self.bands)]
+    
+    def _expire(self, now):
+        while self._order and (self._order[0][0] <= now - self.ttl or len(self._order) > self.max_entries):
+            first_seen, signature = self._order.popleft()
+            for band, value in zip(self._index, self._band_values(signature)):
+                bucket = band.get(value)
+                if bucket is not None and bucket.get(signature) == first_seen:
+                    del bucket[signature]
+                    if not bucket:
+                        del band[value]
+    
+    def is_duplicate(self, text, timestamp, platform=None):
+        """Check a post against the index and remember it if it is new"""
+        self.seen += 1
+        self._expire(timestamp)
+        signature = simhash(text)
+        values = self._band_values(signature)
+        for band, value in zip(self._index, values):
+            for candidate in band.get(value, ()):
+                if (candidate ^ signature).bit_count() <= self.max_distance:
+                    self.duplicates += 1
+                    if platform is not None:
+                        self.duplicates_by_platform[platform] = self.duplicates_by_platform.get(platform, 0) + 1
+                    return True
+        for band, value in zip(self._index, values):
+            band.setdefault(value, {})[signature] = timestamp
+        self._order.append((timestamp, signature))
+        return False
+    
+    def stats(self):
+        return {
+            'seen': self.seen,
+            'duplicates': self.duplicates,
+            'collapsed_share': self.duplicates / self.seen if self.seen else 0.0,
+            'indexed': len(self),
+            'by_platform': dict(self.duplicates_by_platform)
+        }
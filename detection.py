@@ -0,0 +1,90 @@
+import time
+import numpy as np
+
+class EmergingTrendDetector:
+    """Online breakout detection on per-topic mention velocity.
+
+    Every closed time bucket updates an exponentially weighted mean and
+    variance per topic, all topics at once as NumPy vectors. A topic starts
+    emerging when its bucket count sits `threshold` standard deviations and
+    `min_ratio` times above its running mean, and stays emerging until the
+    z-score falls back under `exit_threshold`. Detection latency is one bucket plus `last_update_seconds`.
+    """
+    
+    def __init__(self, alpha=0.05, threshold=4.0, exit_threshold=1.0, min_count=5, min_ratio=3.0, warmup=30,
+                 capacity=16):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.exit_threshold = exit_threshold
+        self.min_count = min_count
+        self.min_ratio = min_ratio
+        self.warmup = warmup
+        self.mean = np.zeros(capacity)
+        self.var = np.zeros(capacity)
+        self.updates = np.zeros(capacity, np.int64)
+        self.zscore = np.zeros(capacity)
+        self.emerging = np.zeros(capacity, bool)
+        self.flagged_at = np.full(capacity, np.nan)  # bucket end time of the latest breakout
+        self.last_update_seconds = 0.0
+    
+    def _grow(self, size):
+        extra = max(size, 2 * len(self.mean)) - len(self.mean)
+        self.mean = np.concatenate([self.mean, np.zeros(extra)])
+        self.var = np.concatenate([self.var, np.zeros(extra)])
+        self.updates = np.concatenate([self.updates, np.zeros(extra, np.int64)])
+        self.zscore = np.concatenate([self.zscore, np.zeros(extra)])
+        self.emerging = np.concatenate([self.emerging, np.zeros(extra, bool)])
+        self.flagged_at = np.concatenate([self.flagged_at, np.full(extra, np.nan)])
+    
+    def reset(self, topic_id):
+        """Forget a topic's history, e.g. when its row is reused"""
+        if topic_id >= len(self.mean):
+            return
+        self.mean[topic_id] = self.var[topic_id] = self.zscore[topic_id] = 0
+        self.updates[topic_id] = 0
+        self.emerging[topic_id] = False
+        self.flagged_at[topic_id] = np.nan
+    
+    def flags(self, topic_ids):
+        """Emerging flag per topic ID (False for topics never updated)"""
+        topic_ids = np.asarray(topic_ids, np.intp)
+        known = topic_ids < len(self.emerging)
+        flags = np.zeros(len(topic_ids), bool)
+        flags[known] = self.emerging[topic_ids[known]]
+        return flags
+    
+    def update(self, counts, bucket_end):
+        """Fold one closed bucket of per-topic counts in; return newly emerging topic IDs"""
+        started = time.perf_counter()
+        counts = np.asarray(counts, float)
+        if len(counts) > len(self.mean):
+            self._grow(len(counts))
+        n = len(counts)
+        mean, var = self.mean[:n], self.var[:n]
+        
+        # Score against the history before this bucket, then fold it in. The
+        # +1 in the denominator keeps near-silent topics from flagging on noise.
+        z = (counts - mean) / np.sqrt(var + 1)
+        ready = self.updates[:n] >= self.warmup
+        was_emerging = self.emerging[:n].copy()
+        entering = ready & (z >= self.threshold) & (counts >= np.maximum(self.min_count, self.min_ratio * mean))
+        staying = was_emerging & (z >= self.exit_threshold)
+        self.emerging[:n] = entering | staying
+        newly = np.flatnonzero(entering & ~was_emerging)
+        self.flagged_at[newly] = bucket_end
+        self.zscore[:n] = z
+        
+        # Plain running averages until 1/t drops below alpha, so young topics
+        # are not biased towards zero. Emerging topics adapt ten times slower,
+        # so a sustained breakout is not absorbed into "normal" within a few
+        # buckets.
+        alpha = np.maximum(self.alpha, 1 / (self.updates[:n] + 1))
+        alpha = np.where(self.emerging[:n], alpha * 0.1, alpha)
+        diff = counts - mean
+        increment = alpha * diff
+        mean += increment
+        var[:] = (1 - alpha) * (var + diff * increment)
+        self.updates[:n] += 1
+        
+        self.last_update_seconds = time.perf_counter() - started
+        return newly
@@ -1,61 +1,184 @@
 import random
+import re
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from clustering import TopicClusterer
+from leaderboard import Leaderboard
+from records import TOPICS, Opportunity
+from scoring import METRICS, OpportunityScorer, trend_columns
 
 class ContentDiscoverer:
-    def __init__(self):
+    def __init__(self, weights=None, ttl=6 * 3600, cluster_topics=True):
+        # audience_fit holds a 0-10 prior per audience; sentiment_affinity says
+        # whether the angle suits positive (+1) or negative (-1) coverage
         self.opportunity_templates = [
             {
                 'title': "Explain {topic} to {audience}",
                 'audiences': ['beginners', 'business leaders', 'developers', 'students'],
-                'formats': ['explainer video', 'thread', 'blog post', 'infographic']
+                'formats': ['explainer video', 'thread', 'blog post', 'infographic'],
+                'audience_fit': [7.5, 8.0, 7.0, 6.5],
+                'sentiment_affinity': 0.5,
+                'efficiency': 8.5
             },
             {
                 'title': "Counter-misinformation about {topic}",
                 'audiences': ['general public', 'industry professionals'],
-                'formats': ['fact-check article', 'video debunk', 'twitter thread']
+                'formats': ['fact-check article', 'video debunk', 'twitter thread'],
+                'audience_fit': [7.5, 7.0],
+                'sentiment_affinity': -1.0,
+                'efficiency': 8.0
             },
             {
                 'title': "Future implications of {topic}",
                 'audiences': ['strategists', 'investors', 'policy makers'],
-                'formats': ['thought leadership', 'research brief', 'podcast']
+                'formats': ['thought leadership', 'research brief', 'podcast'],
+                'audience_fit': [8.0, 7.5, 7.0],
+                'sentiment_affinity': 1.0,
+                'efficiency': 7.0
             }
         ]
+        self.scorer = OpportunityScorer(self.opportunity_templates, weights)
+        # Live ranking of each trend's best opportunity, fed by update_trends()
+        self.leaderboard = Leaderboard()
+        self.ttl = ttl
+        self._scale = None
+        # Near-identical topics ("Web3" / "Web3 Developments") are merged before scoring
+        self.clusterer = TopicClusterer() if cluster_topics else None
+    
+    def analyze_trends(self, trends, limit=4, one_per_trend=True):
+        """Score every (trend, template, audience) candidate and return the best `limit` opportunities.
+
+        `trends` is a TrendStore or a list of trend records/dicts.
+        """
+        trends = self.merge_similar(trends)
+        rows, pairs, scores, metrics = self.scorer.top(trends, limit, one_per_trend)
+        topic_ids = self._topic_ids(trends, rows)
+        return [
+            self._build_opportunity(i + 1, topic_id, pair, score, values)
+            for i, (topic_id, pair, score, values) in enumerate(zip(topic_ids, pairs.tolist(), scores.tolist(),
+                                                                    metrics.tolist()))
+        ]
+    
+    def analyze_brand(self, snapshot, brand, limit=4, seed=0):
+        """Best opportunities for one brand profile from a trend_snapshot().
+
+        A brand is a dict with a 'name' and optional 'topics' (whole words or
+        phrases matched against topic names), 'audiences' and 'formats'.
+        Briefs and format picks come from a generator seeded by the brand
+        name, so the same snapshot always yields the same result for a brand.
+        """
+        rng = random.Random(seed ^ zlib.crc32(brand['name'].encode()))
+        topic_ids = [TOPICS.intern(topic) for topic in snapshot['topics']]
+        trend_mask = None
+        if brand.get('topics'):
+            watched = re.compile(r'\b(?:' + '|'.join(re.escape(keyword.lower()) for keyword in brand['topics']) + r')\b')
+            trend_mask = np.array([watched.search(TOPICS.lower(topic_id)) is not None for topic_id in topic_ids], bool)
+        pair_mask = None
+        if brand.get('audiences'):
+            audiences = set(brand['audiences'])
+            pair_mask = np.array([audience in audiences for audience in self.scorer.pair_audience], bool)
+        rows, pairs, scores, metrics = self.scorer.top(snapshot, limit, trend_mask=trend_mask, pair_mask=pair_mask)
+        return [
+            self._build_opportunity(i + 1, topic_ids[row], pair, score, values, rng, brand.get('formats'))
+            for i, (row, pair, score, values) in enumerate(zip(rows.tolist(), pairs.tolist(), scores.tolist(),
+                                                               metrics.tolist()))
+        ]
+    
+    def analyze_brands(self, brands, trends, limit=4, seed=0, workers=None, chunk_size=8):
+        """Run analyze_brand for many brand profiles over one shared trend snapshot.
+
+        Brands are fanned out over a process pool in chunks; the snapshot is
+        sent to each worker once. Returns {brand name: [Opportunity, ...]}.
+        workers=0 runs everything in this process.
+        """
+        snapshot = trend_snapshot(self.merge_similar(trends))
+        if workers == 0:
+            return {brand['name']: self.analyze_brand(snapshot, brand, limit, seed) for brand in brands}
+        chunks = [brands[i:i + chunk_size] for i in range(0, len(brands), chunk_size)]
+        results = {}
+        with ProcessPoolExecutor(workers, initializer=_init_brand_worker,
+                                 initargs=(self.opportunity_templates, self.scorer.weights, snapshot)) as pool:
+            for chunk_result in pool.map(_analyze_brand_chunk, chunks, [limit] * len(chunks), [seed] * len(chunks)):
+                results.update(chunk_result)
+        return results
     
-    def analyze_trends(self, trends):
-        """Analyze trends and identify content opportunities"""
+    def update_trends(self, trends, now=None):
+        """Rescore the given (changed) trends into the live leaderboard.
+
+        Only these trends are scored; everything else keeps its rank until it
+        is updated again or expires `ttl` seconds after its last update.
+        """
+        now = time.time() if now is None else now
+        self.leaderboard.expire(now)
+        trends = self.merge_similar(trends)
+        if self.clusterer is not None:
+            # Topics folded into another cluster leader give up their own entry
+            for alias in self.clusterer.aliases:
+                alias_id = TOPICS.intern(alias)
+                if alias_id in self.leaderboard:
+                    self.leaderboard.remove(alias_id)
+        self._scale = self.scorer.running_scale(self._scale, trend_columns(trends))
+        pairs, scores, metrics = self.scorer.best_per_trend(trends, self._scale)
+        topic_ids = self._topic_ids(trends, range(len(pairs)))
+        for topic_id, pair, score, values in zip(topic_ids, pairs.tolist(), scores.tolist(), metrics.tolist()):
+            previous = self.leaderboard.item(topic_id) if topic_id in self.leaderboard else None
+            # Keep the built opportunity (brief, formats) while the winning angle is unchanged
+            opportunity = previous[3] if previous is not None and previous[0] == pair else None
+            self.leaderboard.push(topic_id, score, [pair, score, values, opportunity], expires_at=now + self.ttl)
+        return len(pairs)
+    
+    def top_opportunities(self, limit=4, now=None):
+        """Current best opportunities from the leaderboard, best first"""
+        self.leaderboard.expire(time.time() if now is None else now)
         opportunities = []
-        
-        for i, trend in enumerate(trends[:4]):  # Top 4 trends
-            template = random.choice(self.opportunity_templates)
-            title = template['title'].format(
-                topic=trend['topic'],
-                audience=random.choice(template['audiences'])
-            )
-            
-            score = random.uniform(6.5, 9.5)
-            
-            opportunity = {
-                'id': i + 1,
-                'title': title,
-                'trend': trend['topic'],
-                'score': round(score, 1),
-                'metrics': {
-                    'virality': round(random.uniform(6, 9), 1),
-                    'competition_gap': round(random.uniform(7, 10), 1),
-                    'audience_fit': round(random.uniform(6, 9), 1),
-                    'resource_efficiency': round(random.uniform(8, 10), 1)
-                },
-                'brief': self._generate_brief(trend['topic']),
-                'recommended_formats': random.sample(template['formats'], random.randint(2, 3)),
-                'timing': f"Within {random.randint(1, 6)} hours"
-            }
-            
+        for rank, (topic_id, _, entry) in enumerate(self.leaderboard.top(limit), start=1):
+            pair, score, values, opportunity = entry
+            if opportunity is None:
+                opportunity = entry[3] = self._build_opportunity(rank, topic_id, pair, score, values)
+            else:
+                opportunity.id = rank
+                opportunity.score = round(score, 1)
+                opportunity.metrics = dict(zip(METRICS, (round(value, 1) for value in values)))
             opportunities.append(opportunity)
-        
-        # Sort by score
-        opportunities.sort(key=lambda x: x['score'], reverse=True)
         return opportunities
     
-    def _generate_brief(self, topic):
+    def merge_similar(self, trends):
+        """Trends with near-identical topics merged into one row each (a trend_snapshot)"""
+        if self.clusterer is None:
+            return trends
+        return self.clusterer.merge(trend_snapshot(trends))
+    
+    def _topic_ids(self, trends, rows):
+        if isinstance(trends, dict):
+            return [TOPICS.intern(trends['topics'][row]) for row in rows]
+        if hasattr(trends, 'COLUMNS'):
+            return trends['topic_id'][list(rows)].tolist()
+        return [TOPICS.intern(trends[row]['topic']) for row in rows]
+    
+    def _build_opportunity(self, rank, topic_id, pair, score, values, rng=random, preferred_formats=None):
+        template = self.opportunity_templates[self.scorer.pair_template[pair]]
+        formats = template['formats']
+        if preferred_formats:
+            formats = [fmt for fmt in formats if fmt in preferred_formats] or formats
+        audience = self.scorer.pair_audience[pair]
+        topic = TOPICS.name(topic_id)
+        return Opportunity(
+            id=rank,
+            title=template['title'].format(topic=topic, audience=audience),
+            topic_id=topic_id,
+            score=round(score, 1),
+            metrics=dict(zip(METRICS, (round(value, 1) for value in values))),
+            brief=self._generate_brief(topic, rng),
+            recommended_formats=rng.sample(formats, min(len(formats), rng.randint(2, 3))),
+            timing=f"Within {rng.randint(1, 6)} hours",
+            audience=audience
+        )
+    
+    def _generate_brief(self, topic, rng=random):
         briefs = [
             f"Create accessible content explaining {topic} to non-experts, focusing on practical implications rather than technical details.",
             f"Address common misconceptions about {topic} with data-driven evidence and expert opinions.",
@@ -63,4 +186,29 @@ class ContentDiscoverer:
             f"Compare and contrast {topic} with similar technologies/trends, highlighting unique advantages.",
             f"Create a guide for businesses looking to implement or respond to {topic}, with actionable steps."
         ]
-        return random.choice(briefs)
\ No newline at end of file
+        return rng.choice(briefs)
+
+def trend_snapshot(trends):
+    """Picklable copy of a trend table: topic names plus the scoring columns"""
+    snapshot = dict(trend_columns(trends))
+    if hasattr(trends, 'COLUMNS'):
+        snapshot['topics'] = [trends.topics[topic_id] for topic_id in trends['topic_id'].tolist()]
+    elif isinstance(trends, dict):
+        snapshot['topics'] = list(trends['topics'])
+    else:
+        snapshot['topics'] = [trend['topic'] for trend in trends]
+    return snapshot
+
+# Per-process state for analyze_brands workers, set once by the pool initializer
+_worker = {}
+
+def _init_brand_worker(templates, weights, snapshot):
+    discoverer = ContentDiscoverer(weights)
+    discoverer.opportunity_templates = templates
+    discoverer.scorer.set_templates(templates)
+    _worker['discoverer'] = discoverer
+    _worker['snapshot'] = snapshot
+
+def _analyze_brand_chunk(brands, limit, seed):
+    discoverer, snapshot = _worker['discoverer'], _worker['snapshot']
+    return {brand['name']: discoverer.analyze_brand(snapshot, brand, limit, seed) for brand in brands}
\ No newline at end of file
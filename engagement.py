@@ -0,0 +1,154 @@
+import zlib
+from collections import OrderedDict
+import numpy as np
+
+from scoring import METRICS
+from timing import PLATFORMS
+
+TARGETS = ('engagement', 'reach', 'conversion')
+
+class EngagementModel:
+    """Ridge regression from opportunity features to per-platform outcomes.
+
+    Features are the opportunity's metric values and score plus hashed
+    one-hots of its audience and recommended formats, so unseen audiences
+    and formats need no vocabulary. One weight matrix maps them to
+    engagement (0-100), log reach and conversion rate for every platform
+    at once, so predicting for a batch of packages is a single matmul.
+    Feature rows are cached per opportunity.
+    """
+    
+    def __init__(self, platforms=PLATFORMS, alpha=1.0, n_buckets=32, cache_size=10_000):
+        self.platforms = list(platforms)
+        self.alpha = alpha
+        self.n_buckets = n_buckets
+        self.cache_size = cache_size
+        self.n_features = 2 + len(METRICS) + n_buckets
+        self.weights = None
+        self._cache = OrderedDict()  # opportunity fingerprint -> feature row
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def _bucket(self, token):
+        return 2 + len(METRICS) + zlib.crc32(token.encode()) % self.n_buckets
+    
+    def _key(self, opportunity):
+        metrics = opportunity.get('metrics') or {}
+        return (opportunity.get('audience'), tuple(opportunity.get('recommended_formats') or ()),
+                opportunity.get('score') or 0.0, tuple(metrics.get(metric, 0.0) for metric in METRICS))
+    
+    def features(self, opportunity):
+        """Feature row for one opportunity (a record or dict), cached by its content"""
+        key = self._key(opportunity)
+        row = self._cache.get(key)
+        if row is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return row
+        self.cache_misses += 1
+        row = self._cache[key] = self._row(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return row
+    
+    def _row(self, key):
+        formats = key[1]
+        row = np.zeros(self.n_features)
+        row[0] = 1.0
+        row[1] = key[2] / 10
+        row[2:2 + len(METRICS)] = np.array(key[3]) / 10
+        if key[0]:
+            row[self._bucket(f"audience:{key[0]}")] += 1.0
+        for fmt in formats:
+            row[self._bucket(f"format:{fmt}")] += 1.0 / len(formats)
+        return row
+    
+    def feature_matrix(self, opportunities, cache=True):
+        rows = [self.features(opportunity) if cache else self._row(self._key(opportunity))
+                for opportunity in opportunities]
+        return np.array(rows).reshape(-1, self.n_features)
+    
+    def fit(self, features, outcomes):
+        """Fit on a (posts, features) matrix and (posts, targets, platforms) outcomes; reach is in raw counts"""
+        outcomes = np.array(outcomes, float)
+        outcomes[:, 1] = np.log1p(outcomes[:, 1])
+        targets = outcomes.reshape(len(outcomes), -1)
+        penalty = self.alpha * np.eye(self.n_features)
+        penalty[0, 0] = 0.0  # leave the intercept unpenalized
+        self.weights = np.linalg.solve(features.T @ features + penalty, features.T @ targets)
+        return self
+    
+    def predict_matrix(self, features):
+        """(packages, targets, platforms) predictions for a feature matrix"""
+        raw = (features @ self.weights).reshape(len(features), len(TARGETS), len(self.platforms))
+        raw[:, 0] = np.clip(raw[:, 0], 0, 100)
+        raw[:, 1] = np.expm1(np.maximum(raw[:, 1], 0))
+        raw[:, 2] = np.clip(raw[:, 2], 0, 100)
+        return raw
+    
+    def predict(self, opportunities):
+        """Package performance_predictions for many opportunities from one batched inference"""
+        predictions = self.predict_matrix(self.feature_matrix(opportunities))
+        results = []
+        for engagement, reach, conversion in predictions.tolist():
+            results.append({
+                'expected_engagement': int(round(max(engagement))),
+                'estimated_reach': f"{int(sum(reach)):,}",
+                'conversion_potential': f"{max(conversion):.1f}%",
+                'platforms': {
+                    platform: {'engagement': round(e, 1), 'reach': int(r), 'conversion': round(c, 2)}
+                    for platform, e, r, c in zip(self.platforms, engagement, reach, conversion)
+                }
+            })
+        return results
+    
+    def predict_one(self, opportunity):
+        return self.predict([opportunity])[0]
+    
+    def simulate_training(self, count, seed=None):
+        """Fit on simulated post outcomes until real ones are recorded; returns the model"""
+        rng = np.random.default_rng(seed)
+        audiences = ['beginners', 'business leaders', 'developers', 'students', 'general public',
+                     'industry professionals', 'strategists', 'investors', 'policy makers']
+        formats = ['explainer video', 'thread', 'blog post', 'infographic', 'fact-check article', 'video debunk',
+                   'twitter thread', 'thought leadership', 'research brief', 'podcast']
+        # Which audiences and formats each platform rewards
+        affinity = {
+            'Twitter': {'thread': 12, 'twitter thread': 12, 'general public': 6, 'developers': 5},
+            'LinkedIn': {'thought leadership': 14, 'business leaders': 10, 'investors': 8, 'strategists': 8,
+                         'research brief': 6},
+            'Instagram': {'infographic': 14, 'students': 6, 'beginners': 6, 'general public': 4},
+            'TikTok': {'explainer video': 16, 'video debunk': 14, 'students': 10, 'beginners': 8}
+        }
+        metrics = np.round(rng.uniform(2, 10, (count, len(METRICS))), 1)
+        score = np.round(metrics.mean(axis=1), 1)
+        audience = rng.integers(len(audiences), size=count)
+        # Two or three distinct formats per opportunity: the first columns of a random permutation
+        picks = np.argsort(rng.random((count, len(formats))), axis=1)[:, :3]
+        used = np.arange(3)[None, :] < rng.integers(2, 4, count)[:, None]
+        share = used / used.sum(axis=1, keepdims=True)
+        
+        # Same layout as _row(), built for every sample at once
+        features = np.zeros((count, self.n_features))
+        features[:, 0] = 1.0
+        features[:, 1] = score / 10
+        features[:, 2:2 + len(METRICS)] = metrics / 10
+        audience_bucket = np.array([self._bucket(f"audience:{name}") for name in audiences])
+        format_bucket = np.array([self._bucket(f"format:{name}") for name in formats])
+        rows = np.arange(count)
+        np.add.at(features, (rows, audience_bucket[audience]), 1.0)
+        for column in range(3):
+            np.add.at(features, (rows, format_bucket[picks[:, column]]), share[:, column])
+        
+        outcomes = np.empty((count, len(TARGETS), len(self.platforms)))
+        for p, platform in enumerate(self.platforms):
+            rewards = affinity.get(platform, {})
+            audience_bonus = np.array([rewards.get(name, 0) for name in audiences])[audience]
+            format_bonus = (np.array([rewards.get(name, 0) for name in formats])[picks] * share).sum(axis=1)
+            bonus = audience_bonus + format_bonus
+            engagement = 30 + 4 * metrics[:, 0] + 2 * metrics[:, 2] + bonus + rng.normal(0, 5, count)
+            outcomes[:, 0, p] = np.clip(engagement, 0, 100)
+            outcomes[:, 1, p] = np.exp(7 + 0.25 * metrics[:, 0] + 0.1 * metrics[:, 1] + 0.03 * bonus
+                                       + rng.normal(0, 0.3, count))
+            outcomes[:, 2, p] = np.clip(1 + 0.3 * metrics[:, 2] + 0.1 * bonus + rng.normal(0, 0.5, count), 0, 100)
+        return self.fit(features, outcomes)
\ No newline at end of file
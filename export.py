@@ -0,0 +1,200 @@
+import glob
+import gzip
+import json
+import os
+import uuid
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional; NDJSON needs nothing extra
+    pa = pq = None
+
+# Nested package sections, stored as JSON text in Parquet so every file shares one flat schema
+JSON_COLUMNS = ('formats', 'timing', 'performance_predictions')
+
+# json.dumps() with non-default options builds a new encoder per call; share one
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+def package_record(package):
+    """Flat, JSON-ready dict for one package (materializes a lazy package)"""
+    return {'topic': package.topic, **package.to_dict()}
+
+def _open_text(path, mode, compressed=None):
+    if path.endswith('.gz') if compressed is None else compressed:
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='\n')
+    return open(path, mode, encoding='utf-8', newline='\n')
+
+class NDJSONWriter:
+    """Writes packages to a newline-delimited JSON file, one package per line.
+
+    Each package is encoded and written as it arrives, so memory stays flat
+    however many are exported. Paths ending in .gz are gzip-compressed.
+    The file is built under a temporary name and renamed on close, so a
+    publisher watching the path never picks up half an export.
+
+        with NDJSONWriter('exports/packages.ndjson') as writer:
+            for _, package in generator.create_content_packages(opportunities):
+                writer.write(package)
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._temp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        self._file = _open_text(self._temp, 'w', compressed=path.endswith('.gz'))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, *exc_info):
+        self.close(commit=exc_type is None)
+    
+    def write(self, package):
+        self._file.write(_encode(package_record(package)))
+        self._file.write('\n')
+        self.count += 1
+    
+    def write_many(self, packages):
+        for package in packages:
+            self.write(package)
+        return self.count
+    
+    def close(self, commit=True):
+        """Finish the file; with commit=False the partial export is deleted instead"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if commit:
+            os.replace(self._temp, self.path)
+        else:
+            os.remove(self._temp)
+
+class ParquetWriter:
+    """Writes packages to a Hive-partitioned Parquet dataset (date=YYYY-MM-DD/part-*.parquet).
+
+    Packages are buffered per partition and flushed as a row group every
+    `row_group_size` rows, so at most one row group per open partition is
+    held in memory. Partitions come from each package's generated_at date;
+    each writer adds one new file per partition it touches, so repeated
+    exports into the same directory append rather than overwrite. Files
+    get their final name only on close. Needs pyarrow.
+    """
+    
+    def __init__(self, directory, row_group_size=2_000, compression='zstd'):
+        if pa is None:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+        self.directory = directory
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.count = 0
+        self.schema = pa.schema([
+            ('topic', pa.string()),
+            ('opportunity_title', pa.string()),
+            ('generated_at', pa.string()),
+            ('hashtags', pa.list_(pa.string())),
+            ('formats', pa.string()),
+            ('timing', pa.string()),
+            ('performance_predictions', pa.string())
+        ])
+        self._name = f"part-{uuid.uuid4().hex[:12]}.parquet"
+        self._buffers = {}  # partition -> {column: [values]}
+        self._writers = {}  # partition -> (pq.ParquetWriter, temp path)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, *exc_info):
+        self.close(commit=exc_type is None)
+    
+    def _partition(self, record):
+        return f"date={(record.get('generated_at') or 'unknown')[:10]}"
+    
+    def write(self, package):
+        record = package_record(package)
+        partition = self._partition(record)
+        columns = self._buffers.get(partition)
+        if columns is None:
+            columns = self._buffers[partition] = {name: [] for name in self.schema.names}
+        for name in JSON_COLUMNS:
+            record[name] = _encode(record[name])
+        record['hashtags'] = list(record['hashtags'])
+        for name, values in columns.items():
+            values.append(record.get(name))
+        self.count += 1
+        if len(columns['topic']) >= self.row_group_size:
+            self._flush(partition)
+    
+    def write_many(self, packages):
+        for package in packages:
+            self.write(package)
+        return self.count
+    
+    def _flush(self, partition):
+        columns = self._buffers.pop(partition, None)
+        if not columns or not columns['topic']:
+            return
+        entry = self._writers.get(partition)
+        if entry is None:
+            directory = os.path.join(self.directory, partition)
+            os.makedirs(directory, exist_ok=True)
+            temp = os.path.join(directory, f".{self._name}.tmp")
+            entry = self._writers[partition] = (pq.ParquetWriter(temp, self.schema, compression=self.compression),
+                                                temp)
+        entry[0].write_table(pa.table(columns, schema=self.schema))
+    
+    def close(self, commit=True):
+        """Flush and finish every partition file; with commit=False they are deleted instead"""
+        if commit:
+            for partition in list(self._buffers):
+                self._flush(partition)
+        self._buffers.clear()
+        for partition, (writer, temp) in self._writers.items():
+            writer.close()
+            if commit:
+                os.replace(temp, os.path.join(self.directory, partition, self._name))
+            else:
+                os.remove(temp)
+        self._writers.clear()
+
+def _is_ndjson(path):
+    return path.endswith(('.ndjson', '.jsonl', '.ndjson.gz', '.jsonl.gz'))
+
+def export_packages(packages, path, **options):
+    """Stream packages from any iterable to a file or dataset; returns how many were written.
+
+    .ndjson/.jsonl paths (optionally .gz) get NDJSON, anything else is a
+    Parquet dataset directory.
+    """
+    writer = NDJSONWriter(path) if _is_ndjson(path) else ParquetWriter(path, **options)
+    with writer:
+        return writer.write_many(packages)
+
+def read_packages(path, dates=None, batch_size=2_000):
+    """Yield exported packages back as dicts, one at a time.
+
+    Reads either format written above. For Parquet datasets, `dates`
+    limits the scan to those date partitions ('YYYY-MM-DD'), and rows are
+    decoded one row group batch at a time.
+    """
+    if _is_ndjson(path):
+        with _open_text(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    if pa is None:
+        raise ImportError("Reading Parquet exports needs pyarrow: pip install pyarrow")
+    partitions = ['*'] if dates is None else [f"date={date}" for date in dates]
+    files = sorted(file for partition in partitions
+                   for file in glob.glob(os.path.join(path, partition, '*.parquet')))
+    for file in files:
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=batch_size):
+            for record in batch.to_pylist():
+                for name in JSON_COLUMNS:
+                    record[name] = json.loads(record[name])
+                yield record
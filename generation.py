@@ -1,8 +1,48 @@
+import functools
+import itertools
 import random
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 
+from cache import package_key
+from records import TOPICS, ContentPackage, Deferred, LazyFormats
+from timing import DEFAULT_TIMING
+
+# Format name -> builder method, in the order formats appear in a package
+FORMAT_BUILDERS = {
+    'tweet': '_generate_tweet_thread',
+    'linkedin': '_generate_linkedin_post',
+    'image_prompt': '_generate_image_prompt',
+    'video_script': '_generate_video_script'
+}
+
+# Prompts used when a Backend is set, with a token budget per format
+PROMPTS = {
+    'tweet': ("Write a 5-tweet thread about {trend} for {audience}. Angle: {title}. {brief} "
+              "Put each tweet on its own line."),
+    'linkedin': "Write a LinkedIn post about {trend} for {audience}. Angle: {title}. {brief} End with a question.",
+    'image_prompt': ("Write an image-generation prompt for a social media visual about {trend}: style, key "
+                     "elements, colors and mood."),
+    'video_script': ("Write a 60-second short-form video script about {trend} for {audience} with a hook, three "
+                     "key points and a call to action. Angle: {title}.")
+}
+MAX_TOKENS = {'tweet': 160, 'linkedin': 320, 'image_prompt': 120, 'video_script': 320}
+
+# Bump whenever the templates change, so cached packages from older templates are not served
+GENERATOR_VERSION = 2
+
 class ContentGenerator:
-    def __init__(self):
+    def __init__(self, cache=None, backend=None, hashtags=None, timing=None, engagement=None):
+        # Optional PackageCache; repeat requests for the same opportunity and formats are served from it
+        self.cache = cache
+        # Optional llm.Backend; without one, formats come from the built-in templates
+        self.backend = backend
+        # Optional hashtags.HashtagIndex fed from monitored posts; the banks below fill in when it has no data
+        self.hashtags = hashtags
+        # Optional timing.PostingTimeOptimizer; without one every package gets DEFAULT_TIMING
+        self.timing = timing
+        # Optional engagement.EngagementModel; without one predictions are placeholders
+        self.engagement = engagement
         self.tone_options = ['professional', 'conversational', 'provocative', 'educational', 'inspirational']
         self.hashtag_banks = {
             'tech': ['#AI', '#Tech', '#Innovation', '#Future', '#DigitalTransformation'],
@@ -11,38 +51,165 @@ class ContentGenerator:
         }
     
     def create_content_package(self, opportunity, formats=None):
-        """Generate multi-format content based on opportunity"""
+        """Generate multi-format content based on opportunity.
+
+        Formats, hashtags, timing and predictions are generated lazily, the
+        first time each is read.
+        """
+        formats = self._formats(formats)
+        if self.cache is not None:
+            return self.cache.get_or_create(self.cache_key(opportunity, formats),
+                                            lambda: self._build_package(opportunity, formats))
+        return self._build_package(opportunity, formats)
+    
+    def cache_key(self, opportunity, formats=None):
+        source = self.backend.name if self.backend is not None else 'templates'
+        return package_key(opportunity, self._formats(formats), version=[GENERATOR_VERSION, source])
+    
+    def stream_format(self, opportunity, name):
+        """Yield one format's text piece by piece as the backend produces it (all at once for templates)"""
+        if self.backend is None:
+            content = getattr(self, FORMAT_BUILDERS[name])(opportunity)
+            yield '\n'.join(content) if isinstance(content, list) else content
+            return
+        yield from self.backend.stream(self._prompt(name, opportunity), MAX_TOKENS[name])
+    
+    def package_from_text(self, opportunity, texts):
+        """Package built from already generated format texts (e.g. collected from stream_format), cached like any other"""
+        package = self._new_package(opportunity)
+        package.formats.update((name, self._parse(name, texts[name])) for name in self._formats(texts))
+        if self.cache is not None:
+            self.cache.put(self.cache_key(opportunity, list(texts)), package)
+        return package
+    
+    def fill_format(self, package, name, text):
+        """Store a format generated elsewhere (e.g. collected from stream_format) in a package; returns it parsed"""
+        package.formats[name] = self._parse(name, text)
+        return package.formats[name]
+    
+    def _prompt(self, name, opportunity):
+        return PROMPTS[name].format(trend=opportunity['trend'], title=opportunity['title'],
+                                    brief=opportunity.get('brief') or '',
+                                    audience=opportunity.get('audience') or 'a general audience')
+    
+    def _parse(self, name, text):
+        if name == 'tweet':
+            return [line.strip() for line in text.split('\n') if line.strip()]
+        return text.strip()
+    
+    def _complete(self, name, opportunity):
+        return self._parse(name, self.backend.complete(self._prompt(name, opportunity), MAX_TOKENS[name]))
+    
+    def _build_package(self, opportunity, formats):
+        return self._new_package(opportunity, LazyFormats({
+            name: functools.partial(getattr(self, FORMAT_BUILDERS[name]), opportunity) for name in formats
+        }))
+    
+    def create_content_packages(self, opportunities, formats=None, max_workers=8, max_pending=None):
+        """Generate packages for many opportunities, yielding (opportunity, package) as each completes.
+
+        Every (opportunity, format) pair is a separate task on one shared
+        thread pool, so the formats of one package are built concurrently
+        and slow formats of one opportunity do not hold up the others.
+        `opportunities` may be any iterable; at most `max_pending`
+        (default 2 x max_workers) packages are in flight at once. Cached
+        packages are yielded straight away without touching the pool.
+
+        Unlike create_content_package(), formats are built up front: the
+        callers (the app's shared snapshot, exports) read every format, and
+        building them here keeps model calls on the pool rather than on
+        whichever thread reads the package first. Performance predictions
+        for the packages finished together come from one batched inference.
+        """
+        formats = self._formats(formats)
+        max_pending = max_pending or 2 * max_workers
+        opportunities = iter(opportunities)
+        with ThreadPoolExecutor(max_workers) as pool:
+            tasks = {}    # future -> (package key, format)
+            pending = {}  # package key -> [opportunity, package, results, formats left]
+            cached = []   # (opportunity, package) served from the cache, not yet yielded
+            keys = itertools.count()
+            
+            def submit_next():
+                opportunity = next(opportunities, None)
+                if opportunity is None:
+                    return False
+                if self.cache is not None:
+                    package = self.cache.get(self.cache_key(opportunity, formats))
+                    if package is not None:
+                        cached.append((opportunity, package))
+                        return True
+                key = next(keys)
+                pending[key] = [opportunity, self._new_package(opportunity), {}, len(formats)]
+                for name in formats:
+                    tasks[pool.submit(getattr(self, FORMAT_BUILDERS[name]), opportunity)] = (key, name)
+                return True
+            
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    exhausted = not submit_next()
+                    while cached:
+                        yield cached.pop()
+                if not tasks:
+                    # Only reachable when no formats were requested: packages are complete as created
+                    finished = [pending.pop(key)[:2] for key in list(pending)]
+                    self._predict_many(finished)
+                    yield from finished
+                    if exhausted:
+                        return
+                    continue
+                done, _ = wait(tasks, return_when=FIRST_COMPLETED)
+                finished = []
+                for future in done:
+                    key, name = tasks.pop(future)
+                    entry = pending[key]
+                    entry[2][name] = future.result()
+                    entry[3] -= 1
+                    if not entry[3]:
+                        del pending[key]
+                        opportunity, package, results, _ = entry
+                        package.formats.update((fmt, results[fmt]) for fmt in formats)
+                        finished.append((opportunity, package))
+                self._predict_many(finished)
+                for opportunity, package in finished:
+                    if self.cache is not None:
+                        self.cache.put(self.cache_key(opportunity, formats), package)
+                    yield opportunity, package
+    
+    def _predict_many(self, finished):
+        """Fill in performance_predictions for (opportunity, package) pairs with one model call"""
+        if self.engagement is None or not finished:
+            return
+        predictions = self.engagement.predict([opportunity for opportunity, _ in finished])
+        for (_, package), prediction in zip(finished, predictions):
+            package.performance_predictions = prediction
+    
+    def _formats(self, formats):
         if formats is None:
             formats = ['tweet', 'linkedin', 'image_prompt']
-        
-        content = {
-            'opportunity_title': opportunity['title'],
-            'generated_at': datetime.now().isoformat(),
-            'formats': {},
-            'hashtags': self._generate_hashtags(opportunity['trend']),
-            'timing': self._calculate_optimal_timing(),
-            'performance_predictions': self._predict_performance()
-        }
-        
-        # Generate each format
-        if 'tweet' in formats:
-            content['formats']['tweet'] = self._generate_tweet_thread(opportunity)
-        
-        if 'linkedin' in formats:
-            content['formats']['linkedin'] = self._generate_linkedin_post(opportunity)
-        
-        if 'image_prompt' in formats:
-            content['formats']['image_prompt'] = self._generate_image_prompt(opportunity)
-        
-        if 'video_script' in formats:
-            content['formats']['video_script'] = self._generate_video_script(opportunity)
-        
-        return content
+        return [name for name in FORMAT_BUILDERS if name in formats]
+    
+    def _new_package(self, opportunity, formats=None):
+        # Plain opportunity dicts still work; they are interned on the way in
+        topic_id = TOPICS.intern(opportunity['trend'])
+        return ContentPackage(
+            opportunity_title=opportunity['title'],
+            topic_id=topic_id,
+            generated_at=datetime.now().isoformat(),
+            formats=formats,
+            hashtags=Deferred(functools.partial(self._generate_hashtags, topic_id)),
+            timing=Deferred(functools.partial(self._calculate_optimal_timing, opportunity.get('audience'))),
+            performance_predictions=Deferred(functools.partial(self._predict_performance, opportunity))
+        )
     
     def _generate_tweet_thread(self, opportunity):
+        if self.backend is not None:
+            return self._complete('tweet', opportunity)
+        topic_id = TOPICS.intern(opportunity['trend'])
         tweets = [
             f"🚀 Breaking down: {opportunity['trend']}\n\nWhy this matters now:",
-            f"1. First key insight about {opportunity['trend'].lower()}",
+            f"1. First key insight about {TOPICS.lower(topic_id)}",
             f"2. Second critical point that most people miss",
             f"3. Practical implications for different industries",
             f"4. What to watch for in the coming weeks/months"
@@ -50,6 +217,8 @@ class ContentGenerator:
         return tweets
     
     def _generate_linkedin_post(self, opportunity):
+        if self.backend is not None:
+            return self._complete('linkedin', opportunity)
         post = f"""The conversation around {opportunity['trend']} is heating up, but most discussions miss the strategic implications.
 
 Here's what leaders need to understand:
@@ -65,6 +234,8 @@ What's your take on {opportunity['trend']}? How is your organization preparing?"
         return post
     
     def _generate_image_prompt(self, opportunity):
+        if self.backend is not None:
+            return self._complete('image_prompt', opportunity)
         styles = [
             "minimalist infographic style",
             "futuristic cyberpunk aesthetic",
@@ -87,6 +258,8 @@ Mood: Professional yet innovative, forward-looking"""
         return prompt
     
     def _generate_video_script(self, opportunity):
+        if self.backend is not None:
+            return self._complete('video_script', opportunity)
         script = f"""OPENING HOOK (0-3 seconds):
 [Eye-catching visual of {opportunity['trend']} in action]
 "You've been hearing about {opportunity['trend']}, but here's what no one is telling you..."
@@ -103,22 +276,20 @@ CALL TO ACTION (45-60 seconds):
         
         return script
     
-    def _generate_hashtags(self, topic):
-        hashtags = []
-        for category in self.hashtag_banks.values():
-            hashtags.extend(random.sample(category, min(2, len(category))))
-        hashtags.append(f"#{topic.replace(' ', '')}")
-        return list(set(hashtags))
+    def _generate_hashtags(self, topic_id, k=7):
+        fallback = [tag for bank in self.hashtag_banks.values() for tag in bank[:2]]
+        if self.hashtags is not None:
+            return self.hashtags.suggest(topic_id, k, fallback)
+        return list(dict.fromkeys([TOPICS.hashtag(topic_id)] + fallback))[:k]
     
-    def _calculate_optimal_timing(self):
-        return {
-            'twitter': "9:30 AM - 11:30 AM EST, Wednesday",
-            'linkedin': "11:00 AM - 1:00 PM EST, Tuesday-Thursday",
-            'instagram': "2:00 PM - 4:00 PM EST, Weekdays",
-            'tiktok': "7:00 PM - 9:00 PM EST, Thursday-Friday"
-        }
+    def _calculate_optimal_timing(self, audience=None):
+        if self.timing is not None:
+            return self.timing.timing(audience)
+        return dict(DEFAULT_TIMING)
     
-    def _predict_performance(self):
+    def _predict_performance(self, opportunity=None):
+        if self.engagement is not None and opportunity is not None:
+            return self.engagement.predict_one(opportunity)
         return {
             'expected_engagement': random.randint(85, 98),
             'estimated_reach': f"{random.randint(5000, 50000):,}",
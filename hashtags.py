@@ -0,0 +1,112 @@
+import math
+import re
+
+from records import TOPICS
+
+_HASHTAG = re.compile(r"#(\w*[A-Za-z_]\w*)")
+
+def extract_hashtags(text):
+    """Distinct hashtags in a post, in order of appearance"""
+    return list(dict.fromkeys(f"#{tag}" for tag in _HASHTAG.findall(text)))
+
+class HashtagIndex:
+    """Decayed topic/hashtag co-occurrence counts with a ready top-N per topic.
+
+    Counts use forward decay: a post at time t adds exp(rate * (t - landmark))
+    instead of 1, which ranks hashtags exactly as if every count decayed
+    with the given half-life, without touching old entries. Because
+    decay scales every entry of a topic by the same factor, an update can
+    only move the updated hashtag in the ranking, so each topic's top N is
+    kept current in O(N) per post and lookups are a dict read. When the
+    weights grow too large they are rescaled to a new landmark and
+    negligible entries are dropped.
+
+    Hashtags are matched case-insensitively; the first spelling seen is
+    the one returned.
+    """
+    
+    def __init__(self, half_life=6 * 3600, top_n=8, min_weight=0.01):
+        self.rate = math.log(2) / half_life
+        self.top_n = top_n
+        self.min_weight = min_weight
+        self.landmark = None
+        self.posts = 0
+        self._weights = {}   # topic id -> {hashtag key: forward-decayed weight}
+        self._top = {}       # topic id -> [hashtag key, ...], best first
+        self._spelling = {}  # hashtag key -> display form
+    
+    def __len__(self):
+        return len(self._weights)
+    
+    def add(self, topic, text, timestamp):
+        """Count the hashtags of one post about a topic; returns the hashtags found"""
+        tags = extract_hashtags(text)
+        if not tags:
+            return tags
+        if self.landmark is None:
+            self.landmark = timestamp
+        exponent = self.rate * (timestamp - self.landmark)
+        if exponent > 50:
+            self._rescale(timestamp)
+            exponent = 0.0
+        increment = math.exp(exponent)
+        topic_id = TOPICS.intern(topic)
+        weights = self._weights.get(topic_id)
+        if weights is None:
+            weights = self._weights[topic_id] = {}
+            self._top[topic_id] = []
+        top = self._top[topic_id]
+        for tag in tags:
+            key = tag.lower()
+            if key not in self._spelling:
+                self._spelling[key] = tag
+            weight = weights[key] = weights.get(key, 0.0) + increment
+            if key in top:
+                top.sort(key=weights.__getitem__, reverse=True)
+            elif len(top) < self.top_n or weight > weights[top[-1]]:
+                top.append(key)
+                top.sort(key=weights.__getitem__, reverse=True)
+                del top[self.top_n:]
+        self.posts += 1
+        return tags
+    
+    def forget(self, topic):
+        """Drop every count for a topic, e.g. when the monitor stops tracking it"""
+        topic_id = TOPICS.ids.get(topic)
+        if self._weights.pop(topic_id, None) is not None:
+            self._top.pop(topic_id, None)
+            self._prune_spellings()
+    
+    def _rescale(self, timestamp):
+        factor = math.exp(-self.rate * (timestamp - self.landmark))
+        self.landmark = timestamp
+        for topic_id, weights in self._weights.items():
+            for key in list(weights):
+                weights[key] *= factor
+                if weights[key] < self.min_weight:
+                    del weights[key]
+            self._top[topic_id] = sorted(weights, key=weights.__getitem__, reverse=True)[:self.top_n]
+        self._prune_spellings()
+    
+    def _prune_spellings(self):
+        # Keep spellings only for hashtags some topic still counts
+        live = set().union(*self._weights.values())
+        self._spelling = {key: tag for key, tag in self._spelling.items() if key in live}
+    
+    def top(self, topic_id):
+        """Precomputed top hashtags for a topic, best first"""
+        return [self._spelling[key] for key in self._top.get(topic_id, ())]
+    
+    def count(self, topic_id, hashtag, now):
+        """Decayed number of posts about a topic carrying a hashtag, as of `now`"""
+        weight = self._weights.get(topic_id, {}).get(hashtag.lower(), 0.0)
+        return weight * math.exp(-self.rate * (now - self.landmark)) if weight else 0.0
+    
+    def suggest(self, topic_id, k=6, fallback=()):
+        """Up to k hashtags: the topic's own, its top co-occurring ones, then `fallback` to fill any gap"""
+        tags = {}
+        for tag in [TOPICS.hashtag(topic_id)] + self.top(topic_id) + list(fallback):
+            tags.setdefault(tag.lower(), tag)
+            if len(tags) >= k:
+                break
+        return list(tags.values())
\ No newline at end of file
@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# One fixed-width record per (minute, topic) bucket, little-endian, 24 bytes
+BUCKET_DTYPE = np.dtype([
+    ('timestamp', '<i8'),      # bucket start, POSIX seconds
+    ('topic_id', '<i4'),
+    ('mentions', '<i4'),
+    ('sentiment_sum', '<f4'),
+    ('emerging', '<i2'),       # 1 if the topic started emerging in this bucket
+    ('_pad', '<i2')
+])
+
+class TrendHistory:
+    """Append-only history of per-minute topic buckets.
+
+    Records are written in time order to a flat binary file and read back
+    through np.memmap, so a time-range query is a binary search plus a
+    zero-copy slice. Topic names live in a JSON sidecar so IDs stay stable
+    across restarts. With path=None the history is kept in memory only.
+
+    Buckets stay open for `lateness` seconds after their minute ends so late
+    events can still land; anything later than that is counted in
+    `late_dropped`.
+    """
+    
+    def __init__(self, path=None, bucket_seconds=60, lateness=120):
+        self.path = path
+        self.bucket_seconds = bucket_seconds
+        self.lateness = lateness
+        self.late_dropped = 0
+        self.topics = []
+        self.topic_ids = {}
+        self._pending = {}  # bucket start -> {topic_id: [mentions, sentiment_sum, emerging]}
+        self._flushed_until = None
+        self._memory = np.zeros(1024, BUCKET_DTYPE)
+        self._memory_size = 0
+        self._map = None
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if os.path.exists(self._topics_path):
+                with open(self._topics_path) as f:
+                    self.topics = json.load(f)
+                self.topic_ids = {name: i for i, name in enumerate(self.topics)}
+            records = self.records()
+            if len(records):
+                self._flushed_until = int(records['timestamp'][-1]) + bucket_seconds
+    
+    @property
+    def _topics_path(self):
+        return f"{self.path}.topics.json"
+    
+    def topic_id(self, topic):
+        topic_id = self.topic_ids.get(topic)
+        if topic_id is None:
+            topic_id = self.topic_ids[topic] = len(self.topics)
+            self.topics.append(topic)
+            if self.path is not None:
+                with open(self._topics_path, 'w') as f:
+                    json.dump(self.topics, f)
+        return topic_id
+    
+    def _bucket(self, timestamp):
+        return int(timestamp // self.bucket_seconds) * self.bucket_seconds
+    
+    def record(self, topic, timestamp, sentiment=0.0):
+        """Count one mention; flushes buckets that are past the lateness window"""
+        bucket = self._bucket(timestamp)
+        if self._flushed_until is not None and bucket < self._flushed_until:
+            self.late_dropped += 1
+            return
+        cell = self._pending.setdefault(bucket, {}).setdefault(self.topic_id(topic), [0, 0.0, 0])
+        cell[0] += 1
+        cell[1] += sentiment
+        if min(self._pending) + self.bucket_seconds <= timestamp - self.lateness:
+            self.flush(before=timestamp - self.lateness)
+    
+    def mark_emerging(self, topic, timestamp):
+        """Record that a topic started emerging in the bucket containing timestamp"""
+        bucket = self._bucket(timestamp)
+        if self._flushed_until is not None and bucket < self._flushed_until:
+            return
+        cell = self._pending.setdefault(bucket, {}).setdefault(self.topic_id(topic), [0, 0.0, 0])
+        cell[2] = 1
+    
+    def flush(self, before=None):
+        """Append every pending bucket that starts before `before` (default: all)"""
+        ready = sorted(bucket for bucket in self._pending if before is None or bucket + self.bucket_seconds <= before)
+        if not ready:
+            return 0
+        rows = []
+        for bucket in ready:
+            for topic_id, (mentions, sentiment_sum, emerging) in sorted(self._pending.pop(bucket).items()):
+                rows.append((bucket, topic_id, mentions, sentiment_sum, emerging, 0))
+        records = np.array(rows, dtype=BUCKET_DTYPE)
+        if self.path is None:
+            size = self._memory_size + len(records)
+            if size > len(self._memory):
+                grown = np.zeros(max(size, 2 * len(self._memory)), BUCKET_DTYPE)
+                grown[:self._memory_size] = self._memory[:self._memory_size]
+                self._memory = grown
+            self._memory[self._memory_size:size] = records
+            self._memory_size = size
+        else:
+            with open(self.path, 'ab') as f:
+                f.write(records.tobytes())
+        self._flushed_until = ready[-1] + self.bucket_seconds
+        return len(records)
+    
+    def records(self):
+        """Every flushed record as a read-only structured array (memory-mapped when on disk)"""
+        if self.path is None:
+            return self._memory[:self._memory_size]
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        count = size // BUCKET_DTYPE.itemsize
+        if not count:
+            return np.zeros(0, BUCKET_DTYPE)
+        if self._map is None or len(self._map) != count:
+            # The file only grows, so remapping when its length changes is enough
+            self._map = np.memmap(self.path, dtype=BUCKET_DTYPE, mode='r', shape=(count,))
+        return self._map
+    
+    def range(self, start, end):
+        """Zero-copy view of records with start <= timestamp < end (POSIX seconds)"""
+        records = self.records()
+        timestamps = records['timestamp']
+        lo, hi = np.searchsorted(timestamps, [start, end], side='left')
+        return records[lo:hi]
+    
+    def last(self, hours=24, now=None):
+        now = now if now is not None else time.time()
+        return self.range(now - hours * 3600, now)
+    
+    def timeline(self, hours=24, resolution=3600, now=None):
+        """Per-interval mentions, mean sentiment in [0, 1] and breakout count for charts"""
+        now = now if now is not None else time.time()
+        intervals = int(hours * 3600 // resolution)
+        start = (int(now // resolution) - intervals + 1) * resolution
+        records = self.range(start, start + intervals * resolution)
+        index = (records['timestamp'] - start) // resolution
+        mentions = np.bincount(index, weights=records['mentions'], minlength=intervals)
+        sentiment_sum = np.bincount(index, weights=records['sentiment_sum'], minlength=intervals)
+        events = np.bincount(index, weights=records['emerging'], minlength=intervals)
+        mean_sentiment = np.divide(sentiment_sum, mentions, out=np.zeros(intervals), where=mentions > 0)
+        return pd.DataFrame({
+            'timestamp': [datetime.fromtimestamp(start + i * resolution) for i in range(intervals)],
+            'mentions': mentions.astype(np.int64),
+            'sentiment': (mean_sentiment + 1) / 2,
+            'events': events.astype(np.int64)
+        })
@@ -0,0 +1,121 @@
+import heapq
+import itertools
+
+class Leaderboard:
+    """Indexed max-heap of scored entries with in-place updates and expiry.
+
+    `position` maps each key to its slot in the heap array, so updating or
+    removing an entry is O(log n) instead of a rebuild and re-sort. Reading
+    the top K walks the heap best-first in O(K log K) and is cached until
+    the next change, so repeated reads between updates are O(K).
+    """
+    
+    def __init__(self):
+        self._heap = []      # [score, key, item, expires_at]
+        self.position = {}   # key -> index in _heap
+        self._expiry = []    # (expires_at, sequence, key) min-heap, lazily pruned
+        self._sequence = itertools.count()
+        self._top_cache = None
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    def __contains__(self, key):
+        return key in self.position
+    
+    def score(self, key):
+        return self._heap[self.position[key]][0]
+    
+    def item(self, key):
+        return self._heap[self.position[key]][2]
+    
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i][1]] = i
+        self.position[heap[j][1]] = j
+    
+    def _sift_up(self, i):
+        heap = self._heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if heap[parent][0] >= heap[i][0]:
+                break
+            self._swap(i, parent)
+            i = parent
+    
+    def _sift_down(self, i):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            largest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and heap[child][0] > heap[largest][0]:
+                    largest = child
+            if largest == i:
+                return
+            self._swap(i, largest)
+            i = largest
+    
+    def push(self, key, score, item=None, expires_at=None):
+        """Insert an entry, or update its score, item and expiry if the key is already ranked"""
+        self._top_cache = None
+        index = self.position.get(key)
+        if index is None:
+            index = self.position[key] = len(self._heap)
+            self._heap.append([score, key, item, expires_at])
+            self._sift_up(index)
+        else:
+            entry = self._heap[index]
+            old_score = entry[0]
+            entry[0], entry[2], entry[3] = score, item, expires_at
+            if score > old_score:
+                self._sift_up(index)
+            elif score < old_score:
+                self._sift_down(index)
+        if expires_at is not None:
+            heapq.heappush(self._expiry, (expires_at, next(self._sequence), key))
+    
+    def remove(self, key):
+        """Drop an entry; returns its item"""
+        self._top_cache = None
+        index = self.position.pop(key)
+        heap = self._heap
+        entry = heap[index]
+        last = heap.pop()
+        if index < len(heap):
+            heap[index] = last
+            self.position[last[1]] = index
+            self._sift_up(index)
+            self._sift_down(self.position[last[1]])
+        return entry[2]
+    
+    def expire(self, now):
+        """Remove every entry whose expiry time is at or before now; returns their keys"""
+        expired = []
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._expiry)
+            # Entries re-pushed with a later expiry leave stale records behind
+            index = self.position.get(key)
+            if index is not None and self._heap[index][3] == expires_at:
+                self.remove(key)
+                expired.append(key)
+        return expired
+    
+    def top(self, k):
+        """The k best entries as (key, score, item), best first"""
+        cache = self._top_cache
+        if cache is not None and (len(cache) >= k or len(cache) == len(self._heap)):
+            return cache[:k]
+        heap = self._heap
+        result = []
+        frontier = [(-heap[0][0], 0)] if heap else []
+        while frontier and len(result) < k:
+            _, index = heapq.heappop(frontier)
+            score, key, item, _ = heap[index]
+            result.append((key, score, item))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (-heap[child][0], child))
+        self._top_cache = result
+        return result
@@ -0,0 +1,354 @@
+import asyncio
+import json
+import queue
+import random
+import threading
+import time
+import zlib
+
+import aiohttp
+from aiohttp import web
+
+from backoff import retry_after_seconds
+
+class LLMError(RuntimeError):
+    pass
+
+class Backend:
+    """Text generation backend used by ContentGenerator.
+
+    Subclasses implement complete(); stream() yields the completion in
+    pieces and defaults to one piece.
+    """
+    
+    name = 'backend'
+    
+    def complete(self, prompt, max_tokens=256):
+        raise NotImplementedError
+    
+    def stream(self, prompt, max_tokens=256):
+        yield self.complete(prompt, max_tokens)
+    
+    def close(self):
+        pass
+
+class LLMClient:
+    """Async client for a batched completion endpoint.
+
+    Concurrent complete() calls are coalesced: prompts queue up until
+    `max_batch_size` are waiting or `max_wait` seconds pass, and go out as
+    one /v1/batch request. At most `max_in_flight` requests (batches and
+    streams) are open at once; while they are all busy, waiting prompts
+    keep piling into the next batch instead of opening more requests.
+    Throttled (429/503) and failed requests are retried with full-jitter
+    exponential backoff, never sooner than the server's Retry-After.
+    """
+    
+    def __init__(self, base_url, model='stub', max_batch_size=16, max_wait=0.005, max_in_flight=4, max_retries=4,
+                 backoff=0.1, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.stats = {'prompts': 0, 'requests': 0, 'batches': 0, 'streams': 0, 'retries': 0, 'errors': 0,
+                      'completion_tokens': 0, 'seconds': 0.0}
+        self._pending = []     # (prompt, max_tokens, future) waiting for a batch
+        self._queued = 0       # batch senders started but still waiting for a request slot
+        self._timer = None
+        self._senders = set()
+        self._semaphore = None
+        self._session = None
+    
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        while self._pending or self._senders:
+            if self._pending and not self._queued:
+                self._start_sender()
+            await asyncio.gather(*self._senders, return_exceptions=True)
+        await self._session.close()
+    
+    def _delay(self, attempt, retry_after=None):
+        jitter = random.uniform(0, self.backoff * 2 ** attempt)
+        return max(jitter, retry_after or 0.0)
+    
+    async def complete(self, prompt, max_tokens=256):
+        """Completion text for one prompt, sent as part of a batch"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((prompt, max_tokens, future))
+        self.stats['prompts'] += 1
+        uncovered = len(self._pending) - self._queued * self.max_batch_size
+        if uncovered >= self.max_batch_size:
+            self._start_sender()
+        elif uncovered > 0 and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._on_timer)
+        return await future
+    
+    def _on_timer(self):
+        self._timer = None
+        if len(self._pending) > self._queued * self.max_batch_size:
+            self._start_sender()
+    
+    def _start_sender(self):
+        self._queued += 1
+        sender = asyncio.ensure_future(self._send_batch())
+        self._senders.add(sender)
+        sender.add_done_callback(self._senders.discard)
+    
+    async def _send_batch(self):
+        async with self._semaphore:
+            self._queued -= 1
+            # Take whatever has accumulated by the time a slot frees up
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:len(batch)]
+            if not batch:
+                return
+            payload = {'model': self.model, 'prompts': [prompt for prompt, _, _ in batch],
+                       'max_tokens': [max_tokens for _, max_tokens, _ in batch]}
+            try:
+                result = await self._post('/v1/batch', payload)
+                completions = result['completions']
+                self.stats['batches'] += 1
+                self.stats['completion_tokens'] += result.get('usage', {}).get('completion_tokens', 0)
+            except Exception as error:
+                if not isinstance(error, LLMError):
+                    self.stats['errors'] += 1
+                    error = LLMError(f"/v1/batch returned an unreadable response: {error!r}")
+                self._fail(batch, error)
+                return
+            for (_, _, future), text in zip(batch, completions):
+                if not future.done():
+                    future.set_result(text)
+            if len(completions) < len(batch):
+                self.stats['errors'] += 1
+                self._fail(batch[len(completions):],
+                           LLMError(f"/v1/batch returned {len(completions)} completions for {len(batch)} prompts"))
+    
+    def _fail(self, batch, error):
+        # Every caller awaiting one of these prompts gets the error instead of waiting forever
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+    
+    async def _post(self, path, payload):
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            retry_after = None
+            try:
+                async with self._session.post(f"{self.base_url}{path}", json=payload) as response:
+                    self.stats['requests'] += 1
+                    if response.status in (429, 503):
+                        retry_after = retry_after_seconds(response.headers.get('Retry-After'), None)
+                    else:
+                        response.raise_for_status()
+                        return await response.json()
+            except aiohttp.ClientResponseError as error:
+                if error.status < 500:
+                    self.stats['errors'] += 1
+                    raise LLMError(f"{path} rejected: {error.status} {error.message}")
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            finally:
+                self.stats['seconds'] += time.perf_counter() - started
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        self.stats['errors'] += 1
+        raise LLMError(f"{path} failed after {self.max_retries + 1} attempts")
+    
+    async def stream(self, prompt, max_tokens=256):
+        """Yield completion tokens for one prompt as the server produces them.
+
+        Streams are not batched. Throttled (429/503) and failed requests
+        are retried only until the first token has arrived; other 4xx
+        responses fail straight away.
+        """
+        self.stats['prompts'] += 1
+        payload = {'model': self.model, 'prompt': prompt, 'max_tokens': max_tokens}
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                retry_after = None
+                received = 0
+                try:
+                    async with self._session.post(f"{self.base_url}/v1/stream", json=payload) as response:
+                        self.stats['requests'] += 1
+                        if response.status in (429, 503):
+                            retry_after = retry_after_seconds(response.headers.get('Retry-After'), None)
+                        else:
+                            response.raise_for_status()
+                            async for line in response.content:
+                                if line.strip():
+                                    token = json.loads(line)['token']
+                                    received += 1
+                                    self.stats['completion_tokens'] += 1
+                                    yield token
+                            self.stats['streams'] += 1
+                            return
+                except aiohttp.ClientResponseError as error:
+                    if error.status < 500:
+                        self.stats['errors'] += 1
+                        raise LLMError(f"/v1/stream rejected: {error.status} {error.message}")
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    if received:
+                        self.stats['errors'] += 1
+                        raise LLMError("stream broke off after the first token")
+                if attempt < self.max_retries:
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(self._delay(attempt, retry_after))
+        self.stats['errors'] += 1
+        raise LLMError(f"/v1/stream failed after {self.max_retries + 1} attempts")
+
+class LLMBackend(Backend):
+    """Blocking facade over LLMClient for thread-based callers.
+
+    The client runs on its own event loop in a daemon thread, so calls from
+    ContentGenerator's worker threads land on one loop and are batched
+    together.
+    """
+    
+    def __init__(self, base_url, **client_kwargs):
+        self.client = LLMClient(base_url, **client_kwargs)
+        self.name = f"llm:{self.client.model}"
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._call(self.client.__aenter__())
+    
+    @property
+    def stats(self):
+        return self.client.stats
+    
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+    
+    def complete(self, prompt, max_tokens=256):
+        return self._call(self.client.complete(prompt, max_tokens))
+    
+    def stream(self, prompt, max_tokens=256):
+        tokens = queue.Queue()
+        done = object()
+        
+        async def pump():
+            try:
+                async for token in self.client.stream(prompt, max_tokens):
+                    tokens.put(token)
+            except Exception as error:
+                tokens.put(error)
+            finally:
+                tokens.put(done)
+        
+        asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        while True:
+            token = tokens.get()
+            if token is done:
+                return
+            if isinstance(token, Exception):
+                raise token
+            yield token
+    
+    def close(self):
+        if self._loop.is_running():
+            self._call(self.client.__aexit__(None, None, None))
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+class StubModelServer:
+    """Local model server for exercising LLMClient offline.
+
+    A batch costs `latency` plus `token_latency` per token of its longest
+    completion, as in batched decoding, so larger batches amortize the
+    fixed cost. Completions are deterministic per prompt. A throttle rate
+    (share of requests answered with 429) exercises retries:
+
+        async with StubModelServer(latency=0.05) as server:
+            async with LLMClient(server.url) as client:
+                text = await client.complete("Write a tweet about Web3")
+    """
+    
+    _FILLER = ['teams', 'adoption', 'early', 'signals', 'practical', 'risk', 'budget', 'roadmap', 'users', 'data',
+               'costs', 'leaders', 'pilot', 'scale', 'trust', 'market', 'next', 'quarter', 'shift', 'playbook']
+    
+    def __init__(self, latency=0.05, token_latency=0.001, max_batch_size=64, throttle=0.0, retry_after='0.05', port=0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.max_batch_size = max_batch_size
+        self.throttle = throttle
+        # Retry-After sent with each 429: delay-seconds or an HTTP-date
+        self.retry_after = retry_after
+        self.port = port
+        self.stats = {'requests': 0, 'throttled': 0, 'batch_sizes': [], 'completion_tokens': 0}
+        self._runner = None
+    
+    def _tokens(self, prompt, max_tokens):
+        rng = random.Random(zlib.crc32(prompt.encode()))
+        words = [word.strip('.,:;!?') for word in prompt.split() if len(word) > 3] or self._FILLER
+        count = min(max_tokens, rng.randint(max_tokens // 2, max_tokens))
+        tokens = []
+        for i in range(count):
+            word = rng.choice(words) if rng.random() < 0.4 else rng.choice(self._FILLER)
+            tokens.append(word + ('\n' if i % 12 == 11 else ' '))
+        return tokens
+    
+    def _throttled(self):
+        self.stats['requests'] += 1
+        if random.random() < self.throttle:
+            self.stats['throttled'] += 1
+            return web.Response(status=429, headers={'Retry-After': self.retry_after})
+        return None
+    
+    async def _batch(self, request):
+        throttled = self._throttled()
+        if throttled is not None:
+            return throttled
+        body = await request.json()
+        prompts = body['prompts']
+        if len(prompts) > self.max_batch_size:
+            return web.Response(status=413, text=f"at most {self.max_batch_size} prompts per batch")
+        limits = body.get('max_tokens') or [256] * len(prompts)
+        completions = [self._tokens(prompt, limit) for prompt, limit in zip(prompts, limits)]
+        longest = max((len(tokens) for tokens in completions), default=0)
+        await asyncio.sleep(self.latency + self.token_latency * longest)
+        used = sum(len(tokens) for tokens in completions)
+        self.stats['batch_sizes'].append(len(prompts))
+        self.stats['completion_tokens'] += used
+        return web.json_response({'completions': [''.join(tokens).strip() for tokens in completions],
+                                  'usage': {'completion_tokens': used}})
+    
+    async def _stream(self, request):
+        throttled = self._throttled()
+        if throttled is not None:
+            return throttled
+        body = await request.json()
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        await asyncio.sleep(self.latency)
+        for token in self._tokens(body['prompt'], body.get('max_tokens', 256)):
+            await asyncio.sleep(self.token_latency)
+            await response.write((json.dumps({'token': token}) + '\n').encode())
+            self.stats['completion_tokens'] += 1
+        await response.write_eof()
+        return response
+    
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post('/v1/batch', self._batch)
+        app.router.add_post('/v1/stream', self._stream)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+    
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
\ No newline at end of file
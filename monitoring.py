@@ -1,67 +1,299 @@
 import random
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 
+from streaming import RingBuffer, Subscription
+from dedup import NearDuplicateFilter
+from detection import EmergingTrendDetector
+from hashtags import HashtagIndex
+from history import TrendHistory
+from sentiment import NEGATIVE_WORDS, POSITIVE_WORDS, SentimentScorer
+from sketches import HeavyHitters
+from trendstore import TrendStore
+from windows import SlidingWindowAggregator
+
+# Words mixed into simulated posts so unrelated posts do not look like reposts
+_FILLER = (
+    'launch update report deal team market users plan study data model chip policy startup funding '
+    'release results demo week analysts investors community research partners roadmap pilot rollout'
+).split()
+# Broad hashtags that turn up across every topic
+_GENERIC_TAGS = ['#Tech', '#AI', '#Innovation', '#News', '#Future', '#Startups', '#Business']
+
 class MediaMonitor:
-    def __init__(self):
+    def __init__(self, buffer_size=10000, counting='exact', top_k=64, sketch_error=0.001, sketch_confidence=0.99,
+                 history_path=None, dedup=True, dedup_distance=3, dedup_ttl=6 * 3600):
         self.platforms = ['Twitter', 'Reddit', 'News', 'YouTube', 'TikTok']
         self.topics = [
             'AI Regulation', 'Quantum Computing', 'Sustainable Tech', 
             'Web3 Developments', 'Space Exploration', 'Biotech Breakthroughs',
             'Climate Tech', 'Cybersecurity', 'Metaverse', 'Edge Computing'
         ]
+        if counting == 'exact':
+            self.heavy_hitters = None
+        elif counting == 'approximate':
+            # Fixed-memory mode: only the top_k heaviest topics get a slot
+            self.heavy_hitters = HeavyHitters(top_k, epsilon=sketch_error, delta=1 - sketch_confidence)
+        else:
+            raise ValueError(f"counting must be 'exact' or 'approximate', not {counting!r}")
+        self.counting = counting
+        # Reposts and near-identical posts are dropped before they are counted
+        self.dedup = NearDuplicateFilter(dedup_distance, dedup_ttl) if dedup else None
+        self.buffer = RingBuffer(buffer_size)
+        self.store = TrendStore(self.platforms)
+        # Running aggregates over the buffered window, one row per topic slot,
+        # kept in step with the ring so snapshots never rescan it. A slot is
+        # reused when its topic drops out of the heavy-hitter set; the
+        # generation counter stops evicted events of the old occupant from
+        # being subtracted from the new one.
+        self._slot_topics = []
+        self._slot_ids = {}
+        self._slot_generation = np.zeros(16, np.int64)
+        self._volume = np.zeros(16, np.int64)
+        self._sentiment_sum = np.zeros(16)
+        self._platform_counts = np.zeros((16, len(self.platforms)), np.int64)
+        self._platform_sentiment_sum = np.zeros((16, len(self.platforms)))
+        self._last_seen = np.zeros(16, 'datetime64[s]')
+        self._event_slot = np.full(buffer_size, -1, np.int32)
+        self._event_generation = np.zeros(buffer_size, np.int64)
+        self.windows = SlidingWindowAggregator()
+        self.scorer = SentimentScorer()
+        self.detector = EmergingTrendDetector()
+        # Per-minute topic buckets; persisted to disk when history_path is set
+        self.history = TrendHistory(history_path)
+        # Which hashtags each topic's posts carry, for content generation
+        self.hashtags = HashtagIndex()
+        self._detected_minute = None
+        self._snapshot_seq = -1
     
-    def get_current_trends(self):
-        """Simulate real-time trend monitoring"""
-        trends = []
-        for i in range(8):
-            topic = random.choice(self.topics)
-            volume = random.randint(1000, 50000)
-            growth = random.uniform(5, 150)
-            sentiment = random.uniform(-0.8, 0.8)
-            
-            trends.append({
-                'topic': topic,
-                'volume': volume,
-                'growth_24h': f"{growth:.1f}%",
-                'sentiment': sentiment,
-                'platforms': random.sample(self.platforms, random.randint(1, 3)),
-                'emerging': random.choice([True, False]),
-                'timestamp': datetime.now() - timedelta(hours=random.randint(0, 12))
-            })
+    def ingest(self, event):
+        """Add one mention event to the stream; returns False if it was dropped as a near-duplicate"""
+        timestamp = event['timestamp'].timestamp()
+        if self.dedup is not None and event.get('text'):
+            if self.dedup.is_duplicate(event['text'], timestamp, event['platform']):
+                return False
+        position = self.buffer.head % self.buffer.capacity
+        evicted = self.buffer.append(event)
+        if evicted is not None:
+            slot = self._event_slot[position]
+            if slot >= 0 and self._event_generation[position] == self._slot_generation[slot]:
+                self._apply(slot, evicted, -1)
         
-        return trends
+        slot = self._slot_for(event['topic'])
+        self._event_slot[position] = slot
+        if slot >= 0:
+            # Untracked topics get no hashtag entry either, so approximate mode stays fixed-memory
+            if event.get('text'):
+                self.hashtags.add(event['topic'], event['text'], timestamp)
+            self._event_generation[position] = self._slot_generation[slot]
+            self._apply(slot, event, 1)
+            self.windows.add(slot, timestamp)
+            self.history.record(event['topic'], timestamp, event['sentiment'])
+            self._detect()
+        return True
+    
+    def ingest_many(self, events):
+        for event in events:
+            self.ingest(event)
+    
+    def _slot_for(self, topic):
+        """Aggregate row for a topic, or -1 if it is not tracked"""
+        if self.heavy_hitters is not None:
+            tracked, displaced = self.heavy_hitters.add(topic)
+            if not tracked:
+                return -1
+            if displaced is not None:
+                slot = self._slot_ids.pop(displaced)
+                self._reset_slot(slot)
+                self.hashtags.forget(displaced)
+                self._slot_topics[slot] = topic
+                self._slot_ids[topic] = slot
+                return slot
+        slot = self._slot_ids.get(topic)
+        if slot is None:
+            slot = self._slot_ids[topic] = len(self._slot_topics)
+            self._slot_topics.append(topic)
+            if slot >= len(self._volume):
+                self._grow(slot + 1)
+        return slot
+    
+    def _detect(self):
+        """Feed every minute bucket closed since the last call to the detector"""
+        minute = self.windows.current_minute
+        if self._detected_minute is None:
+            self._detected_minute = minute
+        for closed in range(max(self._detected_minute, minute - 60), minute):
+            for slot in self.detector.update(self.windows.minute_counts(closed), (closed + 1) * 60):
+                self.history.mark_emerging(self._slot_topics[slot], closed * 60)
+        self._detected_minute = minute
+    
+    def _reset_slot(self, slot):
+        self._slot_generation[slot] += 1
+        self._volume[slot] = 0
+        self._sentiment_sum[slot] = 0
+        self._platform_counts[slot] = 0
+        self._platform_sentiment_sum[slot] = 0
+        self._last_seen[slot] = np.datetime64(0, 's')
+        self.windows.reset(slot)
+        self.detector.reset(slot)
+    
+    def _apply(self, slot, event, sign):
+        self._volume[slot] += sign
+        self._sentiment_sum[slot] += sign * event['sentiment']
+        platform_id = self.store.platform_ids[event['platform']]
+        self._platform_counts[slot, platform_id] += sign
+        self._platform_sentiment_sum[slot, platform_id] += sign * event['sentiment']
+        if sign > 0:
+            self._last_seen[slot] = max(self._last_seen[slot], np.datetime64(event['timestamp'], 's'))
+    
+    def _grow(self, size):
+        capacity = max(size, 2 * len(self._volume))
+        extra = capacity - len(self._volume)
+        self._slot_generation = np.concatenate([self._slot_generation, np.zeros(extra, np.int64)])
+        self._volume = np.concatenate([self._volume, np.zeros(extra, np.int64)])
+        self._sentiment_sum = np.concatenate([self._sentiment_sum, np.zeros(extra)])
+        self._platform_counts = np.vstack([self._platform_counts, np.zeros((extra, len(self.platforms)), np.int64)])
+        self._platform_sentiment_sum = np.vstack([self._platform_sentiment_sum, np.zeros((extra, len(self.platforms)))])
+        self._last_seen = np.concatenate([self._last_seen, np.zeros(extra, 'datetime64[s]')])
+    
+    def _refresh_store(self):
+        """Rebuild the per-topic trend rows from the running aggregates"""
+        if not len(self.buffer):
+            # Nothing ingested yet: seed the window with simulated mentions
+            self.ingest_many(self.simulate_mentions(self.buffer.capacity))
+        if self._snapshot_seq == self.buffer.head:
+            return
+        slots = np.flatnonzero(self._volume)
+        volume = self._volume[slots]
+        counts = self._platform_counts[slots]
+        # Bitmask of each topic's three busiest platforms
+        busiest = np.argsort(-counts, axis=1, kind='stable')[:, :3]
+        present = np.take_along_axis(counts, busiest, axis=1) > 0
+        platform_mask = np.bitwise_or.reduce(np.where(present, 1 << busiest, 0), axis=1)
+        
+        self.store.load(
+            topic_id=self.store.intern_topics(self._slot_topics[slot] for slot in slots),
+            volume=volume,
+            growth=self.windows.growth(slots),
+            velocity=self.windows.velocity(slots),
+            sentiment=self._sentiment_sum[slots] / volume,
+            platform_mask=platform_mask,
+            emerging=self.detector.flags(slots),
+            timestamp=self._last_seen[slots]
+        )
+        self._snapshot_seq = self.buffer.head
+    
+    def simulate_mentions(self, count, hours=48):
+        """Simulate a time-ordered burst of raw mention events over the last few hours"""
+        weights = [random.uniform(0.2, 5) for _ in self.topics]
+        # Mentions older than a day are thinned by each topic's day-over-day growth
+        older_weights = [w / random.uniform(1.05, 2.5) for w in weights]
+        older_share = sum(older_weights) / (sum(weights) + sum(older_weights))
+        day = min(hours, 24) * 3600
+        now = datetime.now()
+        # One topic breaks out: ~3% of the burst lands on it in the last 20 minutes
+        breakout = random.choice(self.topics)
+        mentions = sorted(
+            ((random.uniform(0, 1200), breakout) if random.random() < 0.03 else
+             (random.uniform(day, hours * 3600), None) if random.random() < older_share else
+             (random.uniform(0, day), None)
+             for _ in range(count)),
+            key=lambda mention: mention[0],
+            reverse=True
+        )
+        # Each topic leans positive or negative; texts are scored in batches
+        mood = {topic: random.uniform(0.2, 0.8) for topic in self.topics}
+        positive, negative = list(POSITIVE_WORDS), list(NEGATIVE_WORDS)
+        recent = {topic: [] for topic in self.topics}
+        # Each topic's own tag, one per word, and the broad ones, most specific first
+        tags = {
+            topic: [f"#{topic.replace(' ', '')}"] + [f"#{word}" for word in topic.split()] + _GENERIC_TAGS
+            for topic in self.topics
+        }
+        for start in range(0, count, 1024):
+            batch = []
+            for age, topic in mentions[start:start + 1024]:
+                topic = topic or random.choices(self.topics, weights if age < day else older_weights)[0]
+                word = random.choice(positive if random.random() < mood[topic] else negative)
+                if recent[topic] and random.random() < 0.1:
+                    # Reposts of a recent post, which the dedup stage collapses
+                    text = f"RT @user{random.randint(1, 999)}: {random.choice(recent[topic])}"
+                else:
+                    text = f"{topic} {' '.join(random.sample(_FILLER, 3))} looks {word} {random.choice(_FILLER)}"
+                    if random.random() < 0.6:
+                        k = random.randint(1, 3)
+                        text += ' ' + ' '.join(dict.fromkeys(random.choices(tags[topic], k=k, weights=[
+                            len(tags[topic]) - i for i in range(len(tags[topic]))])))
+                    recent[topic] = recent[topic][-19:] + [text]
+                batch.append({
+                    'topic': topic,
+                    'platform': random.choice(self.platforms),
+                    'text': text,
+                    'timestamp': now - timedelta(seconds=age)
+                })
+            yield from self.scorer.score_events(batch)
+    
+    async def collect(self, fetcher, batch_size=256):
+        """Ingest one fetch cycle from a sources.SourceFetcher as events arrive.
+
+        Events are sentiment-scored in batches of batch_size before ingestion.
+        """
+        count = 0
+        batch = []
+        async for event in fetcher.stream(self.topics):
+            batch.append(event)
+            if len(batch) >= batch_size:
+                self.ingest_many(self.scorer.score_events(batch))
+                count += len(batch)
+                batch = []
+        self.ingest_many(self.scorer.score_events(batch))
+        return count + len(batch)
+    
+    def dedup_stats(self):
+        """How much volume the near-duplicate filter collapsed"""
+        return self.dedup.stats() if self.dedup is not None else None
+    
+    def platform_sentiment(self):
+        """Mean sentiment per platform over the buffered window"""
+        counts = self._platform_counts.sum(axis=0)
+        totals = self._platform_sentiment_sum.sum(axis=0)
+        return pd.Series(totals / np.maximum(counts, 1), index=self.platforms)
+    
+    def subscribe(self, from_start=False):
+        """Open a cursor that yields mention events as they are ingested"""
+        return Subscription(self.buffer, from_start=from_start)
+    
+    def get_current_trends(self, limit=8):
+        """Snapshot of the top topics in the buffered mention window"""
+        self._refresh_store()
+        return self.store.records(self.store.top(limit))
     
     def get_dashboard_data(self):
         """Generate dashboard visualization data"""
-        # Generate time series data
-        hours = 24
-        timestamps = [datetime.now() - timedelta(hours=h) for h in range(hours, 0, -1)]
+        self._refresh_store()
+        
+        # Trending topics table, straight from the store's columns
+        top = self.store.top(10)
+        sentiment = self.store['sentiment'][top]
+        topics = self.store.to_frame(top)
         
         data = {
-            'trends': [],
-            'topics': [],
-            'overall_sentiment': 0.65  # Generally positive
+            # Hourly timeline for the last day, read from the trend history
+            'trends': self.history.timeline(hours=24).to_dict('records'),
+            'topics': pd.DataFrame({
+                'Topic': topics['topic'],
+                'Mentions': topics['volume'],
+                'Growth': np.char.mod('%.1f%%', topics['growth'].to_numpy()),
+                'Sentiment': np.select(
+                    [sentiment > 0.4, sentiment > 0.1, sentiment > -0.1],
+                    ['🔥 Very Positive', '😊 Positive', '😐 Neutral'],
+                    '😟 Negative'
+                ),
+                'Platforms': topics['platforms']
+            }),
+            # Volume-weighted sentiment rescaled from [-1, 1] to the gauge's [0, 1]
+            'overall_sentiment': (self.store.overall_sentiment() + 1) / 2
         }
         
-        # Create trending topics
-        for i in range(10):
-            topic = random.choice(self.topics)
-            data['topics'].append({
-                'Topic': topic,
-                'Mentions': random.randint(1000, 50000),
-                'Growth': f"{random.uniform(5, 200):.1f}%",
-                'Sentiment': random.choice(['🔥 Very Positive', '😊 Positive', '😐 Neutral', '😟 Negative']),
-                'Platforms': ', '.join(random.sample(self.platforms, 2))
-            })
-        
-        # Create timeline data
-        for ts in timestamps:
-            data['trends'].append({
-                'timestamp': ts,
-                'mentions': random.randint(500, 3000),
-                'sentiment': random.uniform(0.3, 0.9),
-                'events': random.randint(0, 3)
-            })
-        
         return data
\ No newline at end of file
@@ -0,0 +1,200 @@
+import copy
+import itertools
+import queue
+import threading
+import time
+
+class _Stop(Exception):
+    """Raised inside a stage thread when the pipeline is being torn down"""
+
+_END = object()
+
+class StageStats:
+    """Timings for one stage of a pipeline run, in seconds from the start of the run"""
+    
+    __slots__ = ('name', 'items', 'busy', 'waiting', 'first_output', 'finished')
+    
+    def __init__(self, name):
+        self.name = name
+        self.items = 0           # outputs produced
+        self.busy = 0.0          # time spent in the stage's own code
+        self.waiting = 0.0       # time blocked on upstream input or a full downstream queue
+        self.first_output = None
+        self.finished = None
+    
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class Pipeline:
+    """Stages running concurrently on their own threads, linked by bounded queues.
+
+    A stage is a function that takes an iterator over the previous stage's
+    outputs (the first stage gets the run's source) and yields its own, so
+    a stage can emit each result as soon as it is ready and the next stage
+    starts on it while the rest are still being worked on. Queues hold at
+    most `queue_size` items, so a fast stage cannot run far ahead of a
+    slow one. Work releases the GIL while it waits on I/O or a model
+    server, which is where the overlap comes from.
+
+        pipeline = Pipeline()
+        pipeline.add('discover', lambda trends: ...)
+        pipeline.add('create', lambda opportunities: ...)
+        for package in pipeline.run([trends]):
+            ...
+        pipeline.stats  # one StageStats per stage
+
+    An exception in any stage stops the run and is re-raised by run().
+    """
+    
+    def __init__(self, queue_size=8):
+        self.queue_size = queue_size
+        self.stages = []  # (name, function)
+        self.stats = []
+        self.elapsed = None
+    
+    def add(self, name, stage):
+        self.stages.append((name, stage))
+        return self
+    
+    def run(self, source=(None,)):
+        """Yield the last stage's outputs as they arrive"""
+        started = time.perf_counter()
+        stop = threading.Event()
+        errors = []
+        self.stats = [StageStats(name) for name, _ in self.stages]
+        queues = [queue.Queue(self.queue_size) for _ in self.stages]
+        
+        def get(inbox, stats):
+            # Blocking read that gives up when the run is torn down
+            while True:
+                waited = time.perf_counter()
+                try:
+                    item = inbox.get(timeout=0.05)
+                except queue.Empty:
+                    if stop.is_set():
+                        raise _Stop()
+                    continue
+                finally:
+                    stats.waiting += time.perf_counter() - waited
+                return item
+        
+        def put(outbox, item, stats):
+            waited = time.perf_counter()
+            try:
+                while True:
+                    try:
+                        outbox.put(item, timeout=0.05)
+                        return
+                    except queue.Full:
+                        if stop.is_set():
+                            raise _Stop()
+            finally:
+                stats.waiting += time.perf_counter() - waited
+        
+        def inputs(inbox, stats):
+            while True:
+                item = get(inbox, stats)
+                if item is _END:
+                    return
+                yield item
+        
+        def work(index, stage):
+            stats = self.stats[index]
+            begun = time.perf_counter()
+            items = iter(source) if index == 0 else inputs(queues[index - 1], stats)
+            try:
+                for output in stage(items):
+                    if stats.first_output is None:
+                        stats.first_output = time.perf_counter() - started
+                    stats.items += 1
+                    put(queues[index], output, stats)
+            except _Stop:
+                pass
+            except BaseException as error:
+                errors.append(error)
+                stop.set()
+            finally:
+                stats.finished = time.perf_counter() - started
+                stats.busy = max(0.0, stats.finished - (begun - started) - stats.waiting)
+                try:
+                    put(queues[index], _END, stats)
+                except _Stop:
+                    pass
+        
+        threads = [threading.Thread(target=work, args=(i, stage), name=f"pipeline-{name}", daemon=True)
+                   for i, (name, stage) in enumerate(self.stages)]
+        for thread in threads:
+            thread.start()
+        collector = StageStats('collect')
+        try:
+            while True:
+                try:
+                    item = get(queues[-1], collector)
+                except _Stop:
+                    break
+                if item is _END:
+                    break
+                yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self.elapsed = time.perf_counter() - started
+        if errors:
+            raise errors[0]
+
+class SnapshotStages:
+    """The app's Monitor -> Discover -> Create stages over shared resources, and what a run collects.
+
+    `mentions` new mentions are ingested in `chunks` steps and the trends
+    rescored after each one, so discovery starts on the first chunk, and an
+    opportunity goes on to content generation as soon as it first reaches
+    the top `opportunities` while later chunks are still being ingested.
+    A run leaves a read-only copy of the trends after each chunk in
+    `trends`, a copy of every opportunity found (with its final scores) in
+    `latest` and whether the index had already covered it in `covered`;
+    later runs leave them alone, so readers can keep them.
+    """
+    
+    def __init__(self, monitor, discoverer, index, generator, mentions, opportunities, formats, chunks=4):
+        self.monitor = monitor
+        self.discoverer = discoverer
+        self.index = index
+        self.generator = generator
+        self.mentions = mentions
+        self.opportunities = opportunities
+        self.formats = formats
+        self.chunks = chunks
+        self.trends, self.latest, self.covered = [], {}, {}
+    
+    def pipeline(self, queue_size=8):
+        """A Pipeline running the three stages; call run() on it for (opportunity, package) pairs"""
+        return (Pipeline(queue_size).add('Monitor', self.monitor_stage).add('Discover', self.discover_stage)
+                .add('Create', self.create_stage))
+    
+    def monitor_stage(self, _):
+        self.trends = trends = []
+        events = self.monitor.simulate_mentions(self.mentions)
+        for _ in range(self.chunks):
+            self.monitor.ingest_many(itertools.islice(events, -(-self.mentions // self.chunks)))
+            self.monitor.get_current_trends()
+            trends.append(self.monitor.store.copy(writeable=False))
+            yield trends[-1]
+    
+    def discover_stage(self, stores):
+        self.latest = latest = {}
+        self.covered = covered = {}
+        for store in stores:
+            self.discoverer.update_trends(store)
+            for opportunity in self.discoverer.top_opportunities(self.opportunities):
+                # The leaderboard updates its opportunities in place on the next chunk
+                found = opportunity.title not in latest
+                latest[opportunity.title] = copy.copy(opportunity)
+                if found:
+                    # Checked against earlier runs only; this one is recorded once all are out
+                    covered[opportunity.title] = self.index.covered(opportunity)
+                    yield latest[opportunity.title]
+        self.index.add_many(latest.values())
+    
+    def create_stage(self, found):
+        yield from self.generator.create_content_packages(found, self.formats)
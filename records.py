@@ -0,0 +1,357 @@
+import re
+import threading
+from collections.abc import MutableMapping
+
+class TopicRegistry:
+    """Interns topic names to integer IDs and caches their derived spellings.
+
+    Hashtag, lowercase and slug forms are computed once per topic, so the
+    discovery and generation stages never re-format the same string.
+    Safe to share between threads: lookups of known names take no lock,
+    new names are added under one.
+    """
+    
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self._lower = []
+        self._hashtag = []
+        self._slug = []
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def intern(self, name):
+        topic_id = self.ids.get(name)
+        if topic_id is not None:
+            return topic_id
+        with self._lock:
+            # Another thread may have added it while we waited
+            topic_id = self.ids.get(name)
+            if topic_id is None:
+                topic_id = len(self.names)
+                self.names.append(name)
+                self._lower.append(name.lower())
+                self._hashtag.append(f"#{name.replace(' ', '')}")
+                self._slug.append(re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-'))
+                # Published last, so an ID seen without the lock has every spelling in place
+                self.ids[name] = topic_id
+        return topic_id
+    
+    def name(self, topic_id):
+        return self.names[topic_id]
+    
+    def lower(self, topic_id):
+        return self._lower[topic_id]
+    
+    def hashtag(self, topic_id):
+        return self._hashtag[topic_id]
+    
+    def slug(self, topic_id):
+        return self._slug[topic_id]
+
+# Process-wide registry shared by the store, discovery and generation stages
+TOPICS = TopicRegistry()
+
+class Record:
+    """Slotted record that still answers dict-style access (record['field'])"""
+    
+    __slots__ = ()
+    FIELDS = ()
+    
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key):
+        return key in self.FIELDS
+    
+    def __iter__(self):
+        return iter(self.FIELDS)
+    
+    def __len__(self):
+        return len(self.FIELDS)
+    
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and all(self[key] == other[key] for key in self.FIELDS)
+        return NotImplemented
+    
+    def __getstate__(self):
+        # Topic IDs are only meaningful inside one process, so pickles carry the name
+        return [TOPICS.names[value] if name == 'topic_id' else value
+                for name, value in ((name, getattr(self, name)) for name in self.__slots__)]
+    
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, TOPICS.intern(value) if name == 'topic_id' else value)
+    
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+    
+    def keys(self):
+        return list(self.FIELDS)
+    
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.FIELDS]
+    
+    def to_dict(self):
+        return dict(self.items())
+    
+    def __repr__(self):
+        fields = ', '.join(f"{key}={getattr(self, key)!r}" for key in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+class _TopicFields:
+    """Topic name and derived spellings resolved through the registry"""
+    
+    __slots__ = ()
+    
+    @property
+    def topic(self):
+        return TOPICS.names[self.topic_id]
+    
+    @topic.setter
+    def topic(self, name):
+        self.topic_id = TOPICS.intern(name)
+    
+    @property
+    def topic_lower(self):
+        return TOPICS.lower(self.topic_id)
+    
+    @property
+    def hashtag(self):
+        return TOPICS.hashtag(self.topic_id)
+    
+    @property
+    def slug(self):
+        return TOPICS.slug(self.topic_id)
+
+class Trend(_TopicFields, Record):
+    __slots__ = ('topic_id', 'volume', 'growth_24h', 'velocity', 'sentiment', 'platforms', 'emerging', 'timestamp')
+    FIELDS = ('topic', 'volume', 'growth_24h', 'velocity', 'sentiment', 'platforms', 'emerging', 'timestamp')
+    
+    def __init__(self, topic_id, volume=0, growth_24h=0.0, velocity=0.0, sentiment=0.0, platforms=(), emerging=False,
+                 timestamp=None):
+        self.topic_id = topic_id
+        self.volume = volume
+        self.growth_24h = growth_24h
+        self.velocity = velocity
+        self.sentiment = sentiment
+        self.platforms = platforms
+        self.emerging = emerging
+        self.timestamp = timestamp
+
+class Opportunity(_TopicFields, Record):
+    __slots__ = ('id', 'title', 'topic_id', 'score', 'metrics', 'brief', 'recommended_formats', 'timing', 'audience')
+    FIELDS = ('id', 'title', 'trend', 'score', 'metrics', 'brief', 'recommended_formats', 'timing', 'audience')
+    
+    def __init__(self, id, title, topic_id, score, metrics, brief, recommended_formats=(), timing='', audience=None):
+        self.id = id
+        self.title = title
+        self.topic_id = topic_id
+        self.score = score
+        self.metrics = metrics
+        self.brief = brief
+        self.recommended_formats = recommended_formats
+        self.timing = timing
+        self.audience = audience
+    
+    # Older code reads the topic name as opportunity['trend']
+    trend = _TopicFields.topic
+
+class Deferred:
+    """Placeholder for a package section that is computed on first access"""
+    
+    __slots__ = ('build',)
+    
+    def __init__(self, build):
+        self.build = build
+
+class LazyFormats(MutableMapping):
+    """Format name -> content, each built on first access and then memoized.
+
+    Listing formats (iteration, len, `in`) never builds anything; reading
+    one builds only that one. Builds hold a lock, so a package shared
+    between threads builds each format once. dict(), equality and pickling
+    build everything that is still pending.
+    """
+    
+    def __init__(self, builders=None, values=None):
+        self._builders = dict(builders or {})  # name -> zero-argument callable, until built
+        self._values = dict(values or {})
+        self._order = list(self._values) + [name for name in self._builders if name not in self._values]
+        self._lock = threading.Lock()
+        self.on_build = None
+    
+    def __getitem__(self, name):
+        if name in self._values:
+            return self._values[name]
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = self._builders[name]()
+                del self._builders[name]
+        if self.on_build is not None:
+            self.on_build()
+        return self._values[name]
+    
+    def __setitem__(self, name, value):
+        with self._lock:
+            if name not in self:
+                self._order.append(name)
+            self._builders.pop(name, None)
+            self._values[name] = value
+        if self.on_build is not None:
+            self.on_build()
+    
+    def __delitem__(self, name):
+        with self._lock:
+            if name not in self:
+                raise KeyError(name)
+            self._builders.pop(name, None)
+            self._values.pop(name, None)
+            self._order.remove(name)
+    
+    def __contains__(self, name):
+        return name in self._values or name in self._builders
+    
+    def __iter__(self):
+        return iter(list(self._order))
+    
+    def __len__(self):
+        return len(self._order)
+    
+    @property
+    def pending(self):
+        """Formats not built yet"""
+        return [name for name in self._order if name in self._builders]
+    
+    def materialize(self):
+        return {name: self[name] for name in self._order}
+    
+    def __reduce__(self):
+        return LazyFormats, (None, self.materialize())
+    
+    def __repr__(self):
+        return repr({name: self._values.get(name, '<pending>') for name in self._order})
+
+def _section(slot):
+    """Property that resolves a Deferred value in `slot` on first read"""
+    
+    def get(self):
+        value = getattr(self, slot)
+        if not isinstance(value, Deferred):
+            return value
+        with self._lock:
+            # Another thread may have built it while we waited
+            value = getattr(self, slot)
+            built = isinstance(value, Deferred)
+            if built:
+                value = value.build()
+                setattr(self, slot, value)
+        if built:
+            self._built()
+        return value
+    
+    def set(self, value):
+        setattr(self, slot, value)
+    
+    return property(get, set)
+
+class ContentPackage(Record):
+    """Generated content for one opportunity.
+
+    `formats` may be a LazyFormats and hashtags, timing and
+    performance_predictions may be Deferred, so nothing is generated until
+    someone reads it. to_dict() and pickling produce the complete package.
+    Sections and lazy formats are built under one lock per package, so
+    each is built once and completion callbacks fire once.
+    """
+    
+    __slots__ = ('opportunity_title', 'topic_id', 'generated_at', '_formats', '_hashtags', '_timing',
+                 '_performance_predictions', '_on_complete', '_lock')
+    FIELDS = ('opportunity_title', 'generated_at', 'formats', 'hashtags', 'timing', 'performance_predictions')
+    
+    def __init__(self, opportunity_title, topic_id, generated_at=None, formats=None, hashtags=(), timing=None,
+                 performance_predictions=None):
+        self.opportunity_title = opportunity_title
+        self.topic_id = topic_id
+        self.generated_at = generated_at
+        self._on_complete = None
+        self._lock = threading.RLock()
+        self.formats = formats if formats is not None else {}
+        self.hashtags = hashtags
+        self.timing = timing if timing is not None else {}
+        self.performance_predictions = performance_predictions if performance_predictions is not None else {}
+    
+    @property
+    def topic(self):
+        return TOPICS.names[self.topic_id]
+    
+    @property
+    def formats(self):
+        return self._formats
+    
+    @formats.setter
+    def formats(self, formats):
+        if isinstance(formats, LazyFormats):
+            formats.on_build = self._built
+            formats._lock = self._lock
+        self._formats = formats
+    
+    hashtags = _section('_hashtags')
+    timing = _section('_timing')
+    performance_predictions = _section('_performance_predictions')
+    
+    def pending(self):
+        """Sections and formats that have not been generated yet"""
+        sections = [slot[1:] for slot in ('_hashtags', '_timing', '_performance_predictions')
+                    if isinstance(getattr(self, slot), Deferred)]
+        formats = self._formats.pending if isinstance(self._formats, LazyFormats) else []
+        return sections + [f"formats.{name}" for name in formats]
+    
+    def when_complete(self, callback):
+        """Call callback() once nothing is pending, right away if that is already the case"""
+        with self._lock:
+            if self.pending():
+                self._on_complete = (self._on_complete or []) + [callback]
+                return
+        callback()
+    
+    def _built(self):
+        with self._lock:
+            if not self._on_complete or self.pending():
+                return
+            callbacks, self._on_complete = self._on_complete, None
+        for callback in callbacks:
+            callback()
+    
+    def materialize(self):
+        """Generate everything still pending; returns the package"""
+        for name in ('hashtags', 'timing', 'performance_predictions'):
+            getattr(self, name)
+        if isinstance(self._formats, LazyFormats):
+            self._formats.materialize()
+        return self
+    
+    def to_dict(self):
+        data = super().to_dict()
+        data['formats'] = dict(data['formats'])
+        return data
+    
+    def __getstate__(self):
+        self.materialize()
+        # Completion callbacks belong to this process (e.g. a pending cache write)
+        return [None if name in ('_on_complete', '_lock') else value
+                for name, value in zip(self.__slots__, super().__getstate__())]
+    
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._lock = threading.RLock()
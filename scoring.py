@@ -0,0 +1,162 @@
+import numpy as np
+
+METRICS = ('virality', 'competition_gap', 'audience_fit', 'resource_efficiency')
+
+DEFAULT_WEIGHTS = {
+    'virality': 0.35,
+    'competition_gap': 0.25,
+    'audience_fit': 0.25,
+    'resource_efficiency': 0.15
+}
+
+def trend_columns(trends):
+    """Volume, growth, velocity, sentiment and emerging arrays from a TrendStore, a snapshot or a list of trends"""
+    if isinstance(trends, dict):
+        return trends
+    if hasattr(trends, 'COLUMNS'):
+        return {
+            'volume': trends['volume'].astype(float),
+            'growth': trends['growth'].astype(float),
+            'velocity': trends['velocity'].astype(float),
+            'sentiment': trends['sentiment'].astype(float),
+            'emerging': trends['emerging'].astype(float)
+        }
+    return {
+        'volume': np.array([trend['volume'] for trend in trends], float),
+        'growth': np.array([trend.get('growth_24h', 0.0) for trend in trends], float),
+        'velocity': np.array([trend.get('velocity', 0.0) for trend in trends], float),
+        'sentiment': np.array([trend.get('sentiment', 0.0) for trend in trends], float),
+        'emerging': np.array([trend.get('emerging', False) for trend in trends], float)
+    }
+
+def _relative(values, top=None):
+    """Scale non-negative values to [0, 1] by `top`, or by the batch maximum"""
+    if top is None:
+        top = values.max() if len(values) else 0.0
+    return np.minimum(values / top, 1.0) if top > 0 else np.zeros_like(values)
+
+def _signals(columns):
+    return {
+        'growth': np.log1p(np.maximum(columns['growth'], 0)),
+        'velocity': np.log1p(np.maximum(columns['velocity'], 0)),
+        'volume': np.log1p(np.maximum(columns['volume'], 0))
+    }
+
+class OpportunityScorer:
+    """Scores every (trend, template, audience) candidate in one pass.
+
+    Per-trend signals (virality, competition gap) and per-pair priors
+    (audience fit, resource efficiency) are broadcast into a
+    (trends, pairs, metrics) matrix and reduced with the metric weights in
+    a single matmul; the top K are picked with np.argpartition.
+    """
+    
+    def __init__(self, templates, weights=None):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.weights.update(weights or {})
+        unknown = set(self.weights) - set(METRICS)
+        if unknown:
+            raise KeyError(f"unknown metrics: {sorted(unknown)}")
+        self.set_templates(templates)
+    
+    def set_templates(self, templates):
+        """Flatten templates into (template, audience) pairs with their priors"""
+        self.templates = templates
+        pair_template = []
+        pair_audience = []
+        fit = []
+        affinity = []
+        efficiency = []
+        for t, template in enumerate(templates):
+            priors = template.get('audience_fit', [7.0] * len(template['audiences']))
+            for a, audience in enumerate(template['audiences']):
+                pair_template.append(t)
+                pair_audience.append(audience)
+                fit.append(priors[a])
+                affinity.append(template.get('sentiment_affinity', 0.0))
+                efficiency.append(template.get('efficiency', 8.0))
+        self.pair_template = np.array(pair_template, np.intp)
+        self.pair_audience = pair_audience
+        self._fit = np.array(fit)
+        self._affinity = np.array(affinity)
+        self._efficiency = np.array(efficiency)
+    
+    def weight_vector(self):
+        weights = np.array([self.weights[metric] for metric in METRICS], float)
+        return weights / weights.sum()
+    
+    def running_scale(self, scale, columns, decay=0.9):
+        """Fold a batch into a decaying per-signal maximum, so partial updates share one scale"""
+        scale = dict(scale or {})
+        for name, values in _signals(columns).items():
+            peak = values.max() if len(values) else 0.0
+            scale[name] = max(scale.get(name, 0.0) * decay, peak)
+        return scale
+    
+    def features(self, columns, scale=None):
+        """(trends, pairs, metrics) matrix of metric values on a 0-10 scale.
+
+        Signals are normalized by the batch maximum unless a `scale` from
+        running_scale() is given.
+        """
+        scale = scale or {}
+        signals = _signals(columns)
+        growth = _relative(signals['growth'], scale.get('growth'))
+        velocity = _relative(signals['velocity'], scale.get('velocity'))
+        volume = _relative(signals['volume'], scale.get('volume'))
+        # Fast-moving topics spread; fast-growing but still small ones are under-covered
+        virality = 10 * (0.5 * growth + 0.3 * velocity + 0.2 * columns['emerging'])
+        gap = 10 * (0.5 * growth + 0.5 * (1 - volume))
+        # Debunks suit negative coverage, explainers and outlooks suit positive coverage
+        fit = self._fit[None, :] + 2 * self._affinity[None, :] * columns['sentiment'][:, None]
+        
+        n_trends, n_pairs = len(volume), len(self._fit)
+        features = np.empty((n_trends, n_pairs, len(METRICS)))
+        features[:, :, 0] = virality[:, None]
+        features[:, :, 1] = gap[:, None]
+        features[:, :, 2] = fit
+        features[:, :, 3] = self._efficiency[None, :]
+        return np.clip(features, 0, 10)
+    
+    def score(self, trends, scale=None):
+        """(features, scores) for every candidate; scores is (trends, pairs) on 0-10"""
+        features = self.features(trend_columns(trends), scale)
+        return features, features @ self.weight_vector()
+    
+    def best_per_trend(self, trends, scale=None):
+        """(pair index, score, metrics row) of each trend's best candidate"""
+        features, scores = self.score(trends, scale)
+        pairs = scores.argmax(axis=1)
+        rows = np.arange(len(pairs))
+        return pairs, scores[rows, pairs], features[rows, pairs]
+    
+    def top(self, trends, k, one_per_trend=True, trend_mask=None, pair_mask=None):
+        """Best k candidates as (trend index, pair index, score, metrics row) arrays, best first.
+
+        Boolean masks exclude trends or (template, audience) pairs up front.
+        Excluded (or otherwise non-finite) candidates are never returned, so
+        fewer than k come back when not enough are left; k <= 0 gives none.
+        """
+        features, scores = self.score(trends)
+        if trend_mask is not None or pair_mask is not None:
+            allowed = np.ones(scores.shape, bool)
+            if trend_mask is not None:
+                allowed &= np.asarray(trend_mask, bool)[:, None]
+            if pair_mask is not None:
+                allowed &= np.asarray(pair_mask, bool)[None, :]
+            scores = np.where(allowed, scores, -np.inf)
+        if one_per_trend:
+            pairs = scores.argmax(axis=1)
+            flat = scores[np.arange(len(pairs)), pairs]
+            trend_ids = np.arange(len(pairs))
+        else:
+            flat = scores.ravel()
+            trend_ids, pairs = np.divmod(np.arange(flat.size), scores.shape[1])
+        candidates = np.flatnonzero(np.isfinite(flat))
+        if k <= 0:
+            candidates = candidates[:0]
+        elif k < len(candidates):
+            candidates = candidates[np.argpartition(flat[candidates], -k)[-k:]]
+        best = candidates[np.argsort(-flat[candidates], kind='stable')]
+        rows, pairs = trend_ids[best], pairs[best]
+        return rows, pairs, flat[best], features[rows, pairs]
@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import time
+from array import array
+from collections import Counter
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {'a', 'an', 'and', 'the', 'of', 'to', 'in', 'on', 'for', 'with', 'about', 'how', 'what', 'is', 'are',
+              'over', 'rather', 'than', 'from', 'by', 'or', 'not'}
+FIELDS = ('title', 'trend', 'brief', 'formats', 'audience')
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+class OpportunityIndex:
+    """Inverted index over every opportunity ever discovered.
+
+    Each term maps to an append-only posting list of document IDs (with
+    term frequencies) in compact int arrays, so adding an opportunity
+    touches only its own terms and the lists stay sorted for free. Queries
+    copy the lists they touch into NumPy (a memcpy), which keeps readers
+    from pinning buffers that writers need to grow. Terms are indexed both bare and
+    per field ("trend:web3"). Boolean queries intersect posting lists with
+    NumPy; ranked queries are BM25 accumulated with np.bincount.
+
+    With a path, documents are appended to an NDJSON log and replayed on
+    startup, so the index survives restarts.
+    """
+    
+    def __init__(self, path=None, k1=1.2, b=0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.docs = []
+        self._postings = {}   # term -> (doc ids, term frequencies)
+        self._lengths = array('i')
+        self._text_sizes = array('i')  # distinct title + brief terms per doc, for covered()
+        self._total_length = 0
+        self._norm = np.zeros(0)  # BM25 length normalization, rebuilt when docs are added
+        self._fingerprints = {}  # (trend, title, brief) -> doc id
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            self._index(json.loads(line))
+    
+    def __len__(self):
+        return len(self.docs)
+    
+    def _document(self, opportunity):
+        return {
+            'title': opportunity['title'],
+            'trend': opportunity['trend'],
+            'brief': opportunity['brief'],
+            'formats': list(opportunity.get('recommended_formats') or []),
+            'audience': opportunity.get('audience') or '',
+            'score': opportunity['score'],
+            'indexed_at': time.time()
+        }
+    
+    def _index(self, doc):
+        doc_id = len(self.docs)
+        self.docs.append(doc)
+        self._fingerprints[(doc['trend'], doc['title'], doc['brief'])] = doc_id
+        terms = []
+        text_terms = set()
+        for field in FIELDS:
+            value = doc[field]
+            tokens = tokenize(' '.join(value) if isinstance(value, list) else value)
+            terms += tokens
+            terms += [f"{field}:{token}" for token in tokens]
+            if field == 'title' or field == 'brief':
+                text_terms.update(tokens)
+        length = len(terms) // 2
+        counts = Counter(terms)
+        counts.update([f"text:{token}" for token in text_terms])
+        self._text_sizes.append(len(text_terms))
+        counts[f"={doc['trend']}"] = 1  # exact-trend posting list for covered()
+        for term, count in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array('i'), array('i'))
+            postings[0].append(doc_id)
+            postings[1].append(count)
+        self._lengths.append(length)
+        self._total_length += length
+        return doc_id
+    
+    def add(self, opportunity):
+        """Index one opportunity; exact repeats (same trend, title and brief) are not stored twice"""
+        doc = self._document(opportunity)
+        existing = self._fingerprints.get((doc['trend'], doc['title'], doc['brief']))
+        if existing is not None:
+            return existing
+        if self.path is not None:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(doc) + '\n')
+        return self._index(doc)
+    
+    def add_many(self, opportunities):
+        return [self.add(opportunity) for opportunity in opportunities]
+    
+    def postings(self, term):
+        """Sorted doc IDs containing a term"""
+        postings = self._postings.get(term)
+        if postings is None:
+            return np.zeros(0, np.int32)
+        return np.array(postings[0], np.int32)
+    
+    def _term(self, word):
+        field, _, value = word.rpartition(':')
+        tokens = tokenize(value)
+        if not tokens:
+            return None
+        return f"{field}:{tokens[0]}" if field in FIELDS else tokens[0]
+    
+    def boolean(self, query):
+        """Doc IDs matching a boolean query.
+
+        Terms are ANDed; OR separates alternatives; a leading '-' or NOT
+        excludes a term; field:term restricts to one field.
+        """
+        matches = np.zeros(0, np.int32)
+        for clause in re.split(r'\s+OR\s+', query.strip()):
+            include, exclude = [], []
+            negate = False
+            for word in clause.split():
+                if word == 'NOT':
+                    negate = True
+                    continue
+                if word.startswith('-'):
+                    negate, word = True, word[1:]
+                term = self._term(word)
+                if term is not None:
+                    (exclude if negate else include).append(term)
+                negate = False
+            if not include:
+                continue
+            lists = sorted((self.postings(term) for term in include), key=len)
+            result = lists[0]
+            for other in lists[1:]:
+                result = np.intersect1d(result, other, assume_unique=True)
+            for term in exclude:
+                result = np.setdiff1d(result, self.postings(term), assume_unique=True)
+            matches = np.union1d(matches, result)
+        return matches
+    
+    def search(self, query, k=10, boolean=None):
+        """Top k (doc ID, BM25 score) pairs for a free-text query, optionally limited to a boolean query's matches"""
+        n = len(self.docs)
+        if not n:
+            return []
+        if len(self._norm) != n:
+            lengths = np.array(self._lengths, np.int32)
+            self._norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / n))
+        norm = self._norm
+        # Accumulate only over docs that contain a query term, not the whole corpus
+        doc_ids, contributions = [], []
+        negate = False
+        for word in query.split():
+            # Operators and excluded terms filter (via `boolean`) but never add score
+            if word in ('OR', 'NOT') or negate or word.startswith('-'):
+                negate = word == 'NOT'
+                continue
+            term = self._term(word)
+            postings = self._postings.get(term) if term else None
+            if postings is None:
+                continue
+            ids, tf = np.array(postings[0], np.int32), np.array(postings[1], float)
+            idf = np.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            doc_ids.append(ids)
+            contributions.append(idf * tf * (self.k1 + 1) / (tf + norm[ids]))
+        if not doc_ids:
+            return []
+        docs, inverse = np.unique(np.concatenate(doc_ids), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+        if boolean is not None:
+            keep = np.isin(docs, self.boolean(boolean), assume_unique=True)
+            docs, scores = docs[keep], scores[keep]
+        k = min(k, len(docs))
+        if not k:
+            return []
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return list(zip(docs[top].tolist(), scores[top].tolist()))
+    
+    def covered(self, opportunity, threshold=0.6):
+        """Most similar earlier doc on the same trend, if its title + brief terms overlap by `threshold` (Jaccard)"""
+        terms = set(tokenize(opportunity['title'])) | set(tokenize(opportunity['brief']))
+        candidates = self.postings(f"={opportunity['trend']}")
+        if not terms or not len(candidates):
+            return None
+        # Shared distinct terms per doc, counted straight off the posting lists
+        shared = np.bincount(np.concatenate([self.postings(f"text:{term}") for term in terms]),
+                             minlength=len(self.docs))[candidates]
+        sizes = np.array(self._text_sizes, np.int32)[candidates]
+        overlap = shared / (len(terms) + sizes - shared)
+        best = int(np.argmax(overlap))
+        if overlap[best] < threshold:
+            return None
+        return int(candidates[best])
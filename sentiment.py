@@ -0,0 +1,98 @@
+import re
+import zlib
+import numpy as np
+
+POSITIVE_WORDS = {
+    'good': 1.0, 'great': 1.5, 'excellent': 2.0, 'amazing': 2.0, 'awesome': 1.8, 'love': 1.8,
+    'breakthrough': 1.8, 'innovative': 1.4, 'promising': 1.3, 'exciting': 1.5, 'impressive': 1.5,
+    'win': 1.2, 'wins': 1.2, 'success': 1.5, 'successful': 1.5, 'growth': 0.8, 'growing': 0.8,
+    'boost': 1.0, 'gain': 0.9, 'gains': 0.9, 'improve': 1.0, 'improved': 1.0, 'better': 1.0,
+    'best': 1.5, 'secure': 0.8, 'safe': 0.8, 'helpful': 1.2, 'useful': 1.0, 'easy': 0.8,
+    'fast': 0.7, 'efficient': 1.0, 'opportunity': 1.0, 'thrilled': 1.8, 'bullish': 1.5
+}
+
+NEGATIVE_WORDS = {
+    'bad': -1.0, 'terrible': -2.0, 'awful': -2.0, 'hate': -1.8, 'worst': -2.0, 'worse': -1.2,
+    'fail': -1.5, 'fails': -1.5, 'failure': -1.6, 'risk': -0.8, 'risky': -1.0, 'danger': -1.5,
+    'dangerous': -1.6, 'threat': -1.3, 'breach': -1.6, 'hack': -1.3, 'hacked': -1.6, 'scam': -2.0,
+    'fraud': -2.0, 'crash': -1.6, 'decline': -1.0, 'loss': -1.2, 'losses': -1.2, 'ban': -1.0,
+    'banned': -1.1, 'concern': -0.8, 'concerns': -0.8, 'worried': -1.2, 'fear': -1.3, 'hype': -0.6,
+    'overhyped': -1.4, 'broken': -1.4, 'slow': -0.7, 'expensive': -0.8, 'bearish': -1.5
+}
+
+NEGATORS = ('not', 'no', 'never', "isn't", "aren't", "don't", "doesn't", "won't", "can't", 'without')
+
+_TOKEN = re.compile(r"[a-z']+")
+
+class SentimentScorer:
+    """Lexicon sentiment over hashed bag-of-words features, scored in batches.
+
+    A batch of texts becomes one sparse (document, feature) matrix held as
+    parallel index arrays; its product with the weight vector is a single
+    np.bincount. A negator flips the weight of the token after it.
+    """
+    
+    def __init__(self, lexicon=None, n_features=2 ** 18):
+        if lexicon is None:
+            lexicon = {**POSITIVE_WORDS, **NEGATIVE_WORDS}
+        self.n_features = n_features
+        self.weights = np.zeros(n_features, np.float32)
+        for word, weight in lexicon.items():
+            self.weights[self._feature(word)] = weight
+        self._negators = np.zeros(n_features, bool)
+        for word in NEGATORS:
+            self._negators[self._feature(word)] = True
+        self._features = {}  # token -> feature index, so each token is hashed once
+    
+    def _feature(self, token):
+        return zlib.crc32(token.encode()) % self.n_features
+    
+    def featurize(self, texts):
+        """Sparse bag-of-words as (doc_ids, feature_ids) index arrays"""
+        features = self._features
+        if len(features) > 1_000_000:
+            features.clear()
+        doc_ids = []
+        feature_ids = []
+        for doc, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            for token in tokens:
+                feature = features.get(token)
+                if feature is None:
+                    feature = features[token] = self._feature(token)
+                feature_ids.append(feature)
+            doc_ids.extend([doc] * len(tokens))
+        return np.asarray(doc_ids, np.int64), np.asarray(feature_ids, np.int64)
+    
+    def score(self, texts):
+        """Sentiment in [-1, 1] for each text"""
+        texts = list(texts)
+        if not texts:
+            return np.zeros(0)
+        doc_ids, feature_ids = self.featurize(texts)
+        weights = self.weights[feature_ids]
+        negated = np.zeros(len(feature_ids), bool)
+        if len(feature_ids) > 1:
+            negated[1:] = self._negators[feature_ids[:-1]] & (doc_ids[1:] == doc_ids[:-1])
+        weights = np.where(negated, -weights, weights)
+        totals = np.bincount(doc_ids, weights=weights, minlength=len(texts))
+        lengths = np.bincount(doc_ids, minlength=len(texts))
+        return np.tanh(totals / np.sqrt(np.maximum(lengths, 1)))
+    
+    def score_events(self, events):
+        """Fill in 'sentiment' for the events in a batch that carry 'text'"""
+        events = list(events)
+        with_text = [event for event in events if event.get('text')]
+        for event, score in zip(with_text, self.score(event['text'] for event in with_text).tolist()):
+            event['sentiment'] = score
+        return events
+
+def aggregate_sentiment(scores, keys):
+    """Mean sentiment and document count per key, e.g. per topic or per platform"""
+    distinct, codes = np.unique(np.asarray(keys), return_inverse=True)
+    sums = np.bincount(codes, weights=scores, minlength=len(distinct))
+    counts = np.bincount(codes, minlength=len(distinct))
+    return {
+        key: {'sentiment': total / count, 'count': int(count)}
+        for key, total, count in zip(distinct.tolist(), sums, counts)
+    }
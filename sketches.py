@@ -0,0 +1,151 @@
+from array import array
+import hashlib
+import heapq
+import math
+import numpy as np
+
+def _hash_pair(key):
+    """Two independent 64-bit hashes of a key, stable across processes"""
+    digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+class CountMinSketch:
+    """Approximate frequency table in fixed memory.
+
+    Estimates never undercount; with probability 1 - delta they overcount by
+    at most epsilon * (total count added).
+    """
+    
+    def __init__(self, epsilon=0.001, delta=0.01):
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be in (0, 1)")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        # One signed 64-bit counter array per hash row; array.array keeps the
+        # per-event scalar updates far cheaper than NumPy fancy indexing
+        self.rows = [array('q', bytes(8 * self.width)) for _ in range(self.depth)]
+        self.total = 0
+    
+    def _columns(self, key):
+        h1, h2 = _hash_pair(key)
+        # Kirsch-Mitzenmacher double hashing: row i uses h1 + i * h2
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+    
+    def add(self, key, count=1):
+        """Count a key and return its updated estimate"""
+        estimate = None
+        for row, column in zip(self.rows, self._columns(key)):
+            value = row[column] + count
+            row[column] = value
+            if estimate is None or value < estimate:
+                estimate = value
+        self.total += count
+        return estimate
+    
+    def estimate(self, key):
+        return min(row[column] for row, column in zip(self.rows, self._columns(key)))
+    
+    @property
+    def table(self):
+        """(depth, width) NumPy copy of the counters"""
+        return np.vstack([np.frombuffer(row, np.int64) for row in self.rows])
+    
+    def memory_bytes(self):
+        return sum(row.buffer_info()[1] * row.itemsize for row in self.rows)
+
+class SpaceSaving:
+    """Space-Saving top-k summary: tracks at most k keys with bounded overcount.
+
+    Each tracked key's count overestimates its true count by at most its
+    recorded error, and any key with true count above total / k is tracked.
+    """
+    
+    def __init__(self, k=64):
+        if k <= 0:
+            raise ValueError("k must be positive")
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        # Min-heap of (count, key) with lazy invalidation of stale entries
+        self._heap = []
+    
+    def __contains__(self, key):
+        return key in self.counts
+    
+    def __len__(self):
+        return len(self.counts)
+    
+    def _push(self, key):
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self._heap)
+    
+    def min_count(self):
+        """Smallest tracked count (0 while there is still a free slot)"""
+        if len(self.counts) < self.k:
+            return 0
+        while self._heap[0][0] != self.counts.get(self._heap[0][1]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0]
+    
+    def add(self, key, count=1):
+        """Count a key; return the key it displaced, if any"""
+        if key in self.counts:
+            self.counts[key] += count
+            self._push(key)
+            return None
+        evicted = None
+        floor = self.min_count()
+        if len(self.counts) >= self.k:
+            _, evicted = heapq.heappop(self._heap)
+            del self.counts[evicted]
+            del self.errors[evicted]
+        self.counts[key] = floor + count
+        self.errors[key] = floor
+        self._push(key)
+        return evicted
+    
+    def top(self, n=None):
+        """[(key, count, error)] for the n largest tracked keys"""
+        ranked = heapq.nlargest(n or self.k, self.counts.items(), key=lambda item: item[1])
+        return [(key, count, self.errors[key]) for key, count in ranked]
+
+class HeavyHitters:
+    """Count-Min Sketch plus Space-Saving top-k with sketch-gated admission.
+
+    The sketch estimates any key's frequency; a new key only displaces the
+    smallest Space-Saving entry once its sketch estimate reaches that entry's
+    count, so one-off keys cannot churn the top-k set.
+    """
+    
+    def __init__(self, k=64, epsilon=0.001, delta=0.01):
+        self.sketch = CountMinSketch(epsilon, delta)
+        self.summary = SpaceSaving(k)
+    
+    def __contains__(self, key):
+        return key in self.summary
+    
+    def add(self, key, count=1):
+        """Count a key.
+
+        Returns (tracked, evicted): whether the key is now in the top-k set and
+        which previously tracked key it displaced, if any.
+        """
+        estimate = self.sketch.add(key, count)
+        if key in self.summary or len(self.summary) < self.summary.k or estimate >= self.summary.min_count():
+            return True, self.summary.add(key, count)
+        return False, None
+    
+    def estimate(self, key):
+        estimate = self.sketch.estimate(key)
+        if key in self.summary:
+            estimate = min(estimate, self.summary.counts[key])
+        return estimate
+    
+    def top(self, n=None):
+        """[(key, estimate)] for the n heaviest keys, largest first"""
+        return [(key, min(count, self.sketch.estimate(key))) for key, count, _ in self.summary.top(n)]
+
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from types import MappingProxyType
+
+log = logging.getLogger(__name__)
+
+class Snapshot:
+    """One published, read-only result of a refresh.
+
+    Fields are whatever the build function returned, read as attributes
+    (snapshot.trends). The snapshot itself cannot be modified; the build
+    function is responsible for handing over values that nothing else
+    will mutate afterwards (copies, tuples, read-only arrays).
+    """
+    
+    __slots__ = ('version', 'created_at', 'build_seconds', '_fields')
+    
+    def __init__(self, version, created_at, fields, build_seconds=0.0):
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'created_at', created_at)
+        object.__setattr__(self, 'build_seconds', build_seconds)
+        object.__setattr__(self, '_fields', MappingProxyType(dict(fields)))
+    
+    def __getattr__(self, name):
+        try:
+            return self._fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("snapshots are read-only")
+    
+    def age(self, now=None):
+        return (time.time() if now is None else now) - self.created_at
+
+class SnapshotService:
+    """Process-wide snapshot of expensive shared state, refreshed by one background loop.
+
+    Every `interval` seconds the loop calls build() and publishes the result
+    as a new Snapshot with the next version number; readers just take a
+    reference to the current one, so the cost of a refresh is paid once
+    however many sessions are reading. Only one build runs at a time:
+    callers asking for a refresh while one is in flight wait for it and
+    share its result. If the current snapshot is older than
+    `max_staleness` (the loop is behind or its builds keep failing),
+    current() refreshes synchronously before answering. A failed build
+    keeps the previous snapshot; the error is logged and kept in
+    `last_error`, and the loop backs off (interval, doubling per further
+    consecutive failure, up to max_staleness) before trying again.
+
+    build() runs while holding `lock`; code that reads the resources it
+    mutates can take the lock to avoid seeing them mid-update.
+    """
+    
+    def __init__(self, build, interval=30.0, max_staleness=120.0):
+        if max_staleness < interval:
+            raise ValueError("max_staleness must be at least the refresh interval")
+        self.build = build
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.lock = threading.RLock()
+        self.builds = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self._snapshot = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Start the background refresh loop (publishing a first snapshot straight away)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='snapshot-refresh', daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
+    
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh(max_age=self.interval / 2)
+            except Exception:
+                # Readers keep the previous snapshot; back off rather than retry a failing build straight away
+                log.exception("snapshot refresh failed (%d in a row)", self.consecutive_failures)
+            if self.consecutive_failures:
+                wait = min(self.interval * 2 ** (self.consecutive_failures - 1), self.max_staleness)
+            else:
+                wait = max(self.interval - self._snapshot.age(), 0.0)
+            self._stop.wait(wait)
+    
+    def refresh(self, max_age=0.0):
+        """Build and publish a new snapshot unless the current one is younger than max_age; returns the current one"""
+        requested = time.time()
+        with self.lock:
+            snapshot = self._snapshot
+            # Someone else finished a build while we waited for the lock
+            if snapshot is not None and (snapshot.created_at >= requested or snapshot.age() < max_age):
+                return snapshot
+            started = time.perf_counter()
+            try:
+                fields = self.build()
+            except Exception as error:
+                self.failures += 1
+                self.consecutive_failures += 1
+                self.last_error = error
+                raise
+            version = snapshot.version + 1 if snapshot is not None else 1
+            self._snapshot = Snapshot(version, time.time(), fields, time.perf_counter() - started)
+            self.builds += 1
+            self.consecutive_failures = 0
+            self.last_error = None
+            return self._snapshot
+    
+    def current(self):
+        """Latest snapshot, refreshed first only if there is none yet or it is older than max_staleness"""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.age() > self.max_staleness:
+            try:
+                return self.refresh(max_age=self.max_staleness)
+            except Exception:
+                if self._snapshot is None:
+                    raise
+                return self._snapshot
+        return snapshot
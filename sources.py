@@ -0,0 +1,303 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+from aiohttp import web
+
+from backoff import retry_after_seconds
+from sentiment import NEGATIVE_WORDS, POSITIVE_WORDS
+
+def _timestamp(value):
+    """Local naive datetime from an ISO 8601 string or a Unix epoch (number or numeric string)"""
+    if value is None or value == '':
+        return datetime.now()
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            # fromisoformat() only reads a trailing Z from Python 3.11
+            parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+            return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo is not None else parsed
+    return datetime.fromtimestamp(value)
+
+class RateLimiter:
+    """Token bucket shared by every request to one source"""
+    
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    def pause(self, seconds):
+        """Hold off every caller, e.g. after the server answered 429"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class PlatformAdapter:
+    """How to query one platform and turn its payload into mention events.
+
+    Subclasses set the endpoint and limits and implement parse().
+    """
+    
+    platform = None
+    path = None
+    max_concurrency = 4
+    requests_per_second = 10.0
+    
+    def __init__(self, base_url, max_concurrency=None, requests_per_second=None):
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency or self.max_concurrency
+        self.requests_per_second = requests_per_second or self.requests_per_second
+    
+    def build_requests(self, topics):
+        """(url, params) pairs to fetch for one monitoring cycle"""
+        return [(f"{self.base_url}{self.path}", {'q': topic}) for topic in topics]
+    
+    def parse(self, payload, topic):
+        raise NotImplementedError
+    
+    def _event(self, topic, text, timestamp):
+        return {
+            'topic': topic,
+            'platform': self.platform,
+            'text': text,
+            'sentiment': 0.0,
+            'timestamp': _timestamp(timestamp)
+        }
+
+class TwitterAdapter(PlatformAdapter):
+    platform = 'Twitter'
+    path = '/twitter/search'
+    requests_per_second = 15.0
+    
+    def parse(self, payload, topic):
+        return [self._event(topic, post['text'], post.get('created_at')) for post in payload.get('data', [])]
+
+class RedditAdapter(PlatformAdapter):
+    platform = 'Reddit'
+    path = '/reddit/search'
+    requests_per_second = 1.0
+    
+    def parse(self, payload, topic):
+        children = payload.get('data', {}).get('children', [])
+        return [
+            self._event(topic, child['data']['title'], child['data'].get('created'))
+            for child in children
+        ]
+
+class NewsAdapter(PlatformAdapter):
+    platform = 'News'
+    path = '/news/everything'
+    requests_per_second = 5.0
+    
+    def parse(self, payload, topic):
+        return [
+            self._event(topic, article['title'], article.get('publishedAt'))
+            for article in payload.get('articles', [])
+        ]
+
+class YouTubeAdapter(PlatformAdapter):
+    platform = 'YouTube'
+    path = '/youtube/search'
+    requests_per_second = 5.0
+    
+    def parse(self, payload, topic):
+        return [
+            self._event(topic, item['snippet']['title'], item['snippet'].get('publishedAt'))
+            for item in payload.get('items', [])
+        ]
+
+class TikTokAdapter(PlatformAdapter):
+    platform = 'TikTok'
+    path = '/tiktok/search'
+    requests_per_second = 5.0
+    
+    def parse(self, payload, topic):
+        return [
+            self._event(topic, video['desc'], video.get('create_time'))
+            for video in payload.get('videos', [])
+        ]
+
+ADAPTERS = {
+    adapter.platform: adapter
+    for adapter in (TwitterAdapter, RedditAdapter, NewsAdapter, YouTubeAdapter, TikTokAdapter)
+}
+
+class SourceFetcher:
+    """Fetches every platform concurrently over one pooled HTTP session.
+
+    Each adapter gets its own semaphore and token bucket, so a slow or
+    throttled platform only delays itself. Parsed events flow through a
+    bounded queue: when the consumer falls behind, fetch workers wait
+    instead of buffering without limit.
+    """
+    
+    def __init__(self, adapters, queue_size=1000, pool_size=32, timeout=10, max_retries=3):
+        self.adapters = list(adapters)
+        self.queue_size = queue_size
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.stats = {
+            adapter.platform: {'requests': 0, 'retries': 0, 'errors': 0, 'events': 0, 'seconds': 0.0}
+            for adapter in self.adapters
+        }
+    
+    async def _fetch(self, session, adapter, limiter, url, params):
+        stats = self.stats[adapter.platform]
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            started = time.perf_counter()
+            try:
+                async with session.get(url, params=params) as response:
+                    stats['requests'] += 1
+                    if response.status in (429, 503):
+                        # Throttled: back off the whole source, not just this request
+                        retry_after = retry_after_seconds(response.headers.get('Retry-After'), 2 ** attempt)
+                        limiter.pause(retry_after)
+                        stats['retries'] += 1
+                        continue
+                    response.raise_for_status()
+                    return await response.json()
+            except ValueError:
+                break  # a body that is not valid JSON will not parse on a retry either
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                # Bad request, auth, not found or not JSON at all: retrying will not help
+                if isinstance(error, aiohttp.ClientResponseError) and error.status < 500:
+                    break
+                stats['retries'] += 1
+                await asyncio.sleep(2 ** attempt * 0.1)
+            finally:
+                stats['seconds'] += time.perf_counter() - started
+        stats['errors'] += 1
+        return None
+    
+    async def _run_source(self, session, adapter, topics, queue):
+        limiter = RateLimiter(adapter.requests_per_second)
+        semaphore = asyncio.Semaphore(adapter.max_concurrency)
+        
+        async def fetch_one(url, params):
+            async with semaphore:
+                payload = await self._fetch(session, adapter, limiter, url, params)
+            if payload is None:
+                return
+            try:
+                events = adapter.parse(payload, params['q'])
+            except (KeyError, TypeError, ValueError, AttributeError):
+                # A malformed response costs only its own events, not the other requests and platforms
+                self.stats[adapter.platform]['errors'] += 1
+                return
+            self.stats[adapter.platform]['events'] += len(events)
+            for event in events:
+                await queue.put(event)
+        
+        await asyncio.gather(*(fetch_one(url, params) for url, params in adapter.build_requests(topics)))
+    
+    async def stream(self, topics):
+        """Yield mention events from every platform as they are fetched"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        connector = aiohttp.TCPConnector(limit=self.pool_size)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            workers = [
+                asyncio.create_task(self._run_source(session, adapter, topics, queue))
+                for adapter in self.adapters
+            ]
+            done = asyncio.gather(*workers)
+            try:
+                while not (done.done() and queue.empty()):
+                    getter = asyncio.ensure_future(queue.get())
+                    await asyncio.wait([getter, done], return_when=asyncio.FIRST_COMPLETED)
+                    if getter.done():
+                        yield getter.result()
+                    else:
+                        getter.cancel()
+                await done
+            finally:
+                for worker in workers:
+                    worker.cancel()
+
+def default_fetcher(base_url, platforms=None, **kwargs):
+    """SourceFetcher with the built-in adapter for each named platform"""
+    platforms = platforms or list(ADAPTERS)
+    return SourceFetcher([ADAPTERS[name](base_url) for name in platforms], **kwargs)
+
+class StubPlatformServer:
+    """Local HTTP server imitating every platform's search endpoint.
+
+    Per-platform latency and a throttle rate (share of requests answered with
+    429) make it possible to exercise the fetcher offline:
+
+        async with StubPlatformServer(latency={'Reddit': 0.5}) as server:
+            fetcher = default_fetcher(server.url)
+    """
+    
+    def __init__(self, latency=None, throttle=None, posts_per_request=20, port=0):
+        self.latency = latency or {}
+        self.throttle = throttle or {}
+        self.posts_per_request = posts_per_request
+        self.port = port
+        self.requests = {name: 0 for name in ADAPTERS}
+        self._words = list(POSITIVE_WORDS) + list(NEGATIVE_WORDS)
+        self._runner = None
+    
+    def _payload(self, platform, topic):
+        now = datetime.now(timezone.utc)
+        posts = [
+            (f"{topic} looks {random.choice(self._words)} #{i}", now - timedelta(minutes=random.randint(0, 600)))
+            for i in range(self.posts_per_request)
+        ]
+        # Timestamps in each API's own format: ISO 8601 strings, or Unix epochs for Reddit and TikTok
+        if platform == 'Twitter':
+            return {'data': [{'text': text, 'created_at': ts.isoformat().replace('+00:00', 'Z')} for text, ts in posts]}
+        if platform == 'Reddit':
+            return {'data': {'children': [{'data': {'title': text, 'created': ts.timestamp()}} for text, ts in posts]}}
+        if platform == 'News':
+            return {'articles': [{'title': text, 'publishedAt': ts.isoformat()} for text, ts in posts]}
+        if platform == 'YouTube':
+            return {'items': [{'snippet': {'title': text, 'publishedAt': ts.isoformat()}} for text, ts in posts]}
+        return {'videos': [{'desc': text, 'create_time': int(ts.timestamp())} for text, ts in posts]}
+    
+    def _handler(self, platform):
+        async def handle(request):
+            self.requests[platform] += 1
+            await asyncio.sleep(self.latency.get(platform, 0))
+            if random.random() < self.throttle.get(platform, 0):
+                return web.Response(status=429, headers={'Retry-After': '0.05'})
+            return web.json_response(self._payload(platform, request.query.get('q', '')))
+        return handle
+    
+    async def __aenter__(self):
+        app = web.Application()
+        for name, adapter in ADAPTERS.items():
+            app.router.add_get(adapter.path, self._handler(name))
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+    
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
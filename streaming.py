@@ -0,0 +1,80 @@
+import asyncio
+
+class RingBuffer:
+    """Fixed-capacity event buffer that overwrites the oldest entry when full"""
+    
+    def __init__(self, capacity=10000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._next_seq = 0  # sequence number the next appended item will get
+    
+    def __len__(self):
+        return min(self._next_seq, self.capacity)
+    
+    @property
+    def head(self):
+        """Sequence number one past the newest item"""
+        return self._next_seq
+    
+    @property
+    def tail(self):
+        """Sequence number of the oldest item still held"""
+        return max(0, self._next_seq - self.capacity)
+    
+    def append(self, item):
+        """Store an item and return the one it displaced (or None)"""
+        index = self._next_seq % self.capacity
+        evicted = self._slots[index] if self._next_seq >= self.capacity else None
+        self._slots[index] = item
+        self._next_seq += 1
+        return evicted
+    
+    def read(self, cursor, limit=None):
+        """Return (items, next_cursor, dropped) for everything after cursor.
+
+        A cursor that fell behind the tail is fast-forwarded; the number of
+        overwritten items it missed is reported as dropped.
+        """
+        dropped = max(0, self.tail - cursor)
+        start = max(cursor, self.tail)
+        stop = self._next_seq if limit is None else min(self._next_seq, start + limit)
+        items = [self._slots[seq % self.capacity] for seq in range(start, stop)]
+        return items, stop, dropped
+    
+    def __iter__(self):
+        items, _, _ = self.read(self.tail)
+        return iter(items)
+
+class Subscription:
+    """Cursor over a RingBuffer used by one downstream consumer"""
+    
+    def __init__(self, buffer, from_start=False):
+        self.buffer = buffer
+        self.cursor = buffer.tail if from_start else buffer.head
+        self.dropped = 0
+    
+    def poll(self, limit=None):
+        """Return events that arrived since the last poll"""
+        items, self.cursor, dropped = self.buffer.read(self.cursor, limit)
+        self.dropped += dropped
+        return items
+    
+    def __iter__(self):
+        """Drain currently buffered events without blocking"""
+        while True:
+            items = self.poll(limit=256)
+            if not items:
+                return
+            yield from items
+    
+    async def __aiter__(self, poll_interval=0.05):
+        """Yield events as they arrive, sleeping while caught up"""
+        while True:
+            items = self.poll(limit=256)
+            if not items:
+                await asyncio.sleep(poll_interval)
+                continue
+            for item in items:
+                yield item
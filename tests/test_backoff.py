@@ -0,0 +1,16 @@
+import time
+from email.utils import formatdate
+
+from backoff import retry_after_seconds
+
+def test_retry_after_seconds():
+    assert retry_after_seconds('3', 1) == 3.0
+    assert retry_after_seconds('0.05', 1) == 0.05
+
+def test_retry_after_http_date():
+    assert 5 < retry_after_seconds(formatdate(time.time() + 10, usegmt=True), 1) <= 10
+    assert retry_after_seconds('Wed, 21 Oct 2015 07:28:00 GMT', 1) == 0.0
+
+def test_retry_after_falls_back_when_unreadable():
+    for value in (None, '', 'soon', 'nan'):
+        assert retry_after_seconds(value, 4) == 4
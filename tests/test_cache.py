@@ -0,0 +1,13 @@
+import threading
+
+from cache import PackageCache
+from records import TOPICS, ContentPackage
+
+def test_failed_disk_write_is_counted_not_raised(tmp_path):
+    cache = PackageCache(path=str(tmp_path))
+    # A lock does not pickle, so the disk write fails
+    package = ContentPackage('Cache failure', TOPICS.intern('Cache failure'), formats={'tweet': threading.Lock()})
+    assert cache.put('ab' * 16, package) is package
+    assert cache.stats()['write_errors'] == 1
+    assert not [path for path in tmp_path.rglob('*') if path.is_file()]
+    assert cache.get('ab' * 16) is package
@@ -0,0 +1,37 @@
+from cache import PackageCache
+from engagement import EngagementModel
+from generation import ContentGenerator
+
+OPPORTUNITIES = [{'title': f"Explain topic {i}", 'trend': f"Topic {i}", 'brief': '', 'audience': 'developers',
+                  'recommended_formats': ['thread']} for i in range(12)]
+
+def test_create_content_packages_predicts_every_package():
+    model = EngagementModel().simulate_training(2_000, seed=1)
+    generator = ContentGenerator(engagement=model)
+    results = list(generator.create_content_packages(OPPORTUNITIES, ['tweet', 'linkedin'], max_workers=4))
+    assert sorted(opportunity['title'] for opportunity, _ in results) == sorted(o['title'] for o in OPPORTUNITIES)
+    for opportunity, package in results:
+        assert package.pending() == ['hashtags', 'timing']
+        assert package.performance_predictions == model.predict_one(opportunity)
+        assert list(package.formats) == ['tweet', 'linkedin']
+
+def test_create_content_package_stays_lazy():
+    generator = ContentGenerator(engagement=EngagementModel().simulate_training(2_000, seed=1))
+    package = generator.create_content_package(OPPORTUNITIES[0], ['tweet', 'linkedin'])
+    assert 'performance_predictions' in package.pending()
+    assert 'formats.tweet' in package.pending()
+    package.formats['tweet']
+    assert 'formats.tweet' not in package.pending()
+    assert 'formats.linkedin' in package.pending()
+
+def test_filled_formats_complete_the_cached_package(tmp_path):
+    generator = ContentGenerator(cache=PackageCache(path=str(tmp_path)))
+    package = generator.create_content_package(OPPORTUNITIES[0], ['tweet', 'linkedin'])
+    for section in ('hashtags', 'timing', 'performance_predictions'):
+        getattr(package, section)
+    assert generator.fill_format(package, 'tweet', "First\n\nSecond\n") == ['First', 'Second']
+    assert package.pending() == ['formats.linkedin']
+    assert not list(tmp_path.rglob('*.pkl'))
+    generator.fill_format(package, 'linkedin', " Post ")
+    assert package.pending() == []
+    assert len(list(tmp_path.rglob('*.pkl'))) == 1
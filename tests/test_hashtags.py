@@ -0,0 +1,18 @@
+from hashtags import HashtagIndex
+from records import TOPICS
+
+def test_spellings_are_dropped_with_their_last_topic():
+    index = HashtagIndex(half_life=60)
+    index.add('Spelling A', "post #Shared #OnlyA", 0)
+    index.add('Spelling B', "post #shared", 0)
+    index.forget('Spelling A')
+    assert index._spelling == {'#shared': '#Shared'}
+    assert index.top(TOPICS.ids['Spelling B']) == ['#Shared']
+
+def test_spellings_are_dropped_with_pruned_weights():
+    index = HashtagIndex(half_life=60)
+    index.add('Spelling C', "post #Stale", 0)
+    # Far enough ahead to rescale; #Stale has decayed below min_weight
+    index.add('Spelling C', "post #Fresh", 60 * 80)
+    assert index._spelling == {'#fresh': '#Fresh'}
+    assert index.top(TOPICS.ids['Spelling C']) == ['#Fresh']
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+
+from llm import LLMBackend, LLMClient, LLMError, StubModelServer
+
+class _FixedServer:
+    """Answers /v1/batch with a fixed JSON body and /v1/stream with a fixed status and text"""
+    
+    def __init__(self, body=None, stream_status=200, stream_text=''):
+        self.body = body
+        self.stream_status = stream_status
+        self.stream_text = stream_text
+        self.requests = 0
+        self._runner = None
+    
+    async def _batch(self, request):
+        self.requests += 1
+        await request.json()
+        return web.json_response(self.body)
+    
+    async def _stream(self, request):
+        self.requests += 1
+        await request.json()
+        return web.Response(status=self.stream_status, text=self.stream_text)
+    
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post('/v1/batch', self._batch)
+        app.router.add_post('/v1/stream', self._stream)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self._runner.cleanup()
+
+def _complete_all(body, prompts):
+    async def run():
+        async with _FixedServer(body) as server:
+            async with LLMClient(server.url, max_batch_size=len(prompts)) as client:
+                tasks = [client.complete(prompt) for prompt in prompts]
+                return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=5)
+    return asyncio.run(run())
+
+def test_batch_completes_every_prompt():
+    async def run():
+        async with StubModelServer(latency=0.01) as server:
+            async with LLMClient(server.url) as client:
+                return await asyncio.gather(*(client.complete(f"Write about topic {i}") for i in range(20)))
+    texts = asyncio.run(run())
+    assert len(texts) == 20 and all(texts)
+
+def test_short_batch_fails_the_missing_prompts():
+    results = _complete_all({'completions': ['only one']}, ['first', 'second', 'third'])
+    assert results[0] == 'only one'
+    assert all(isinstance(result, LLMError) for result in results[1:])
+
+def test_malformed_batch_fails_every_prompt():
+    results = _complete_all({'text': 'no completions key'}, ['first', 'second'])
+    assert all(isinstance(result, LLMError) for result in results)
+
+def test_failed_batch_raises_to_the_caller():
+    async def run():
+        async with LLMClient('http://127.0.0.1:9', max_retries=1, backoff=0.001) as client:
+            await asyncio.wait_for(client.complete('unreachable'), timeout=5)
+    with pytest.raises(LLMError):
+        asyncio.run(run())
+
+
+def test_stream_fails_fast_on_client_errors():
+    async def run():
+        async with _FixedServer(stream_status=400, stream_text='bad prompt') as server:
+            async with LLMClient(server.url, backoff=0.001) as client:
+                with pytest.raises(LLMError, match='400'):
+                    async for _ in client.stream('Write a tweet'):
+                        pass
+                return server.requests, client.stats['retries']
+    assert asyncio.run(run()) == (1, 0)
+
+def test_stream_retries_server_errors():
+    async def run():
+        async with _FixedServer(stream_status=500) as server:
+            async with LLMClient(server.url, max_retries=2, backoff=0.001) as client:
+                with pytest.raises(LLMError):
+                    async for _ in client.stream('Write a tweet'):
+                        pass
+                return server.requests, client.stats['retries']
+    assert asyncio.run(run()) == (3, 2)
+
+def test_backend_stream_raises_any_client_error():
+    async def start():
+        server = _FixedServer(stream_text='not json\n')
+        return await server.__aenter__()
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    backend = LLMBackend(server.url)
+    try:
+        with pytest.raises(ValueError):
+            list(backend.stream('Write a tweet'))
+    finally:
+        backend.close()
+        asyncio.run_coroutine_threadsafe(server.__aexit__(None, None, None), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+def test_http_date_retry_after_is_retried():
+    async def run():
+        server = StubModelServer(latency=0.01, throttle=0.5, retry_after='Wed, 21 Oct 2015 07:28:00 GMT')
+        async with server:
+            async with LLMClient(server.url, max_retries=8, backoff=0.001) as client:
+                texts = await asyncio.gather(*(client.complete(f"Write about topic {i}") for i in range(8)))
+                streamed = [token async for token in client.stream('Write a tweet')]
+                return texts, streamed, client.stats
+    texts, streamed, stats = asyncio.run(run())
+    assert all(texts) and streamed
+    assert stats['errors'] == 0
@@ -0,0 +1,16 @@
+import random
+from datetime import datetime
+
+from monitoring import MediaMonitor
+
+def test_approximate_mode_only_indexes_tracked_topics():
+    monitor = MediaMonitor(counting='approximate', top_k=16, dedup=False)
+    rng = random.Random(1)
+    now = datetime.now()
+    for i in range(5_000):
+        # A few heavy topics and a long tail of one-off ones
+        topic = f"topic {rng.randrange(8)}" if rng.random() < 0.6 else f"rare {i}"
+        monitor.ingest({'topic': topic, 'platform': 'Twitter', 'text': f"{topic} #tag{i % 20}", 'sentiment': 0.1,
+                        'timestamp': now})
+    assert len(monitor.hashtags) <= 16
+    assert len(monitor._slot_ids) <= 16
@@ -0,0 +1,21 @@
+from cache import PackageCache
+from discovery import ContentDiscoverer
+from generation import ContentGenerator
+from monitoring import MediaMonitor
+from pipeline import SnapshotStages
+from search import OpportunityIndex
+
+def test_snapshot_stages_collect_a_fresh_run_each_time():
+    monitor = MediaMonitor()
+    monitor.get_current_trends()
+    stages = SnapshotStages(monitor, ContentDiscoverer(), OpportunityIndex(), ContentGenerator(cache=PackageCache()),
+                            400, 3, ['tweet'], chunks=2)
+    first = [opportunity.title for opportunity, _ in stages.pipeline().run()]
+    runs = [(stages.trends, stages.latest, stages.covered)]
+    second = [opportunity.title for opportunity, _ in stages.pipeline().run()]
+    assert first and second
+    assert len(stages.trends) == 2 and not stages.trends[-1]['volume'].flags.writeable
+    assert set(second) == set(stages.latest) == set(stages.covered)
+    # The first run's results are left as they were
+    assert runs[0][0] is not stages.trends and len(runs[0][0]) == 2
+    assert set(runs[0][1]) == set(first)
@@ -0,0 +1,90 @@
+import pickle
+import sys
+import threading
+import time
+
+from records import TOPICS, ContentPackage, Deferred, LazyFormats, TopicRegistry
+
+def test_intern_is_stable():
+    registry = TopicRegistry()
+    first = registry.intern('Quantum Computing')
+    assert registry.intern('Quantum Computing') == first
+    assert registry.name(first) == 'Quantum Computing'
+    assert registry.lower(first) == 'quantum computing'
+    assert registry.hashtag(first) == '#QuantumComputing'
+    assert registry.slug(first) == 'quantum-computing'
+
+def test_concurrent_intern_gives_one_id_per_name():
+    registry = TopicRegistry()
+    names = [f"Topic {i}" for i in range(2_000)]
+    start = threading.Barrier(8)
+    seen = []
+    
+    def intern_all(offset):
+        start.wait()
+        # Every thread walks the same names from a different starting point
+        ids = {}
+        for i in range(len(names)):
+            name = names[(i + offset) % len(names)]
+            ids[name] = registry.intern(name)
+        seen.append(ids)
+    
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=intern_all, args=(i * 250,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    
+    assert len(registry) == len(names)
+    assert sorted(registry.names) == sorted(names)
+    for ids in seen:
+        assert ids == registry.ids
+    for name, topic_id in registry.ids.items():
+        assert registry.name(topic_id) == name
+        assert registry.lower(topic_id) == name.lower()
+        assert registry.slug(topic_id) == name.lower().replace(' ', '-')
+
+def test_deferred_sections_build_once_across_threads():
+    calls = []
+    
+    def slow(name):
+        def build():
+            calls.append(name)
+            time.sleep(0.01)
+            return name
+        return build
+    
+    package = ContentPackage('Explain Web3', TOPICS.intern('Web3'),
+                             formats=LazyFormats({'tweet': slow('tweet'), 'linkedin': slow('linkedin')}),
+                             hashtags=Deferred(slow('hashtags')), timing=Deferred(slow('timing')),
+                             performance_predictions=Deferred(slow('predictions')))
+    completed = []
+    package.when_complete(lambda: completed.append(True))
+    start = threading.Barrier(8)
+    
+    def read_all():
+        start.wait()
+        package.hashtags, package.timing, package.performance_predictions
+        package.formats['tweet'], package.formats['linkedin']
+    
+    threads = [threading.Thread(target=read_all) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(calls) == ['hashtags', 'linkedin', 'predictions', 'timing', 'tweet']
+    assert completed == [True]
+    assert package.pending() == []
+
+def test_package_pickles_without_its_lock():
+    package = ContentPackage('Explain Web3', TOPICS.intern('Web3'), formats={'tweet': ['hi']},
+                             hashtags=Deferred(lambda: ['#Web3']))
+    copy = pickle.loads(pickle.dumps(package))
+    assert copy.hashtags == ['#Web3']
+    copy.hashtags = Deferred(lambda: ['#Crypto'])
+    assert copy.hashtags == ['#Crypto']
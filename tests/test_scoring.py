@@ -0,0 +1,60 @@
+import numpy as np
+
+from discovery import ContentDiscoverer, trend_snapshot
+from trendstore import TrendStore
+
+def _store(topics):
+    rng = np.random.default_rng(3)
+    store = TrendStore(['Twitter', 'Reddit', 'News'])
+    n = len(topics)
+    store.load(
+        topic_id=store.intern_topics(topics),
+        volume=rng.integers(10, 10_000, n),
+        growth=rng.normal(20, 40, n),
+        velocity=rng.lognormal(0, 1, n),
+        sentiment=rng.uniform(-1, 1, n),
+        emerging=np.zeros(n, bool)
+    )
+    return store
+
+TOPICS = ['AI Agents', 'Quantum Computing', 'Space Exploration', 'Electric Vehicles', 'Climate Tech']
+
+def test_top_returns_best_first():
+    scorer = ContentDiscoverer().scorer
+    rows, pairs, scores, metrics = scorer.top(_store(TOPICS), 3)
+    assert len(rows) == len(pairs) == len(scores) == len(metrics) == 3
+    assert np.all(np.diff(scores) <= 0)
+    assert len(set(rows.tolist())) == 3
+
+def test_top_with_nothing_allowed_is_empty():
+    scorer = ContentDiscoverer().scorer
+    rows, pairs, scores, metrics = scorer.top(_store(TOPICS), 10, trend_mask=np.zeros(len(TOPICS), bool))
+    assert len(rows) == len(pairs) == len(scores) == len(metrics) == 0
+
+def test_top_never_returns_masked_candidates():
+    scorer = ContentDiscoverer().scorer
+    mask = np.zeros(len(TOPICS), bool)
+    mask[[1, 3]] = True
+    for one_per_trend in (True, False):
+        rows, _, scores, _ = scorer.top(_store(TOPICS), 10, one_per_trend, trend_mask=mask)
+        assert set(rows.tolist()) <= {1, 3}
+        assert np.isfinite(scores).all()
+    rows, _, _, _ = scorer.top(_store(TOPICS), 10, trend_mask=mask)
+    assert sorted(rows.tolist()) == [1, 3]
+
+def test_top_with_zero_limit_is_empty():
+    scorer = ContentDiscoverer().scorer
+    assert len(scorer.top(_store(TOPICS), 0)[0]) == 0
+    assert len(scorer.top(_store(TOPICS), -1, one_per_trend=False)[0]) == 0
+
+def test_analyze_brand_without_matching_topics():
+    discoverer = ContentDiscoverer()
+    snapshot = trend_snapshot(_store(TOPICS))
+    assert discoverer.analyze_brand(snapshot, {'name': 'Ledger', 'topics': ['blockchain']}, limit=10) == []
+    assert discoverer.analyze_trends(_store(TOPICS), limit=0) == []
+
+def test_store_top_is_empty_for_k_zero():
+    store = _store(TOPICS)
+    assert len(store.top(0)) == 0
+    assert len(store.top(-1)) == 0
+    assert store.top(2).tolist() == np.argsort(store['volume'])[::-1][:2].tolist()
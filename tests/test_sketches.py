@@ -0,0 +1,51 @@
+from collections import Counter
+
+import numpy as np
+
+from sketches import CountMinSketch, HeavyHitters, SpaceSaving
+
+def _stream(n=50_000, distinct=5_000, seed=11):
+    """Zipf-like stream of string keys: a few heavy ones and a long tail"""
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.3, n), distinct)
+    return [f"topic {rank}" for rank in ranks.tolist()]
+
+def test_count_min_error_bound():
+    stream = _stream()
+    truth = Counter(stream)
+    sketch = CountMinSketch(epsilon=0.001, delta=0.01)
+    for key in stream:
+        sketch.add(key)
+    bound = sketch.epsilon * sketch.total
+    errors = np.array([sketch.estimate(key) - count for key, count in truth.items()])
+    assert (errors >= 0).all()
+    # Each estimate is within the bound with probability 1 - delta
+    assert (errors > bound).mean() <= sketch.delta
+    assert sketch.estimate('never seen') <= bound
+
+def test_space_saving_error_bound():
+    stream = _stream()
+    truth = Counter(stream)
+    summary = SpaceSaving(k=100)
+    for key in stream:
+        summary.add(key)
+    assert len(summary) == 100
+    for key, count, error in summary.top():
+        assert count - error <= truth[key] <= count
+        assert error <= len(stream) / summary.k
+    # Every key above total / k is guaranteed a slot
+    for key, count in truth.items():
+        if count > len(stream) / summary.k:
+            assert key in summary
+
+def test_heavy_hitters_bounds_and_recall():
+    stream = _stream()
+    truth = Counter(stream)
+    hitters = HeavyHitters(k=100, epsilon=0.001, delta=0.01)
+    for key in stream:
+        hitters.add(key)
+    bound = hitters.sketch.epsilon * len(stream)
+    for key, estimate in hitters.top():
+        assert truth[key] <= estimate <= truth[key] + bound
+    expected = {key for key, _ in truth.most_common(10)}
+    assert expected <= {key for key, _ in hitters.top(10)}
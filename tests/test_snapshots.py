@@ -0,0 +1,33 @@
+import time
+
+import pytest
+
+from snapshots import SnapshotService
+
+def test_snapshots_are_read_only_and_versioned():
+    service = SnapshotService(lambda: {'value': 1}, interval=10, max_staleness=20)
+    first = service.refresh()
+    second = service.refresh()
+    assert (first.version, second.version) == (1, 2)
+    assert second.value == 1
+    with pytest.raises(AttributeError):
+        second.value = 2
+
+def test_failing_builds_back_off():
+    attempts = []
+    
+    def build():
+        attempts.append(time.perf_counter())
+        if len(attempts) > 1:
+            raise RuntimeError("source down")
+        return {'value': len(attempts)}
+    
+    service = SnapshotService(build, interval=0.05, max_staleness=0.2)
+    service.start()
+    time.sleep(0.5)
+    service.stop()
+    # First build at 0, then failures at ~0.05, 0.1, 0.2, 0.4 s
+    assert 3 <= len(attempts) <= 7
+    assert service.current().value == 1
+    assert isinstance(service.last_error, RuntimeError)
+    assert service.consecutive_failures == len(attempts) - 1
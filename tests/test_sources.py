@@ -0,0 +1,60 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+from sources import ADAPTERS, NewsAdapter, StubPlatformServer, TwitterAdapter, _timestamp, default_fetcher
+
+def test_timestamps_from_iso_strings_and_epochs():
+    expected = datetime.fromtimestamp(1_700_000_000)
+    assert _timestamp(1_700_000_000) == expected
+    assert _timestamp(1_700_000_000.0) == expected
+    assert _timestamp('1700000000') == expected
+    assert _timestamp('2023-11-14T22:13:20Z') == expected
+    assert _timestamp('2023-11-14T22:13:20+00:00') == expected
+    assert _timestamp('2023-11-14T10:00:00') == datetime(2023, 11, 14, 10)
+
+def test_fetcher_reads_every_platform():
+    async def run():
+        async with StubPlatformServer(posts_per_request=5) as server:
+            fetcher = default_fetcher(server.url)
+            return [event async for event in fetcher.stream(['AI Agents', 'Web3'])], fetcher.stats
+    events, stats = asyncio.run(run())
+    assert len(events) == len(ADAPTERS) * 2 * 5
+    assert all(stats[platform]['errors'] == 0 for platform in ADAPTERS)
+    now = datetime.now()
+    assert all(now - timedelta(hours=11) < event['timestamp'] <= now for event in events)
+
+def test_bad_responses_only_cost_their_own_request():
+    now = datetime.now().isoformat()
+    
+    async def news(request):
+        request_counts[request.query['q']] += 1
+        if request.query['q'] == 'missing':
+            return web.Response(status=404)
+        published = 'not a date' if request.query['q'] == 'broken' else now
+        return web.json_response({'articles': [{'title': 'Headline', 'publishedAt': published}] * 3})
+    
+    async def twitter(request):
+        return web.json_response({'data': [{'text': 'Post', 'created_at': now}] * 3})
+    
+    async def run():
+        app = web.Application()
+        app.router.add_get(NewsAdapter.path, news)
+        app.router.add_get(TwitterAdapter.path, twitter)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', 0).start()
+        try:
+            fetcher = default_fetcher(f"http://127.0.0.1:{runner.addresses[0][1]}", ['News', 'Twitter'])
+            return [event async for event in fetcher.stream(['ok', 'broken', 'missing'])], fetcher.stats
+        finally:
+            await runner.cleanup()
+    
+    request_counts = Counter()
+    events, stats = asyncio.run(run())
+    assert Counter(event['platform'] for event in events) == {'News': 3, 'Twitter': 9}
+    assert stats['News']['errors'] == 2
+    assert stats['News']['retries'] == 0
+    assert request_counts['missing'] == 1
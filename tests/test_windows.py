@@ -0,0 +1,28 @@
+import numpy as np
+
+from windows import SlidingWindowAggregator
+
+NOW = 1_700_000_000
+HOUR = 3600
+
+def test_growth_against_previous_day():
+    windows = SlidingWindowAggregator()
+    windows.add(0, NOW - 30 * HOUR, count=50)
+    windows.add(0, NOW, count=75)
+    windows.add(1, NOW - 30 * HOUR, count=40)
+    windows.add(1, NOW, count=10)
+    assert np.allclose(windows.growth([0, 1]), [50.0, -75.0])
+
+def test_growth_without_prior_data_is_zero():
+    windows = SlidingWindowAggregator()
+    windows.add(0, NOW, count=200)
+    windows.add(1, NOW - 30 * HOUR, count=10)
+    windows.add(1, NOW, count=20)
+    growth = windows.growth()
+    assert growth[0] == 0.0
+    assert growth[1] == 100.0
+    assert np.isfinite(growth).all()
+    assert windows.growth([0]).tolist() == [0.0]
+
+def test_growth_of_an_empty_window():
+    assert SlidingWindowAggregator(capacity=4).growth().tolist() == [0.0] * 4
@@ -0,0 +1,168 @@
+import time
+import numpy as np
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+PLATFORMS = ('Twitter', 'LinkedIn', 'Instagram', 'TikTok')
+
+# Served for platforms with no recorded outcomes yet
+DEFAULT_TIMING = {
+    'twitter': "9:30 AM - 11:30 AM EST, Wednesday",
+    'linkedin': "11:00 AM - 1:00 PM EST, Tuesday-Thursday",
+    'instagram': "2:00 PM - 4:00 PM EST, Weekdays",
+    'tiktok': "7:00 PM - 9:00 PM EST, Thursday-Friday"
+}
+
+def _clock(minutes):
+    hour, minute = divmod(int(minutes) % (24 * 60), 60)
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+class PostingTimeOptimizer:
+    """Best posting windows per platform and audience, learned from post outcomes.
+
+    Outcomes accumulate in a (platform, audience, week slot) histogram of
+    engagement sums and post counts; a slot is an hour of the week, or a
+    fraction of one with slots_per_hour > 1. On refresh, every slot's mean
+    engagement is shrunk toward the platform's rate for that slot (and
+    that toward the platform's overall mean) by `prior_posts` pseudo-posts,
+    so thin audiences borrow from the platform. Rates are then smoothed
+    with a circular Gaussian kernel (Sunday night runs into Monday) and the
+    best `window_hours` span is an argmax over rolling sums, for every
+    platform and audience in one pass. Formatted results are cached until
+    the next outcome is recorded, so lookups are dict reads.
+
+    Timestamps are POSIX seconds, bucketed in the local time given by
+    `utc_offset` hours.
+    """
+    
+    def __init__(self, platforms=PLATFORMS, slots_per_hour=1, window_hours=2, smoothing_hours=1.0, prior_posts=5,
+                 utc_offset=-5, tz_label='EST'):
+        self.platforms = list(platforms)
+        self.slots_per_hour = slots_per_hour
+        self.n_slots = 7 * 24 * slots_per_hour
+        self.window = max(1, int(round(window_hours * slots_per_hour)))
+        self.prior_posts = prior_posts
+        self.utc_offset = utc_offset
+        self.tz_label = tz_label
+        self.audiences = []
+        self._platform_ids = {name: i for i, name in enumerate(self.platforms)}
+        self._audience_ids = {}
+        self._engagement = np.zeros((len(self.platforms), 4, self.n_slots))
+        self._posts = np.zeros((len(self.platforms), 4, self.n_slots))
+        radius = max(1, int(np.ceil(3 * smoothing_hours * slots_per_hour)))
+        offsets = np.arange(-radius, radius + 1)
+        kernel = np.exp(-0.5 * (offsets / max(smoothing_hours * slots_per_hour, 1e-9)) ** 2)
+        self._kernel = list(zip(offsets.tolist(), (kernel / kernel.sum()).tolist()))
+        self.recorded = 0
+        self._windows = None  # audience index + 1 (0 = all audiences) -> per-platform results, until new data
+    
+    def _audience_id(self, audience):
+        audience_id = self._audience_ids.get(audience)
+        if audience_id is None:
+            audience_id = self._audience_ids[audience] = len(self.audiences)
+            self.audiences.append(audience)
+            if audience_id >= self._posts.shape[1]:
+                grow = np.zeros((len(self.platforms), self._posts.shape[1], self.n_slots))
+                self._engagement = np.concatenate([self._engagement, grow], axis=1)
+                self._posts = np.concatenate([self._posts, grow.copy()], axis=1)
+        return audience_id
+    
+    def slots(self, timestamps):
+        """Week slot (0 = Monday 00:00 local) of each POSIX timestamp"""
+        local = np.asarray(timestamps, float) + self.utc_offset * 3600
+        # 1970-01-01 was a Thursday, three days after a Monday
+        return ((local + 3 * 86400) // (3600 / self.slots_per_hour)).astype(np.int64) % self.n_slots
+    
+    def record(self, platform, audience, timestamp, engagement):
+        self.record_many([platform], [audience], [timestamp], [engagement])
+    
+    def record_many(self, platforms, audiences, timestamps, engagement):
+        """Add post outcomes; each argument is a sequence with one entry per post"""
+        platform_ids = np.array([self._platform_ids[name] for name in platforms], np.int64)
+        audience_ids = np.array([self._audience_id(audience) for audience in audiences], np.int64)
+        if not len(platform_ids):
+            return
+        shape = self._posts.shape
+        flat = (platform_ids * shape[1] + audience_ids) * shape[2] + self.slots(timestamps)
+        np.add.at(self._posts.reshape(-1), flat, 1)
+        np.add.at(self._engagement.reshape(-1), flat, np.asarray(engagement, float))
+        self.recorded += len(flat)
+        self._windows = None
+    
+    def scores(self):
+        """(platforms, 1 + audiences, slots) smoothed engagement rates; audience row 0 pools every audience"""
+        n = len(self.audiences)
+        posts, engagement = self._posts[:, :n], self._engagement[:, :n]
+        k = self.prior_posts
+        platform_posts, platform_engagement = posts.sum(axis=1), engagement.sum(axis=1)
+        overall = platform_engagement.sum(axis=1) / np.maximum(platform_posts.sum(axis=1), 1)
+        platform_rate = (platform_engagement + k * overall[:, None]) / (platform_posts + k)
+        audience_rate = (engagement + k * platform_rate[:, None, :]) / (posts + k)
+        rates = np.concatenate([platform_rate[:, None, :], audience_rate], axis=1)
+        smoothed = np.zeros_like(rates)
+        for offset, weight in self._kernel:
+            smoothed += weight * np.roll(rates, offset, axis=-1)
+        return smoothed
+    
+    def _refresh(self):
+        smoothed = self.scores()
+        totals = np.zeros_like(smoothed)
+        for offset in range(self.window):
+            totals += np.roll(smoothed, -offset, axis=-1)
+        best = totals.argmax(axis=-1)
+        lift = totals.max(axis=-1) / np.maximum(totals.mean(axis=-1), 1e-12)
+        has_data = self._posts.sum(axis=(1, 2)) > 0
+        minutes_per_slot = 60 // self.slots_per_hour
+        windows = []
+        for row in range(smoothed.shape[1]):
+            results = []
+            for p, platform in enumerate(self.platforms):
+                if not has_data[p]:
+                    results.append((platform, DEFAULT_TIMING.get(platform.lower()), None, None))
+                    continue
+                start = int(best[p, row])
+                day = WEEKDAYS[start // (24 * self.slots_per_hour)]
+                minutes = (start % (24 * self.slots_per_hour)) * minutes_per_slot
+                hours = f"{_clock(minutes)} - {_clock(minutes + self.window * minutes_per_slot)} {self.tz_label}"
+                results.append((platform, f"{hours}, {day}", day, float(lift[p, row])))
+            windows.append(results)
+        self._windows = windows
+    
+    def best_windows(self, audience=None):
+        """(platform, "9:00 AM - 11:00 AM EST, Wednesday", day, lift over the average window) per platform.
+
+        Unknown or missing audiences get the platform-wide window; platforms
+        without data get DEFAULT_TIMING with no day or lift.
+        """
+        if self._windows is None:
+            self._refresh()
+        return self._windows[self._audience_ids.get(audience, -1) + 1]
+    
+    def timing(self, audience=None):
+        """Package timing section: {platform key: recommended window}"""
+        return {platform.lower(): text for platform, text, _, _ in self.best_windows(audience)}
+    
+    def simulate_outcomes(self, count, weeks=8, seed=None):
+        """Record simulated post outcomes with platform-typical peaks, shifted per audience"""
+        rng = np.random.default_rng(seed)
+        # Peak (weekdays, local hour) per platform and how far each audience shifts it
+        peaks = {'Twitter': ([2], 10), 'LinkedIn': ([1, 2, 3], 12), 'Instagram': ([0, 1, 2, 3, 4], 15),
+                 'TikTok': ([3, 4], 20)}
+        shifts = {'students': 3, 'beginners': 2, 'general public': 1, 'developers': 1, 'business leaders': -2,
+                  'investors': -2, 'policy makers': -1, 'strategists': -1, 'industry professionals': 0}
+        audiences = list(shifts)
+        platforms = rng.choice([name for name in self.platforms if name in peaks], count)
+        audience = rng.choice(audiences, count)
+        now = time.time()
+        timestamps = now - rng.uniform(0, weeks * 7 * 86400, count)
+        local = timestamps + self.utc_offset * 3600
+        weekday = ((local // 86400 + 3) % 7).astype(int)
+        hour = (local % 86400) / 3600
+        engagement = np.empty(count)
+        for name, (days, peak) in peaks.items():
+            for audience_name, shift in shifts.items():
+                mask = (platforms == name) & (audience == audience_name)
+                distance = np.abs((hour[mask] - (peak + shift) + 12) % 24 - 12)
+                boost = np.isin(weekday[mask], days) * 1.0 + 0.5
+                engagement[mask] = 100 * boost * np.exp(-0.5 * (distance / 1.5) ** 2) + 10
+        engagement *= rng.lognormal(0, 0.4, count)
+        self.record_many(platforms.tolist(), audience.tolist(), timestamps, engagement)
\ No newline at end of file
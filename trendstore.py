@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+from records import TOPICS, Trend
+
+class TrendStore:
+    """Columnar trend table: one NumPy array per field, topics and platforms as integer IDs"""
+    
+    COLUMNS = {
+        'topic_id': np.int32,
+        'volume': np.int64,
+        'growth': np.float32,
+        'velocity': np.float32,
+        'sentiment': np.float32,
+        'platform_mask': np.uint32,
+        'emerging': np.bool_,
+        'timestamp': 'datetime64[s]'
+    }
+    
+    def __init__(self, platforms, capacity=64):
+        if len(platforms) > 32:
+            raise ValueError("platform_mask holds at most 32 platforms")
+        self.platforms = list(platforms)
+        self.platform_ids = {name: i for i, name in enumerate(self.platforms)}
+        self._columns = {name: np.zeros(capacity, dtype) for name, dtype in self.COLUMNS.items()}
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def __getitem__(self, column):
+        """Live view of one column (no copy)"""
+        return self._columns[column][:self._size]
+    
+    @property
+    def topics(self):
+        return TOPICS.names
+    
+    def intern_topic(self, topic):
+        # Topic IDs come from the shared registry, so trends, opportunities
+        # and packages built from this store all agree on them
+        return TOPICS.intern(topic)
+    
+    def intern_topics(self, topics):
+        return np.fromiter((self.intern_topic(t) for t in topics), dtype=np.int32)
+    
+    def platform_mask(self, platforms):
+        mask = 0
+        for name in platforms:
+            mask |= 1 << self.platform_ids[name]
+        return mask
+    
+    def platform_names(self, mask):
+        return [name for i, name in enumerate(self.platforms) if mask >> i & 1]
+    
+    def _reserve(self, size):
+        capacity = len(self._columns['topic_id'])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+    
+    def append(self, topic, volume, growth=0.0, sentiment=0.0, platforms=(), emerging=False, timestamp=None,
+               velocity=0.0):
+        """Add a single trend row and return its row index"""
+        self._reserve(self._size + 1)
+        row = self._size
+        columns = self._columns
+        columns['topic_id'][row] = self.intern_topic(topic)
+        columns['volume'][row] = volume
+        columns['growth'][row] = growth
+        columns['velocity'][row] = velocity
+        columns['sentiment'][row] = sentiment
+        columns['platform_mask'][row] = self.platform_mask(platforms)
+        columns['emerging'][row] = emerging
+        columns['timestamp'][row] = np.datetime64(timestamp, 's') if timestamp is not None else np.datetime64('now', 's')
+        self._size += 1
+        return row
+    
+    def load(self, **columns):
+        """Replace the table contents with whole columns at once.
+
+        Every array must have the same length; omitted columns are zeroed
+        (timestamp defaults to now).
+        """
+        sizes = {len(values) for values in columns.values()}
+        if len(sizes) != 1:
+            raise ValueError("columns must all have the same length")
+        unknown = set(columns) - set(self.COLUMNS)
+        if unknown:
+            raise KeyError(f"unknown columns: {sorted(unknown)}")
+        size = sizes.pop()
+        self._size = 0
+        self._reserve(size)
+        self._size = size
+        for name, column in self._columns.items():
+            if name in columns:
+                column[:size] = columns[name]
+            elif name == 'timestamp':
+                column[:size] = np.datetime64('now', 's')
+            else:
+                column[:size] = 0
+    
+    def clear(self):
+        self._size = 0
+    
+    def copy(self, writeable=True):
+        """Independent copy of the table; with writeable=False its columns are read-only, for sharing between threads"""
+        store = TrendStore(self.platforms, capacity=max(self._size, 1))
+        store.load(**{name: self[name] for name in self.COLUMNS})
+        if not writeable:
+            for column in store._columns.values():
+                column.setflags(write=False)
+        return store
+    
+    def top(self, k, by='volume'):
+        """Row indices of the k largest values of a column, largest first; k <= 0 gives none"""
+        values = self[by]
+        if k <= 0:
+            return np.zeros(0, np.intp)
+        if k >= len(values):
+            return np.argsort(values, kind='stable')[::-1]
+        candidates = np.argpartition(values, -k)[-k:]
+        return candidates[np.argsort(values[candidates])[::-1]]
+    
+    def overall_sentiment(self, weighted=True):
+        if not self._size:
+            return 0.0
+        weights = self['volume'] if weighted and self['volume'].any() else None
+        return float(np.average(self['sentiment'], weights=weights))
+    
+    def platform_volume(self):
+        """Total volume per platform, summed over every trend it appears in"""
+        bits = (self['platform_mask'][:, None] >> np.arange(len(self.platforms), dtype=np.uint32)) & 1
+        return pd.Series(bits.T @ self['volume'], index=self.platforms)
+    
+    def platform_labels(self, masks):
+        """Comma-joined platform names for each mask, formatted once per distinct mask"""
+        distinct, inverse = np.unique(masks, return_inverse=True)
+        labels = np.array([', '.join(self.platform_names(mask)) for mask in distinct], dtype=object)
+        return labels[inverse]
+    
+    def _rows(self, indices):
+        if indices is None:
+            return slice(0, self._size)
+        return np.asarray(indices, dtype=np.intp)
+    
+    def to_frame(self, indices=None):
+        """DataFrame view of the selected rows for display"""
+        rows = self._rows(indices)
+        topic_names = np.asarray(self.topics, dtype=object)
+        return pd.DataFrame({
+            'topic': topic_names[self['topic_id'][rows]],
+            'volume': self['volume'][rows],
+            'growth': self['growth'][rows],
+            'velocity': self['velocity'][rows],
+            'sentiment': self['sentiment'][rows],
+            'platforms': self.platform_labels(self['platform_mask'][rows]),
+            'emerging': self['emerging'][rows],
+            'timestamp': self['timestamp'][rows]
+        })
+    
+    def records(self, indices=None):
+        """Selected rows as Trend records for the discovery and generation stages"""
+        rows = self._rows(indices)
+        topic_ids = self['topic_id'][rows].tolist()
+        volumes = self['volume'][rows].tolist()
+        growth = self['growth'][rows].tolist()
+        velocity = self['velocity'][rows].tolist()
+        sentiment = self['sentiment'][rows].tolist()
+        masks = self['platform_mask'][rows].tolist()
+        emerging = self['emerging'][rows].tolist()
+        timestamps = self['timestamp'][rows].tolist()
+        return [
+            Trend(topic_ids[i], volumes[i], growth[i], velocity[i], sentiment[i], self.platform_names(masks[i]),
+                  emerging[i], timestamps[i])
+            for i in range(len(topic_ids))
+        ]
@@ -0,0 +1,132 @@
+import numpy as np
+
+MINUTES_PER_HOUR = 60
+HOURS_PER_DAY = 24
+
+class SlidingWindowAggregator:
+    """Per-topic mention counts in minute buckets, rolled into 1h and 24h windows.
+
+    Minute buckets feed a rolling last-hour total; hour buckets cover the last
+    48 hours so the current 24h total can be compared with the 24h before it.
+    Running totals are adjusted as buckets enter and leave a window, so an
+    event costs O(1) and the clock advances in O(topics) once per minute.
+    """
+    
+    def __init__(self, capacity=16):
+        self._minutes = np.zeros((capacity, MINUTES_PER_HOUR), np.int64)
+        self._hours = np.zeros((capacity, 2 * HOURS_PER_DAY), np.int64)
+        self.hour_total = np.zeros(capacity, np.int64)
+        self.day_total = np.zeros(capacity, np.int64)
+        self.prev_day_total = np.zeros(capacity, np.int64)
+        self._minute = None  # absolute minute index of the newest bucket
+    
+    def _grow(self, size):
+        capacity = max(size, 2 * len(self.hour_total))
+        extra = capacity - len(self.hour_total)
+        self._minutes = np.vstack([self._minutes, np.zeros((extra, MINUTES_PER_HOUR), np.int64)])
+        self._hours = np.vstack([self._hours, np.zeros((extra, 2 * HOURS_PER_DAY), np.int64)])
+        self.hour_total = np.concatenate([self.hour_total, np.zeros(extra, np.int64)])
+        self.day_total = np.concatenate([self.day_total, np.zeros(extra, np.int64)])
+        self.prev_day_total = np.concatenate([self.prev_day_total, np.zeros(extra, np.int64)])
+    
+    def advance(self, timestamp):
+        """Move the window forward to a POSIX timestamp, expiring old buckets"""
+        minute = int(timestamp // 60)
+        if self._minute is None:
+            self._minute = minute
+            return
+        if minute <= self._minute:
+            return
+        old_hour, new_hour = self._minute // MINUTES_PER_HOUR, minute // MINUTES_PER_HOUR
+        
+        if minute - self._minute >= MINUTES_PER_HOUR:
+            self._minutes[:] = 0
+            self.hour_total[:] = 0
+        else:
+            for step in range(self._minute + 1, minute + 1):
+                slot = step % MINUTES_PER_HOUR
+                self.hour_total -= self._minutes[:, slot]
+                self._minutes[:, slot] = 0
+        
+        if new_hour - old_hour >= 2 * HOURS_PER_DAY:
+            self._hours[:] = 0
+            self.day_total[:] = 0
+            self.prev_day_total[:] = 0
+        else:
+            span = 2 * HOURS_PER_DAY
+            for step in range(old_hour + 1, new_hour + 1):
+                # The bucket turning 24h old moves into the previous-day window,
+                # and the one turning 48h old (same slot as the new hour) leaves it
+                aged = self._hours[:, (step - HOURS_PER_DAY) % span]
+                self.day_total -= aged
+                self.prev_day_total += aged
+                self.prev_day_total -= self._hours[:, step % span]
+                self._hours[:, step % span] = 0
+        
+        self._minute = minute
+    
+    def add(self, topic_id, timestamp, count=1):
+        """Count mentions of a topic at a POSIX timestamp"""
+        if topic_id >= len(self.hour_total):
+            self._grow(topic_id + 1)
+        self.advance(timestamp)
+        minute = int(timestamp // 60)
+        minute_age = self._minute - minute
+        hour_age = self._minute // MINUTES_PER_HOUR - minute // MINUTES_PER_HOUR
+        
+        if minute_age < MINUTES_PER_HOUR:
+            self._minutes[topic_id, minute % MINUTES_PER_HOUR] += count
+            self.hour_total[topic_id] += count
+        if hour_age < HOURS_PER_DAY:
+            self._hours[topic_id, (minute // MINUTES_PER_HOUR) % (2 * HOURS_PER_DAY)] += count
+            self.day_total[topic_id] += count
+        elif hour_age < 2 * HOURS_PER_DAY:
+            self._hours[topic_id, (minute // MINUTES_PER_HOUR) % (2 * HOURS_PER_DAY)] += count
+            self.prev_day_total[topic_id] += count
+    
+    @property
+    def current_minute(self):
+        """Absolute minute index of the newest bucket (None before any event)"""
+        return self._minute
+    
+    def minute_counts(self, minute):
+        """Per-topic counts of one absolute minute still inside the hour window"""
+        if self._minute is None or not 0 <= self._minute - minute < MINUTES_PER_HOUR:
+            return np.zeros(len(self.hour_total), np.int64)
+        return self._minutes[:, minute % MINUTES_PER_HOUR]
+    
+    def reset(self, topic_id):
+        """Forget every bucket of one topic, e.g. when its row is reused"""
+        if topic_id >= len(self.hour_total):
+            return
+        self._minutes[topic_id] = 0
+        self._hours[topic_id] = 0
+        self.hour_total[topic_id] = 0
+        self.day_total[topic_id] = 0
+        self.prev_day_total[topic_id] = 0
+    
+    def velocity(self, topic_ids=None):
+        """Mentions per minute over the last hour"""
+        totals = self.hour_total if topic_ids is None else self.hour_total[topic_ids]
+        return totals / MINUTES_PER_HOUR
+    
+    def growth(self, topic_ids=None):
+        """Percent change of the last 24h against the 24h before it.
+
+        Undefined without mentions in the previous 24h (a new topic, or not
+        yet 24h of history), and reported as 0 then rather than as the day's
+        count x 100%; the emerging-trend detector is what flags new topics.
+        """
+        day = self.day_total if topic_ids is None else self.day_total[topic_ids]
+        prev = self.prev_day_total if topic_ids is None else self.prev_day_total[topic_ids]
+        return np.divide(day - prev, prev, out=np.zeros(np.shape(day)), where=prev > 0) * 100
+    
+    def hourly(self, hours=HOURS_PER_DAY, topic_ids=None):
+        """Mention counts for the last N hour buckets, oldest first, summed over topics"""
+        if self._minute is None:
+            return np.zeros(hours, np.int64)
+        hours = min(hours, 2 * HOURS_PER_DAY)
+        current = self._minute // MINUTES_PER_HOUR
+        slots = np.arange(current - hours + 1, current + 1) % (2 * HOURS_PER_DAY)
+        rows = self._hours if topic_ids is None else self._hours[topic_ids]
+        return rows[:, slots].sum(axis=0)